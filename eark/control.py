@@ -1,9 +1,17 @@
 """Control utiliies
 """
+import math
 import typing
 
+import numpy as np
+
+from eark import dynamics
 from eark.state import State
 
+SAMPLE_TIME_TOLERANCE = 1e-9  # fraction of a sample period within which a sample is considered due
+WORTH_FLOOR_FRACTION = 0.02   # smallest differential drum worth used for actuation, as a fraction of its peak over 0-180 deg
+WORTH_ANGLES = np.linspace(0.0, 180.0, 181)   # drum angles at which the peak differential worth is found  [degrees]
+
 
 class ControlRule:
     def __init__(self, default: float = 0.0):
@@ -60,4 +68,227 @@ class LinearControlRule(ControlRule):
         return self.default
 
 
+class SampledControlRule(ControlRule):
+    """Base class for discrete-time control rules
+
+    A sampled rule reads the reactor state once per sample period and holds its output constant between samples
+    (zero-order hold). The solver integrates the segments between sample times separately and calls "sample" at the
+    start of each segment, so "drum_speed" is only a lookup of the held output. This allows stateful logic, such as
+    integrators, which cannot be evaluated at the out-of-order trial points requested by the numerical integrator.
+    """
+
+    def __init__(self, sample_period: float, default: float = 0.0):
+        if sample_period <= 0:
+            raise ValueError('Sample period must be positive, got: {}'.format(sample_period))
+        super().__init__(default=default)
+        self.sample_period = sample_period
+        self.reset()
+
+    def reset(self):
+        """Clear the held output and any internal controller state prior to a new simulation"""
+        self.num_samples = 0
+        self._output = self.default
+        self._t_first = None
+
+    def sample(self, t: float, state: State) -> float:
+        """Update the held output if a sample is due at time "t"
+
+        Args:
+            t:
+                float, current time                                     [sec]
+            state:
+                State, the reactor state at time "t"
+
+        Returns:
+            float, the held output after the (possible) update
+        """
+        if self._t_first is None:
+            self._t_first = t
+        elif t < self._t_first + (self.num_samples - SAMPLE_TIME_TOLERANCE) * self.sample_period:
+            return self._output
+        self._output = self.control(t, state)
+        self.num_samples += 1
+        return self._output
+
+    def next_sample_time(self, t: float) -> float:
+        """Time of the next sample at or after time "t", on the schedule started by the first sample  [sec]"""
+        if self._t_first is None:
+            return t
+        return max(t, self._t_first + self.num_samples * self.sample_period)
+
+    def control(self, t: float, state: State) -> float:
+        raise NotImplementedError
+
+    def rule_applies(self, t: float, state: State):
+        return True
+
+    def drum_speed(self, t: float, state: State):
+        return self._output
+
+
+class PIDControlRule(SampledControlRule):
+    def __init__(self, setpoint: float, kp: float, sample_period: float, ki: float = 0.0, kd: float = 0.0,
+                 state_attribute: str = 't_fuel', output_min: float = None, output_max: float = None, default: float = 0.0):
+        """Discrete PID controller acting on a single attribute of the reactor State
+
+        Args:
+            setpoint:
+                float, target value of the measured attribute
+            kp:
+                float, proportional gain
+            sample_period:
+                float, time between controller samples                  [sec]
+            ki:
+                float, default 0, integral gain
+            kd:
+                float, default 0, derivative gain
+            state_attribute:
+                str, default 't_fuel', name of the State attribute to measure
+            output_min:
+                float, default None, lower limit on the output
+            output_max:
+                float, default None, upper limit on the output
+            default:
+                float, default 0, output held before the first sample
+        """
+        self.setpoint = setpoint
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.state_attribute = state_attribute
+        self.output_min = output_min
+        self.output_max = output_max
+        super().__init__(sample_period=sample_period, default=default)
+
+    def __repr__(self):
+        return 'PIDControlRule({}, kp={}, ki={}, kd={}, {}, dt={})'.format(self.setpoint, self.kp, self.ki, self.kd,
+                                                                          self.state_attribute, self.sample_period)
+
+    def reset(self):
+        super().reset()
+        self._integral = 0.0
+        self._error = None
+
+    def measure(self, state: State) -> float:
+        return getattr(state, self.state_attribute)
+
+    def clip(self, output: float) -> float:
+        if self.output_min is not None:
+            output = max(output, self.output_min)
+        if self.output_max is not None:
+            output = min(output, self.output_max)
+        return output
+
+    def control(self, t: float, state: State) -> float:
+        error = self.setpoint - self.measure(state)
+        integral = self._integral + error * self.sample_period
+        derivative = 0.0 if self._error is None else (error - self._error) / self.sample_period
+        output = self.actuate(self.kp * error + self.ki * integral + self.kd * derivative, state)
+        clipped = self.clip(output)
+        # Conditional integration prevents wind-up while the output is saturated
+        if clipped == output:
+            self._integral = integral
+        self._error = error
+        return clipped
+
+    def actuate(self, command: float, state: State) -> float:
+        """Convert the PID command into the rule output, identity by default"""
+        return command
+
+
+class FuelTemperatureHoldControlRule(PIDControlRule):
+    def __init__(self, setpoint: float, kp: float, sample_period: float, total_beta: float, ki: float = 0.0, kd: float = 0.0,
+                 max_drum_speed: float = None, default: float = 0.0):
+        """Hold the fuel temperature at a setpoint by rotating the control drums
+
+        The PID output is interpreted as a demanded reactivity insertion rate [dk/sec] which is converted to a drum speed
+        using the local differential worth of the drums. The gains are therefore independent of the sign and magnitude of
+        the drum worth at the current drum angle. Near the angles where the differential worth vanishes (about 6 and 174
+        degrees) its magnitude is held at WORTH_FLOOR_FRACTION of its peak, so the drum speed stays bounded and the loop
+        keeps its authority. With individually modelled drums the solver binds the rule to the drums it moves (see
+        Drums.bind), and the differential worth is the summed worth of those drums.
+
+        Args:
+            setpoint:
+                float, target fuel temperature                          [K]
+            kp:
+                float, proportional gain                                [dk/sec/K]
+            sample_period:
+                float, time between controller samples                  [sec]
+            total_beta:
+                float, delayed neutron fraction                         []
+            ki:
+                float, default 0, integral gain                         [dk/sec/K/sec]
+            kd:
+                float, default 0, derivative gain                       [dk/K]
+            max_drum_speed:
+                float, default None, limit on the drum speed magnitude  [degrees/sec]
+            default:
+                float, default 0, drum speed held before the first sample
+        """
+        self.total_beta = total_beta
+        self.max_drum_speed = max_drum_speed
+        self.worth_floor = _worth_floor(dynamics.con_drum_reactivity_deriv(beta=total_beta, drum_speed=1.0, drum_angle=WORTH_ANGLES))
+        self.drums = None
+        self.driven = None
+        self.drum_worth_floor = None
+        super().__init__(setpoint=setpoint, kp=kp, sample_period=sample_period, ki=ki, kd=kd, state_attribute='t_fuel',
+                         output_min=None if max_drum_speed is None else -max_drum_speed, output_max=max_drum_speed,
+                         default=default)
+
+    def __repr__(self):
+        return 'FuelTemperatureHoldControlRule({}, kp={}, ki={}, kd={}, dt={})'.format(self.setpoint, self.kp, self.ki, self.kd,
+                                                                                       self.sample_period)
+
+    def bind(self, drums, driven: np.ndarray):
+        """Convert the command with the differential worth of the individually modelled drums moved by this rule
+
+        Args:
+            drums:
+                Drums, the individually modelled drums, see eark.drums
+            driven:
+                ndarray, boolean mask of the drums moved by this rule, excluding stuck drums
+        """
+        self.drums = drums
+        self.driven = np.asarray(driven, dtype=bool)
+        worth = drums.differential_worth(beta=self.total_beta, drum_angles=WORTH_ANGLES[:, np.newaxis])
+        # Without any moving drum the rule has no authority, the floor of the base model keeps the output finite
+        self.drum_worth_floor = _worth_floor(np.sum(worth[:, self.driven], axis=1)) or self.worth_floor
+
+    def _bound(self, state: State) -> bool:
+        return self.drums is not None and state.drum_angles is not None
+
+    def differential_worth(self, state: State) -> float:
+        """Differential worth of the drums moved by this rule  [dk/degree]"""
+        if self._bound(state):
+            return float(np.sum(self.drums.differential_worth(beta=self.total_beta, drum_angles=state.drum_angles)[self.driven]))
+        return dynamics.con_drum_reactivity_deriv(beta=self.total_beta, drum_speed=1.0, drum_angle=state.drum_angle)
+
+    def actuate(self, command: float, state: State) -> float:
+        worth = self.differential_worth(state)
+        floor = self.drum_worth_floor if self._bound(state) else self.worth_floor
+        if abs(worth) < floor:
+            worth = math.copysign(floor, worth)
+        return command / worth
+
+
+def _worth_floor(worth: np.ndarray) -> float:
+    """Smallest magnitude of the differential drum worth used for actuation, from the worth at WORTH_ANGLES  [dk/degree]"""
+    return WORTH_FLOOR_FRACTION * float(np.max(np.abs(worth)))
+
+
+def sampled_rules(rule: ControlRule) -> typing.List[SampledControlRule]:
+    """Find all sampled rules within a (possibly composite) control rule
+
+    Args:
+        rule:
+            ControlRule, the rule to search
 
+    Returns:
+        list of SampledControlRule
+    """
+    if isinstance(rule, CompositeControlRule):
+        return [r for sub in rule.rules for r in sampled_rules(sub)]
+    if isinstance(rule, SampledControlRule):
+        return [rule]
+    return []
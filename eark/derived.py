@@ -0,0 +1,78 @@
+"""Module for quantities derived from the time series of a solution.
+
+All functions are vectorized with time along the last axis, so the same call reduces a single time series or a stack of
+time series of many solutions on common output times, see Solution.stack. Output times must be increasing.
+"""
+
+import typing
+
+import numpy as np
+
+
+def window(t: np.ndarray, t_min: float = None, t_max: float = None) -> slice:
+    """Slice of the output times within [t_min, t_max]
+
+    Args:
+        t:
+            ndarray, increasing output times                          [sec]
+        t_min:
+            float, default None, start of the window, defaults to the first output time   [sec]
+        t_max:
+            float, default None, end of the window, defaults to the last output time      [sec]
+
+    Returns:
+        slice
+    """
+    start = 0 if t_min is None else int(np.searchsorted(t, t_min, side='left'))
+    stop = len(t) if t_max is None else int(np.searchsorted(t, t_max, side='right'))
+    if stop <= start:
+        raise ValueError('No output times in the window [{}, {}]'.format(t_min, t_max))
+    return slice(start, stop)
+
+
+def total_reactivity(rho_fuel_temp: np.ndarray, rho_mod_temp: np.ndarray, rho_con_drum: np.ndarray) -> np.ndarray:
+    """Sum of the fuel temperature, moderator temperature and control drum reactivities  [dk]"""
+    return rho_fuel_temp + rho_mod_temp + rho_con_drum
+
+
+def rate(t: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Time derivative of a time series by second order central differences, one-sided at the ends  [1/sec]"""
+    return np.gradient(values, t, axis=-1)
+
+
+def reactor_period(t: np.ndarray, power: np.ndarray) -> np.ndarray:
+    """Instantaneous reactor period P / (dP/dt), infinite where the power is stationary  [sec]"""
+    dpower = rate(t, power)
+    return np.divide(power, dpower, out=np.full(np.shape(power), np.inf), where=dpower != 0)
+
+
+def cumulative_integral(t: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Running time integral of a time series by the trapezoidal rule, zero at the first output time. The cumulative
+    integral of the neutron population is the energy deposited  [J]"""
+    values = np.asarray(values, dtype=float)
+    integral = np.zeros(values.shape)
+    np.cumsum(0.5 * (values[..., 1:] + values[..., :-1]) * np.diff(t), axis=-1, out=integral[..., 1:])
+    return integral
+
+
+def windowed_peak(t: np.ndarray, values: np.ndarray, t_min: float = None,
+                  t_max: float = None) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Peak value of a time series within [t_min, t_max] and the time of the peak
+
+    Args:
+        t:
+            ndarray, increasing output times                          [sec]
+        values:
+            ndarray, time series with time along the last axis
+        t_min:
+            float, default None, start of the window                  [sec]
+        t_max:
+            float, default None, end of the window                    [sec]
+
+    Returns:
+        (ndarray, ndarray), the peak values and the times of the peaks, with the shape of "values" without the last axis
+    """
+    span = window(t, t_min, t_max)
+    values = np.asarray(values)[..., span]
+    i = np.argmax(values, axis=-1)
+    return np.max(values, axis=-1), t[span][i]
@@ -0,0 +1,190 @@
+"""Module for control drum systems made of individual drums, grouped into banks which move together.
+
+The drum angle of the base model stands for all drums rotating together, with one cubic worth curve for the whole
+drum system. A Drums object models the drums individually instead: every drum has its own cubic worth curve, the drums
+are grouped into banks driven by their own control rules, and stuck drums do not move. The drum angles are appended to
+the state array after the state components (see state.NUM_COMPONENTS). The DrumAngle component is then the mean drum
+angle and the RhoConDrum component the total reactivity of the drums.
+
+The worth curves of all drums are evaluated at once on arrays, so the cost of a solve barely depends on the number of
+drums. By default every drum has 1/num_drums of the worth of the base model, so drums rotating together reproduce it.
+"""
+
+import typing
+
+import numpy as np
+
+from eark import control
+from eark import dynamics
+from eark.control import ControlRule
+from eark.state import State
+
+# Worth curve of the whole drum system per unit beta, rho / beta = c1 * angle^3 + c2 * angle^2 + c3 * angle + c4
+DRUM_WORTH_COEFFICIENTS = np.array([dynamics.CON_DRUM_REACTIVITY_C1, dynamics.CON_DRUM_REACTIVITY_C2, dynamics.CON_DRUM_REACTIVITY_C3,
+                                    dynamics.CON_DRUM_REACTIVITY_C4])
+
+
+class DrumBank:
+    __slots__ = ('drums', 'drum_control_rule', 'name')
+
+    def __init__(self, drums: typing.Sequence[int], drum_control_rule: ControlRule = None, name: str = None):
+        """A group of drums which rotate together
+
+        Args:
+            drums:
+                sequence of int, indices of the drums of the bank
+            drum_control_rule:
+                ControlRule, default None, rule giving the drum speed of the bank, defaults to the control rule of the solve
+            name:
+                str, default None, name of the bank
+        """
+        self.drums = tuple(int(i) for i in drums)
+        self.drum_control_rule = drum_control_rule
+        self.name = name
+
+    def __repr__(self):
+        return 'DrumBank({}, {}, {})'.format(self.name, list(self.drums), self.drum_control_rule)
+
+
+class Drums:
+    __slots__ = ('num_drums', 'coefficients', 'banks', 'stuck', '_bank_index', '_bank_weights', '_slope_coefficients')
+
+    def __init__(self, num_drums: int, coefficients: np.ndarray = None, banks: typing.Sequence[DrumBank] = None,
+                 stuck: typing.Sequence[int] = ()):
+        """Individually modelled control drums
+
+        Args:
+            num_drums:
+                int, number of drums
+            coefficients:
+                ndarray, default None, cubic worth curve coefficients per unit beta, c1 to c4 as in
+                DRUM_WORTH_COEFFICIENTS, either 4 coefficients shared by all drums or num_drums x 4. Defaults to
+                DRUM_WORTH_COEFFICIENTS / num_drums
+            banks:
+                sequence of DrumBank, default None, the banks, each drum in at most one. Drums in no bank do not move.
+                Defaults to a single bank of all drums
+            stuck:
+                sequence of int, default (), indices of drums which do not move
+        """
+        if num_drums < 1:
+            raise ValueError('Number of drums must be positive, got: {}'.format(num_drums))
+        self.num_drums = num_drums
+        if coefficients is None:
+            coefficients = DRUM_WORTH_COEFFICIENTS / num_drums
+        self.coefficients = np.array(np.broadcast_to(np.asarray(coefficients, dtype=float), (num_drums, 4)))
+        self.banks = [DrumBank(range(num_drums))] if banks is None else list(banks)
+        self.stuck = tuple(int(i) for i in stuck)
+
+        # Index of the bank of every drum. Stuck drums and drums in no bank point at an extra bank which never moves
+        fixed = len(self.banks)
+        self._bank_index = np.full(num_drums, fixed, dtype=int)
+        for b, bank in enumerate(self.banks):
+            for i in bank.drums:
+                if not 0 <= i < num_drums:
+                    raise ValueError('Drum index {} out of range for {} drums'.format(i, num_drums))
+                if self._bank_index[i] != fixed:
+                    raise ValueError('Drum {} is in more than one bank'.format(i))
+                self._bank_index[i] = b
+        if any(not 0 <= i < num_drums for i in self.stuck):
+            raise ValueError('Stuck drum indices out of range for {} drums: {}'.format(num_drums, self.stuck))
+        self._bank_index[list(self.stuck)] = fixed
+        # Fraction of the drums moving with each bank, the weight of the bank speed in the mean drum speed
+        self._bank_weights = (np.bincount(self._bank_index, minlength=fixed + 1)[:fixed] / num_drums).tolist()
+        # Differential worth coefficients, as contiguous arrays for the derivative
+        self._slope_coefficients = tuple(np.ascontiguousarray(self.coefficients[:, i] * (3 - i)) for i in range(3))
+
+    def __repr__(self):
+        return 'Drums({:d} drums, {:d} banks, stuck {})'.format(self.num_drums, len(self.banks), list(self.stuck))
+
+    def worth(self, beta: float, drum_angles: np.ndarray) -> np.ndarray:
+        """Reactivity of every drum, for a ... x num_drums stack of drum angles  [dk]"""
+        c = self.coefficients
+        return beta * (((c[:, 0] * drum_angles + c[:, 1]) * drum_angles + c[:, 2]) * drum_angles + c[:, 3])
+
+    def differential_worth(self, beta: float, drum_angles: np.ndarray) -> np.ndarray:
+        """Derivative of the reactivity of every drum with respect to its angle  [dk/degree]"""
+        c2, c1, c0 = self._slope_coefficients
+        return beta * ((c2 * drum_angles + c1) * drum_angles + c0)
+
+    def reactivity(self, beta: float, drum_angles: np.ndarray) -> np.ndarray:
+        """Total reactivity of the drums, for a ... x num_drums stack of drum angles  [dk]"""
+        return np.sum(self.worth(beta, drum_angles), axis=-1)
+
+    def reactivity_deriv(self, beta: float, drum_angles: np.ndarray, drum_speeds: np.ndarray) -> np.ndarray:
+        """Time derivative of the total reactivity of the drums  [dk/sec]"""
+        return np.sum(self.differential_worth(beta, drum_angles) * drum_speeds, axis=-1)
+
+    def initial_angles(self, drum_angle_initial: typing.Union[float, np.ndarray]) -> np.ndarray:
+        """Angles of all drums from a common angle or the angle of every drum  [degrees]"""
+        return np.array(np.broadcast_to(np.asarray(drum_angle_initial, dtype=float), (self.num_drums,)))
+
+    def control_rules(self, drum_control_rule: ControlRule) -> typing.List[ControlRule]:
+        """The distinct control rules driving the banks, given the control rule of the solve"""
+        rules = []
+        for bank in self.banks:
+            rule = drum_control_rule if bank.drum_control_rule is None else bank.drum_control_rule
+            if all(rule is not other for other in rules):
+                rules.append(rule)
+        return rules
+
+    def driven(self, rule: ControlRule, drum_control_rule: ControlRule) -> np.ndarray:
+        """Boolean mask of the drums moved by a sampled rule, alone or within a composite rule, excluding stuck drums
+
+        Args:
+            rule:
+                SampledControlRule, the rule
+            drum_control_rule:
+                ControlRule, the rule of the banks without their own rule
+        """
+        banks = [b for b, bank in enumerate(self.banks)
+                 if any(r is rule for r in control.sampled_rules(drum_control_rule if bank.drum_control_rule is None
+                                                                 else bank.drum_control_rule))]
+        return np.isin(self._bank_index, banks)
+
+    def bind(self, drum_control_rule: ControlRule):
+        """Bind the fuel temperature hold rules driving the banks to the drums they move, so that they convert their
+        command with the worth of those drums. Called by the solver prior to a solve
+
+        Args:
+            drum_control_rule:
+                ControlRule, the rule of the banks without their own rule
+        """
+        for bank_rule in self.control_rules(drum_control_rule):
+            for rule in control.sampled_rules(bank_rule):
+                if isinstance(rule, control.FuelTemperatureHoldControlRule):
+                    rule.bind(self, self.driven(rule, drum_control_rule))
+
+    def _bank_speeds(self, t: float, state: State, drum_control_rule: ControlRule) -> typing.List[float]:
+        return [(drum_control_rule if bank.drum_control_rule is None else bank.drum_control_rule).drum_speed(t=t, state=state)
+                for bank in self.banks]
+
+    def drum_speeds(self, t: float, state: State, drum_control_rule: ControlRule) -> np.ndarray:
+        """Rotation rate of every drum, zero for stuck drums and drums in no bank
+
+        Args:
+            t:
+                float, current time                                     [sec]
+            state:
+                State, the reactor state, with the mean drum angle as its drum angle
+            drum_control_rule:
+                ControlRule, the rule of the banks without their own rule
+
+        Returns:
+            ndarray, drum speeds                                        [degrees/sec]
+        """
+        return np.array(self._bank_speeds(t, state, drum_control_rule) + [0.0])[self._bank_index]
+
+    def derivatives(self, beta: float, t: float, state: State,
+                    drum_control_rule: ControlRule) -> typing.Tuple[np.ndarray, float, float]:
+        """Time derivatives of the drum angles, the mean drum angle and the total drum reactivity, for the solver
+
+        Returns:
+            (ndarray, float, float), the drum speeds [degrees/sec], the mean drum speed [degrees/sec] and the time
+            derivative of the total drum reactivity [dk/sec]
+        """
+        bank_speeds = self._bank_speeds(t, state, drum_control_rule)
+        drum_speeds = np.array(bank_speeds + [0.0])[self._bank_index]
+        mean_speed = sum(speed * weight for speed, weight in zip(bank_speeds, self._bank_weights))
+        c2, c1, c0 = self._slope_coefficients
+        angles = state.drum_angles
+        return drum_speeds, mean_speed, beta * np.dot((c2 * angles + c1) * angles + c0, drum_speeds)
@@ -0,0 +1,311 @@
+"""Module for solving the inhour equation, which relates a step reactivity insertion to the exponential time constants
+(reactor periods) of the point kinetics equations.
+
+Substituting n(t) = n_0 exp(omega t) into the point kinetics equations gives the inhour equation
+
+    rho = omega * period + (beta - sum_i beta_i) + sum_i beta_i * omega / (omega + lambda_i)
+
+The right hand side is strictly increasing between consecutive poles -lambda_i and diverges at each pole, so there is
+exactly one real root per interval: six roots between the poles plus the "prompt" root below the largest pole. The
+largest root is the stable root, which determines the asymptotic (stable) reactor period T = 1 / omega.
+
+All functions are vectorized over arrays of reactivity or period, the roots are found simultaneously for every input
+using a safeguarded Newton iteration on the bracketing intervals, in cache-sized blocks of BLOCK_SIZE roots. For 1e6
+reactivities, stable_period takes about 0.5 s and roots, which finds seven times as many roots, about 3 s.
+
+References:
+    [1] Hetrick DL. Dynamics of Nuclear Reactors. University of Chicago Press; 1971.
+"""
+
+import typing
+
+import numpy as np
+
+DEFAULT_TOLERANCE = 1e-12
+DEFAULT_MAX_ITERS = 200
+MAX_BRACKET_DOUBLINGS = 64
+
+# Number of roots iterated together, small enough for the temporaries of an iteration to stay in the processor cache
+BLOCK_SIZE = 32768
+
+
+def _offset(beta_vector: np.ndarray, total_beta: float = None) -> float:
+    """Constant term of the inhour equation, non-zero when the total beta differs from the sum of the group betas"""
+    return 0.0 if total_beta is None else total_beta - np.sum(beta_vector)
+
+
+def inhour_reactivity(omega: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float,
+                      total_beta: float = None) -> np.ndarray:
+    """Evaluate the right hand side of the inhour equation, the reactivity corresponding to inverse period "omega"
+
+    Args:
+        omega:
+            ndarray, inverse reactor period                             [1/sec]
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        period:
+            float, effective generation time                            [sec]
+        total_beta:
+            float, default None, delayed neutron fraction, defaults to the sum of beta_vector   []
+
+    Returns:
+        ndarray, reactivity with the same shape as "omega"                [dk/k]
+    """
+    omega = np.asarray(omega, dtype=float)
+    rho = omega * period + _offset(beta_vector, total_beta)
+    for beta_i, lambda_i in zip(beta_vector, precursor_constants):
+        rho = rho + beta_i * omega / (omega + lambda_i)
+    return rho
+
+
+def _inhour_reactivity_deriv(omega: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float) -> np.ndarray:
+    """Derivative of the inhour reactivity with respect to omega, positive everywhere away from the poles"""
+    deriv = np.full_like(omega, period)
+    for beta_i, lambda_i in zip(beta_vector, precursor_constants):
+        deriv = deriv + beta_i * lambda_i / (omega + lambda_i) ** 2
+    return deriv
+
+
+def _residual_and_deriv(omega: np.ndarray, rho: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float,
+                        offset: float) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Residual of the inhour equation and its derivative with respect to omega, sharing one division per pole term"""
+    residual = omega * period + (offset - rho)
+    deriv = np.full_like(omega, period)
+    for beta_i, lambda_i in zip(beta_vector, precursor_constants):
+        inv = 1.0 / (omega + lambda_i)
+        residual += beta_i * omega * inv
+        deriv += beta_i * lambda_i * inv * inv
+    return residual, deriv
+
+
+def _newton(rho: np.ndarray, lo: np.ndarray, hi: np.ndarray, x: np.ndarray, lower_pole: np.ndarray, upper_pole: np.ndarray,
+            beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float, total_beta: float, scale: float, tol: float,
+            max_iters: int) -> np.ndarray:
+    """Find the roots in blocks of BLOCK_SIZE, see _newton_block"""
+    blocks = [slice(start, start + BLOCK_SIZE) for start in range(0, x.size, BLOCK_SIZE)]
+    return np.concatenate([_newton_block(rho[b], lo[b], hi[b], x[b], lower_pole[b], upper_pole[b], beta_vector, precursor_constants,
+                                         period, total_beta, scale, tol, max_iters) for b in blocks] or [x.copy()])
+
+
+def _newton_block(rho: np.ndarray, lo: np.ndarray, hi: np.ndarray, x: np.ndarray, lower_pole: np.ndarray, upper_pole: np.ndarray,
+                  beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float, total_beta: float, scale: float, tol: float,
+                  max_iters: int) -> np.ndarray:
+    """Safeguarded Newton iteration for the increasing inhour function on the brackets (lo, hi)
+
+    The Newton step is taken in the coordinate y = 1 / (omega - pole) for the bounding pole nearest to the iterate, in
+    which the pole term of the inhour function is linear, so that roots close to either pole converge quadratically.
+    Brackets without a pole on one side pass an infinite pole there. Steps which leave the bracket are replaced by
+    bisection, and the bracket is narrowed after every evaluation. Only the entries which have not yet converged are
+    updated on each iteration.
+    """
+    offset = _offset(beta_vector, total_beta)
+    x = x.copy()
+    active = np.arange(x.size)
+    x_a, lo_a, hi_a, rho_a, lower_a, upper_a = x, lo, hi, rho, lower_pole, upper_pole
+    for _ in range(max_iters):
+        residual, deriv = _residual_and_deriv(x_a, rho_a, beta_vector, precursor_constants, period, offset)
+        above = residual > 0
+        hi_a = np.where(above, x_a, hi_a)
+        lo_a = np.where(above, lo_a, x_a)
+
+        pole = np.where(x_a - lower_a < upper_a - x_a, lower_a, upper_a)
+        y = 1.0 / (x_a - pole)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_new = pole + 1.0 / (y + residual * y ** 2 / deriv)
+        inside = (x_new >= lo_a) & (x_new <= hi_a)
+        x_new = np.where(inside, x_new, 0.5 * (lo_a + hi_a))
+
+        converged = (np.abs(x_new - x_a) <= tol * np.maximum(np.abs(x_new), scale)) | (residual == 0)
+        x[active] = np.where(residual == 0, x_a, x_new)
+        keep = ~converged
+        if not keep.any():
+            break
+        active = active[keep]
+        x_a, lo_a, hi_a, rho_a, lower_a, upper_a = x[active], lo_a[keep], hi_a[keep], rho_a[keep], lower_a[keep], upper_a[keep]
+    return x
+
+
+def _prompt_bracket(rho: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float, total_beta: float):
+    """Bracket the prompt root, which lies below (rho - beta) / period and below the largest pole"""
+    if not np.all(np.isfinite(rho)):
+        raise ValueError('Reactivity must be finite to bracket the prompt root of the inhour equation')
+    beta = np.sum(beta_vector) + _offset(beta_vector, total_beta)
+    hi = np.minimum((rho - beta) / period, -np.max(precursor_constants))
+    width = np.full_like(rho, np.max(precursor_constants))
+    lo = hi - width
+    for _ in range(MAX_BRACKET_DOUBLINGS):
+        short = inhour_reactivity(lo, beta_vector, precursor_constants, period, total_beta) >= rho
+        if not short.any():
+            return lo, hi
+        width = np.where(short, 2 * width, width)
+        lo = np.where(short, hi - width, lo)
+    raise ValueError('Could not bracket the prompt root of the inhour equation, check that the reactivity, the beta values and '
+                     'the generation time are finite and the generation time is positive')
+
+
+def _interior_seeds(rho: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float,
+                    total_beta: float) -> np.ndarray:
+    """Starting points for the roots between consecutive poles, num_rho x (num_poles - 1)
+
+    Writing the pole terms as beta_i - beta_i * lambda_i / (omega + lambda_i), the root between the poles a < b is the
+    root of the model R - w_a / (omega - a) + w_b / (b - omega), with the other terms held at their value R in the
+    middle of the interval. The model root solves a quadratic with exactly one root in (a, b).
+    """
+    order = np.argsort(precursor_constants)[::-1]
+    poles = -np.asarray(precursor_constants, dtype=float)[order]
+    weights = (np.asarray(beta_vector) * np.asarray(precursor_constants))[order]
+    a, b, w_a, w_b = poles[:-1], poles[1:], weights[:-1], weights[1:]
+    middle = 0.5 * (a + b)
+    others = np.sum(weights / (middle[:, np.newaxis] - poles), axis=1) - w_a / (middle - a) - w_b / (middle - b)
+    remainder = middle * period + np.sum(beta_vector) + _offset(beta_vector, total_beta) - others - rho[:, np.newaxis]
+
+    width = b - a
+    linear = remainder * width + w_a + w_b
+    return a + 2 * w_a * width / (linear + np.sqrt(linear ** 2 - 4 * remainder * w_a * width))
+
+
+def _stable_bracket(rho: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float, total_beta: float):
+    """Bracket the stable root, which lies above the smallest pole and below max(0, (rho - offset) / period)"""
+    lo = np.full_like(rho, -np.min(precursor_constants))
+    hi = np.maximum((rho - _offset(beta_vector, total_beta)) / period, 0.0)
+    return lo, hi
+
+
+def stable_root(rho: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float, total_beta: float = None,
+                tol: float = DEFAULT_TOLERANCE, max_iters: int = DEFAULT_MAX_ITERS) -> np.ndarray:
+    """Compute the largest root of the inhour equation for each reactivity
+
+    Args:
+        rho:
+            ndarray, reactivity                                         [dk/k]
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        period:
+            float, effective generation time                            [sec]
+        total_beta:
+            float, default None, delayed neutron fraction, defaults to the sum of beta_vector   []
+        tol:
+            float, relative convergence tolerance on the root
+        max_iters:
+            int, maximum number of Newton iterations
+
+    Returns:
+        ndarray, the stable inverse period with the same shape as "rho"   [1/sec]
+    """
+    rho = np.asarray(rho, dtype=float)
+    flat = rho.ravel()
+    lo, hi = _stable_bracket(flat, beta_vector, precursor_constants, period, total_beta)
+
+    # Start from the root of the inhour function with only the pole term of the smallest decay constant, which is exact
+    # for a dominant pole and otherwise bounds the root from the left
+    i_min = np.argmin(precursor_constants)
+    q = np.minimum(flat - _offset(beta_vector, total_beta), 0.0) / beta_vector[i_min]
+    x0 = np.where(hi > 0, 0.0, q * precursor_constants[i_min] / (1 - q))
+    root = _newton(flat, lo, hi, x0, lo, np.full_like(flat, np.inf), beta_vector, precursor_constants, period, total_beta,
+                   scale=np.min(precursor_constants), tol=tol, max_iters=max_iters)
+    return root.reshape(rho.shape)
+
+
+def roots(rho: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float, total_beta: float = None,
+          tol: float = DEFAULT_TOLERANCE, max_iters: int = DEFAULT_MAX_ITERS) -> np.ndarray:
+    """Compute all roots of the inhour equation for each reactivity
+
+    Args:
+        rho:
+            ndarray, reactivity                                         [dk/k]
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        period:
+            float, effective generation time                            [sec]
+        total_beta:
+            float, default None, delayed neutron fraction, defaults to the sum of beta_vector   []
+        tol:
+            float, relative convergence tolerance on the roots
+        max_iters:
+            int, maximum number of Newton iterations
+
+    Returns:
+        ndarray, rho.shape x 7 array of inverse periods in increasing order, the last being the stable root   [1/sec]
+    """
+    rho = np.asarray(rho, dtype=float)
+    flat = rho.ravel()
+    poles = -np.sort(precursor_constants)[::-1]
+    num_roots = len(poles) + 1
+
+    lo = np.empty((flat.size, num_roots))
+    hi = np.empty((flat.size, num_roots))
+    lo[:, 0], hi[:, 0] = _prompt_bracket(flat, beta_vector, precursor_constants, period, total_beta)
+    lo[:, 1:-1] = poles[:-1]
+    hi[:, 1:-1] = poles[1:]
+    lo[:, -1], hi[:, -1] = _stable_bracket(flat, beta_vector, precursor_constants, period, total_beta)
+
+    rho_all = np.repeat(flat[:, np.newaxis], num_roots, axis=1).ravel()
+    lower_pole = np.empty((flat.size, num_roots))
+    lower_pole[:, 0] = -np.inf
+    lower_pole[:, 1:] = poles
+    upper_pole = np.empty((flat.size, num_roots))
+    upper_pole[:, :-1] = poles
+    upper_pole[:, -1] = np.inf
+    x0 = 0.5 * (lo + hi)
+    x0[:, 1:-1] = _interior_seeds(flat, beta_vector, precursor_constants, period, total_beta)
+    res = _newton(rho_all, lo.ravel(), hi.ravel(), x0.ravel(), lower_pole.ravel(), upper_pole.ravel(), beta_vector,
+                  precursor_constants, period, total_beta, scale=np.min(precursor_constants), tol=tol, max_iters=max_iters)
+    return res.reshape(rho.shape + (num_roots,))
+
+
+def stable_period(rho: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float, total_beta: float = None,
+                  tol: float = DEFAULT_TOLERANCE, max_iters: int = DEFAULT_MAX_ITERS) -> np.ndarray:
+    """Compute the stable reactor period for each reactivity
+
+    Args:
+        rho:
+            ndarray, reactivity                                         [dk/k]
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        period:
+            float, effective generation time                            [sec]
+        total_beta:
+            float, default None, delayed neutron fraction, defaults to the sum of beta_vector   []
+        tol:
+            float, relative convergence tolerance on the root
+        max_iters:
+            int, maximum number of Newton iterations
+
+    Returns:
+        ndarray, stable reactor period, infinite at zero reactivity     [sec]
+    """
+    omega = stable_root(rho, beta_vector, precursor_constants, period, total_beta=total_beta, tol=tol, max_iters=max_iters)
+    with np.errstate(divide='ignore'):
+        return 1.0 / omega
+
+
+def reactivity(reactor_period: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float,
+               total_beta: float = None) -> np.ndarray:
+    """Compute the reactivity which produces the stable reactor period, the inverse of "stable_period"
+
+    Args:
+        reactor_period:
+            ndarray, stable reactor period, may be infinite             [sec]
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        period:
+            float, effective generation time                            [sec]
+        total_beta:
+            float, default None, delayed neutron fraction, defaults to the sum of beta_vector   []
+
+    Returns:
+        ndarray, reactivity with the same shape as "reactor_period"     [dk/k]
+    """
+    with np.errstate(divide='ignore'):
+        omega = 1.0 / np.asarray(reactor_period, dtype=float)
+    return inhour_reactivity(omega, beta_vector, precursor_constants, period, total_beta=total_beta)
@@ -0,0 +1,131 @@
+"""Module for inverse point kinetics, recovering the reactivity that produced a measured power trace.
+
+Rearranging the population equation of the point kinetics equations gives the reactivity in terms of the power and the
+precursor densities,
+
+    rho = total_beta + period * (dn/dt) / n - period * sum_i lambda_i c_i / n
+
+The precursor densities are recovered from the power history by integrating the precursor equations exactly over each
+sample interval, assuming the power varies linearly between samples. On a uniform time grid this is a first order
+recursive (exponential) filter per precursor group, so a trace of N samples is processed in O(N) time and may be fed in
+chunks of any size with identical results.
+"""
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+class InverseKinetics:
+    def __init__(self, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float, dt: float, total_beta: float = None,
+                 precursor_density_initial: np.ndarray = None):
+        """Streaming inverse kinetics processor for a uniformly sampled power trace
+
+        Args:
+            beta_vector:
+                ndarray, 1x6 vector of beta_i                           []
+            precursor_constants:
+                ndarray, 1x6 vector of lambda_i                         [1/sec]
+            period:
+                float, effective generation time                        [sec]
+            dt:
+                float, time between power samples                       [sec]
+            total_beta:
+                float, default None, delayed neutron fraction, defaults to the sum of beta_vector   []
+            precursor_density_initial:
+                ndarray, default None, 1x6 vector of precursor densities at the first sample. Defaults to the
+                equilibrium densities for the first power sample
+        """
+        if dt <= 0:
+            raise ValueError('Sample spacing must be positive, got: {}'.format(dt))
+        self.beta_vector = np.asarray(beta_vector, dtype=float)
+        self.precursor_constants = np.asarray(precursor_constants, dtype=float)
+        self.period = period
+        self.dt = dt
+        self.total_beta = np.sum(self.beta_vector) if total_beta is None else total_beta
+        self.precursor_density_initial = precursor_density_initial
+
+        # Exact integration of dc/dt = beta_i / period * n - lambda_i * c over one interval with linearly varying n:
+        # c[k] = decay * c[k-1] + weight_prev * n[k-1] + weight_curr * n[k]
+        lambda_dt = self.precursor_constants * dt
+        self._decay = np.exp(-lambda_dt)
+        integral = -np.expm1(-lambda_dt) / self.precursor_constants
+        ramp = (dt - integral) / lambda_dt
+        self._weight_prev = self.beta_vector / period * (integral - ramp)
+        self._weight_curr = self.beta_vector / period * ramp
+
+        self._power_prev = None
+        self._density = None
+
+    @property
+    def precursor_density(self) -> np.ndarray:
+        """The precursor densities at the most recent sample"""
+        return self._density
+
+    def _reactivity(self, power: np.ndarray, power_prev: np.ndarray, delayed_source: np.ndarray) -> np.ndarray:
+        return self.total_beta + self.period * ((power - power_prev) / self.dt - delayed_source) / power
+
+    def update(self, power: np.ndarray) -> np.ndarray:
+        """Process the next chunk of the power trace
+
+        Args:
+            power:
+                ndarray, consecutive power samples following any previously processed samples    [W]
+
+        Returns:
+            ndarray, reactivity at each of the samples                  [dk/k]
+        """
+        power = np.asarray(power, dtype=float)
+        head = np.empty(0)
+        if self._power_prev is None and power.size > 0:
+            if self.precursor_density_initial is None:
+                self._density = self.beta_vector / (self.precursor_constants * self.period) * power[0]
+            else:
+                self._density = np.array(self.precursor_density_initial, dtype=float)
+            self._power_prev = power[0]
+            head = self._reactivity(power[:1], power[:1], np.inner(self.precursor_constants, self._density))
+            power = power[1:]
+        if power.size == 0:
+            return head
+
+        delayed_source = np.zeros_like(power)
+        density = np.empty_like(self._density)
+        for i, lambda_i in enumerate(self.precursor_constants):
+            # Direct form II transposed initial condition carrying the previous sample into the filter
+            zi = [self._weight_prev[i] * self._power_prev + self._decay[i] * self._density[i]]
+            c_i, _ = lfilter([self._weight_curr[i], self._weight_prev[i]], [1.0, -self._decay[i]], power, zi=zi)
+            delayed_source += lambda_i * c_i
+            density[i] = c_i[-1]
+
+        power_prev = np.concatenate(([self._power_prev], power[:-1]))
+        self._power_prev = power[-1]
+        self._density = density
+        return np.concatenate((head, self._reactivity(power, power_prev, delayed_source)))
+
+
+def inverse_kinetics(power: np.ndarray, dt: float, beta_vector: np.ndarray, precursor_constants: np.ndarray, period: float,
+                     total_beta: float = None, precursor_density_initial: np.ndarray = None) -> np.ndarray:
+    """Recover the reactivity trace from a uniformly sampled power trace
+
+    Args:
+        power:
+            ndarray, power samples                                      [W]
+        dt:
+            float, time between power samples                           [sec]
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        period:
+            float, effective generation time                            [sec]
+        total_beta:
+            float, default None, delayed neutron fraction, defaults to the sum of beta_vector   []
+        precursor_density_initial:
+            ndarray, default None, 1x6 vector of precursor densities at the first sample. Defaults to the equilibrium
+            densities for the first power sample
+
+    Returns:
+        ndarray, reactivity at each of the samples                      [dk/k]
+    """
+    processor = InverseKinetics(beta_vector=beta_vector, precursor_constants=precursor_constants, period=period, dt=dt,
+                                total_beta=total_beta, precursor_density_initial=precursor_density_initial)
+    return processor.update(power)
@@ -0,0 +1,367 @@
+"""Module for linearizing the reactor dynamics about operating points and analysing their stability.
+
+The Jacobian of the full state derivative (see solver.state_deriv_array) is computed analytically. For stability
+analysis the reactivity components of the state are eliminated, since they are functions of the temperatures and the
+drum angle, which leaves the nine states (neutron population, precursor densities, moderator and fuel temperatures)
+with the drum angle as an input. All functions are vectorized over stacks of states or operating points, so a stability
+map over thousands of operating points is a handful of stacked-array operations.
+"""
+
+import numpy as np
+
+from eark import dynamics
+from eark.state import StateComponent
+
+NUM_REDUCED_STATES = StateComponent.TFuel + 1  # the reduced state is the leading components, up to and including TFuel
+CRITICAL_ANGLE_ITERS = 60
+
+
+def _fuel_reactivity_slope(temp_fuel: np.ndarray) -> np.ndarray:
+    """Fuel temperature reactivity coefficient per unit beta                   [1/K]"""
+    return 2 * dynamics.TEMP_FUEL_REACTIVITY_C1 * temp_fuel + dynamics.TEMP_FUEL_REACTIVITY_C2
+
+
+def _mod_reactivity_slope(temp_mod: np.ndarray) -> np.ndarray:
+    """Moderator temperature reactivity coefficient per unit beta              [1/K]"""
+    return 2 * dynamics.TEMP_MOD_REACTIVITY_C1 * temp_mod + dynamics.TEMP_MOD_REACTIVITY_C2
+
+
+def _drum_worth_slope(drum_angle: np.ndarray) -> np.ndarray:
+    """Differential control drum worth per unit beta                          [1/degree]"""
+    return (3 * dynamics.CON_DRUM_REACTIVITY_C1 * drum_angle ** 2 +
+            2 * dynamics.CON_DRUM_REACTIVITY_C2 * drum_angle +
+            dynamics.CON_DRUM_REACTIVITY_C3)
+
+
+def _drum_worth_curvature(drum_angle: np.ndarray) -> np.ndarray:
+    return 6 * dynamics.CON_DRUM_REACTIVITY_C1 * drum_angle + 2 * dynamics.CON_DRUM_REACTIVITY_C2
+
+
+def state_jacobian(state_array: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, total_beta: float, period: float,
+                   heat_coeff: float, mass_mod: float, heat_cap_mod: float, mass_flow: float, mass_fuel: float, heat_cap_fuel: float,
+                   temp_in: float, drum_speed: float = 0.0) -> np.ndarray:
+    """Compute the Jacobian of the state derivative with respect to the state
+
+    Args:
+        state_array:
+            ndarray, ... x 13 stack of state arrays
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        total_beta:
+            float, delayed neutron fraction                             []
+        period:
+            float, effective generation time                            [sec]
+        heat_coeff:
+            float, heat transfer coefficient of fuel and moderator      [J/K/sec]
+        mass_mod:
+            float, mass of moderator                                    [kg]
+        heat_cap_mod:
+            float, specific Heat capacity of moderator                  [J/kg/K]
+        mass_flow:
+            float, total moderator/coolant mass flow rate               [kg/sec]
+        mass_fuel:
+            float, mass of fuel                                         [kg]
+        heat_cap_fuel:
+            float, specific heat capacity of fuel                       [J/kg/K]
+        temp_in:
+            float, temperature of inlet coolant                         [K]
+        drum_speed:
+            float, default 0, rotation rate of control drums, may be a stack matching the state   [degrees/sec]
+
+    Returns:
+        ndarray, ... x 13 x 13 stack of Jacobians, entry [i, j] is the derivative of component i wrt component j
+    """
+    state_array = np.asarray(state_array, dtype=float)
+    power = state_array[..., StateComponent.NeutronPopulation]
+    temp_mod = state_array[..., StateComponent.TMod]
+    temp_fuel = state_array[..., StateComponent.TFuel]
+    total_rho = (state_array[..., StateComponent.RhoFuelTemp] + state_array[..., StateComponent.RhoModTemp] +
+                 state_array[..., StateComponent.RhoConDrum])
+    precursors = np.arange(StateComponent.PrecursorDensity1, StateComponent.TMod)
+    num_components = len(StateComponent)
+
+    jac = np.zeros(state_array.shape[:-1] + (num_components, num_components))
+    n, tm, tf = StateComponent.NeutronPopulation, StateComponent.TMod, StateComponent.TFuel
+
+    # Population dynamics
+    jac[..., n, n] = (total_rho - total_beta) / period
+    jac[..., n, precursors] = precursor_constants
+    for rho in (StateComponent.RhoFuelTemp, StateComponent.RhoModTemp, StateComponent.RhoConDrum):
+        jac[..., n, rho] = power / period
+    jac[..., precursors, n] = np.asarray(beta_vector) / period
+    jac[..., precursors, precursors] = -np.asarray(precursor_constants)
+
+    # Thermal dynamics
+    mod_exchange = heat_coeff / (mass_mod * heat_cap_mod)
+    mod_flow = 2 * mass_flow / mass_mod
+    fuel_exchange = heat_coeff / (mass_fuel * heat_cap_fuel)
+    jac[..., tm, tf] = mod_exchange
+    jac[..., tm, tm] = -mod_exchange - mod_flow
+    jac[..., tf, n] = 1 / (mass_fuel * heat_cap_fuel)
+    jac[..., tf, tf] = -fuel_exchange
+    jac[..., tf, tm] = fuel_exchange
+
+    # Reactivity, each temperature reactivity derivative is beta * slope(T) * dT/dt
+    dtemp_mod = dynamics.mod_temp_deriv(heat_coeff=heat_coeff, mass_mod=mass_mod, heat_cap_mod=heat_cap_mod, mass_flow=mass_flow,
+                                        temp_fuel=temp_fuel, temp_mod=temp_mod, temp_in=temp_in)
+    dtemp_fuel = dynamics.fuel_temp_deriv(power=power, mass_fuel=mass_fuel, heat_cap_fuel=heat_cap_fuel, heat_coeff=heat_coeff,
+                                          temp_fuel=temp_fuel, temp_mod=temp_mod)
+    fuel_slope = total_beta * _fuel_reactivity_slope(temp_fuel)
+    mod_slope = total_beta * _mod_reactivity_slope(temp_mod)
+    rf, rm = StateComponent.RhoFuelTemp, StateComponent.RhoModTemp
+    jac[..., rf, :] = fuel_slope[..., np.newaxis] * jac[..., tf, :]
+    jac[..., rf, tf] += total_beta * 2 * dynamics.TEMP_FUEL_REACTIVITY_C1 * dtemp_fuel
+    jac[..., rm, :] = mod_slope[..., np.newaxis] * jac[..., tm, :]
+    jac[..., rm, tm] += total_beta * 2 * dynamics.TEMP_MOD_REACTIVITY_C1 * dtemp_mod
+
+    jac[..., StateComponent.RhoConDrum, StateComponent.DrumAngle] = \
+        total_beta * _drum_worth_curvature(state_array[..., StateComponent.DrumAngle]) * drum_speed
+    return jac
+
+
+def critical_drum_angle(rho: np.ndarray, total_beta: float) -> np.ndarray:
+    """Find the drum angle at which the control drums contribute reactivity "rho"
+
+    The search is restricted to the monotonic part of the drum worth curve, between its extrema.
+
+    Args:
+        rho:
+            ndarray, required control drum reactivity                   [dk/k]
+        total_beta:
+            float, delayed neutron fraction                             []
+
+    Returns:
+        ndarray, drum angle, NaN where the reactivity is out of the range of the drums   [degrees]
+    """
+    rho = np.asarray(rho, dtype=float)
+    c1, c2, c3 = dynamics.CON_DRUM_REACTIVITY_C1, dynamics.CON_DRUM_REACTIVITY_C2, dynamics.CON_DRUM_REACTIVITY_C3
+    extrema = np.sort((-2 * c2 + np.array([-1, 1]) * np.sqrt(4 * c2 ** 2 - 12 * c1 * c3)) / (6 * c1))
+    lo = np.full_like(rho, extrema[0])
+    hi = np.full_like(rho, extrema[1])
+    increasing = _drum_worth_slope(np.mean(extrema)) > 0
+
+    for _ in range(CRITICAL_ANGLE_ITERS):
+        mid = 0.5 * (lo + hi)
+        below = (dynamics.con_drum_reactivity(beta=total_beta, drum_angle=mid) < rho) == increasing
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+
+    angle = 0.5 * (lo + hi)
+    rho_range = np.sort(dynamics.con_drum_reactivity(beta=total_beta, drum_angle=extrema))
+    return np.where((rho >= rho_range[0]) & (rho <= rho_range[1]), angle, np.nan)
+
+
+def steady_state(power: np.ndarray, mass_flow: np.ndarray, temp_in: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray,
+                 total_beta: float, period: float, heat_coeff: float, heat_cap_mod: float) -> np.ndarray:
+    """Compute the equilibrium state for each operating point
+
+    The precursors are in equilibrium with the power, the temperatures are those at which the heat generated is carried
+    away by the coolant, and the drums are at the angle which makes the reactor critical.
+
+    Args:
+        power:
+            ndarray, reactor power                                      [W]
+        mass_flow:
+            ndarray, total moderator/coolant mass flow rate             [kg/sec]
+        temp_in:
+            ndarray, temperature of inlet coolant                       [K]
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        total_beta:
+            float, delayed neutron fraction                             []
+        period:
+            float, effective generation time                            [sec]
+        heat_coeff:
+            float, heat transfer coefficient of fuel and moderator      [J/K/sec]
+        heat_cap_mod:
+            float, specific Heat capacity of moderator                  [J/kg/K]
+
+    Returns:
+        ndarray, ... x 13 stack of state arrays, with the operating point arrays broadcast together
+    """
+    power, mass_flow, temp_in = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (power, mass_flow, temp_in)))
+    temp_mod = temp_in + power / (2 * mass_flow * heat_cap_mod)
+    temp_fuel = temp_mod + power / heat_coeff
+    rho_fuel_temp = dynamics.temp_fuel_reactivity(beta=total_beta, temp_fuel=temp_fuel)
+    rho_mod_temp = dynamics.temp_mod_reactivity(beta=total_beta, temp_mod=temp_mod)
+
+    # The population is stationary when the total reactivity balances the difference between beta and the group betas
+    rho_con_drum = total_beta - np.sum(beta_vector) - rho_fuel_temp - rho_mod_temp
+    drum_angle = critical_drum_angle(rho=rho_con_drum, total_beta=total_beta)
+
+    state_array = np.empty(power.shape + (len(StateComponent),))
+    state_array[..., StateComponent.NeutronPopulation] = power
+    state_array[..., StateComponent.PrecursorDensity1:StateComponent.TMod] = \
+        power[..., np.newaxis] * np.asarray(beta_vector) / (np.asarray(precursor_constants) * period)
+    state_array[..., StateComponent.TMod] = temp_mod
+    state_array[..., StateComponent.TFuel] = temp_fuel
+    state_array[..., StateComponent.RhoFuelTemp] = rho_fuel_temp
+    state_array[..., StateComponent.RhoModTemp] = rho_mod_temp
+    state_array[..., StateComponent.DrumAngle] = drum_angle
+    state_array[..., StateComponent.RhoConDrum] = rho_con_drum
+    return state_array
+
+
+class LinearModel:
+    __slots__ = ('_a', '_b', '_eig')
+
+    def __init__(self, a: np.ndarray, b: np.ndarray):
+        """Stack of linear models dx/dt = A x + B u with the power as output
+
+        Args:
+            a:
+                ndarray, ... x 9 x 9 stack of state matrices
+            b:
+                ndarray, ... x 9 stack of input vectors, for the drum angle as input
+        """
+        self._a = a
+        self._b = b
+        self._eig = None
+
+    @property
+    def a(self):
+        return self._a
+
+    @property
+    def b(self):
+        return self._b
+
+    def _eigen(self):
+        if self._eig is None:
+            self._eig = np.linalg.eig(self._a)
+        return self._eig
+
+    @property
+    def eigenvalues(self) -> np.ndarray:
+        """... x 9 stack of eigenvalues, in order of decreasing real part"""
+        values = self._eigen()[0]
+        return np.take_along_axis(values, np.argsort(-values.real, axis=-1), axis=-1)
+
+    @property
+    def stable(self) -> np.ndarray:
+        """Boolean stack, True where all eigenvalues have negative real part"""
+        return np.all(self._eigen()[0].real < 0, axis=-1)
+
+    @property
+    def time_constants(self) -> np.ndarray:
+        """... x 9 stack of mode time constants -1 / Re(eigenvalue), dominant (slowest) first, negative if unstable   [sec]"""
+        with np.errstate(divide='ignore'):
+            return -1.0 / self.eigenvalues.real
+
+    def transfer_function(self, frequencies: np.ndarray) -> np.ndarray:
+        """Evaluate the power to drum angle transfer function
+
+        The transfer function is expanded in partial fractions over the eigenvalues, so evaluating it at many
+        frequencies costs one eigendecomposition per operating point.
+
+        Args:
+            frequencies:
+                ndarray, 1D array of angular frequencies                [rad/sec]
+
+        Returns:
+            ndarray, ... x len(frequencies) stack of complex gains      [W/degree]
+        """
+        values, vectors = self._eigen()
+        modal_input = np.linalg.solve(vectors, self._b[..., np.newaxis].astype(vectors.dtype))[..., 0]
+        residues = vectors[..., StateComponent.NeutronPopulation, :] * modal_input
+        s = 1j * np.asarray(frequencies, dtype=float)
+        return np.sum(residues[..., np.newaxis, :] / (s[:, np.newaxis] - values[..., np.newaxis, :]), axis=-1)
+
+
+def linearize(state_array: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, total_beta: float, period: float,
+              heat_coeff: float, mass_mod: float, heat_cap_mod: float, mass_flow: float, mass_fuel: float, heat_cap_fuel: float,
+              temp_in: float) -> LinearModel:
+    """Linearize the reduced dynamics about a stack of states, with the drum angle as input
+
+    Args:
+        state_array:
+            ndarray, ... x 13 stack of state arrays, see "steady_state"
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        total_beta:
+            float, delayed neutron fraction                             []
+        period:
+            float, effective generation time                            [sec]
+        heat_coeff:
+            float, heat transfer coefficient of fuel and moderator      [J/K/sec]
+        mass_mod:
+            float, mass of moderator                                    [kg]
+        heat_cap_mod:
+            float, specific Heat capacity of moderator                  [J/kg/K]
+        mass_flow:
+            ndarray, total moderator/coolant mass flow rate, scalar or matching the stack   [kg/sec]
+        mass_fuel:
+            float, mass of fuel                                         [kg]
+        heat_cap_fuel:
+            float, specific heat capacity of fuel                       [J/kg/K]
+        temp_in:
+            ndarray, temperature of inlet coolant, scalar or matching the stack             [K]
+
+    Returns:
+        LinearModel, the stack of reduced linear models
+    """
+    state_array = np.asarray(state_array, dtype=float)
+    jac = state_jacobian(state_array=state_array, beta_vector=beta_vector, precursor_constants=precursor_constants,
+                         total_beta=total_beta, period=period, heat_coeff=heat_coeff, mass_mod=mass_mod, heat_cap_mod=heat_cap_mod,
+                         mass_flow=mass_flow, mass_fuel=mass_fuel, heat_cap_fuel=heat_cap_fuel, temp_in=temp_in)
+    reduced = slice(0, NUM_REDUCED_STATES)
+    a = jac[..., reduced, reduced].copy()
+    power = state_array[..., StateComponent.NeutronPopulation]
+
+    # Substitute the reactivity states by their dependence on the temperatures
+    n, tm, tf = StateComponent.NeutronPopulation, StateComponent.TMod, StateComponent.TFuel
+    a[..., n, tf] += power / period * total_beta * _fuel_reactivity_slope(state_array[..., tf])
+    a[..., n, tm] += power / period * total_beta * _mod_reactivity_slope(state_array[..., tm])
+
+    b = np.zeros(state_array.shape[:-1] + (NUM_REDUCED_STATES,))
+    b[..., n] = power / period * total_beta * _drum_worth_slope(state_array[..., StateComponent.DrumAngle])
+    return LinearModel(a=a, b=b)
+
+
+def operating_points(power: np.ndarray, mass_flow: np.ndarray, temp_in: np.ndarray, beta_vector: np.ndarray,
+                     precursor_constants: np.ndarray, total_beta: float, period: float, heat_coeff: float, mass_mod: float,
+                     heat_cap_mod: float, mass_fuel: float, heat_cap_fuel: float) -> LinearModel:
+    """Linearize the dynamics about the steady states of a grid of operating points
+
+    Args:
+        power:
+            ndarray, reactor power                                      [W]
+        mass_flow:
+            ndarray, total moderator/coolant mass flow rate             [kg/sec]
+        temp_in:
+            ndarray, temperature of inlet coolant                       [K]
+        beta_vector:
+            ndarray, 1x6 vector of beta_i                               []
+        precursor_constants:
+            ndarray, 1x6 vector of lambda_i                             [1/sec]
+        total_beta:
+            float, delayed neutron fraction                             []
+        period:
+            float, effective generation time                            [sec]
+        heat_coeff:
+            float, heat transfer coefficient of fuel and moderator      [J/K/sec]
+        mass_mod:
+            float, mass of moderator                                    [kg]
+        heat_cap_mod:
+            float, specific Heat capacity of moderator                  [J/kg/K]
+        mass_fuel:
+            float, mass of fuel                                         [kg]
+        heat_cap_fuel:
+            float, specific heat capacity of fuel                       [J/kg/K]
+
+    Returns:
+        LinearModel, stack of linear models with the broadcast shape of the operating point arrays
+    """
+    power, mass_flow, temp_in = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (power, mass_flow, temp_in)))
+    state_array = steady_state(power=power, mass_flow=mass_flow, temp_in=temp_in, beta_vector=beta_vector,
+                               precursor_constants=precursor_constants, total_beta=total_beta, period=period, heat_coeff=heat_coeff,
+                               heat_cap_mod=heat_cap_mod)
+    return linearize(state_array=state_array, beta_vector=beta_vector, precursor_constants=precursor_constants, total_beta=total_beta,
+                     period=period, heat_coeff=heat_coeff, mass_mod=mass_mod, heat_cap_mod=heat_cap_mod, mass_flow=mass_flow,
+                     mass_fuel=mass_fuel, heat_cap_fuel=heat_cap_fuel, temp_in=temp_in)
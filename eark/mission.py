@@ -0,0 +1,151 @@
+"""Module for mission timelines, transients made of consecutive phases with their own integrator settings.
+
+A nuclear thermal propulsion run has startup, full-power hold, throttle and shutdown phases with very different
+dynamics. Each Phase has its own duration, output resolution, integrator, tolerances and control rule, and may change
+operating parameters such as the mass flow. The phases are integrated in order, each starting from the exact final
+state array of the one before, and the results are stitched into one Solution. Control rules are evaluated at mission
+time, the time since the start of the mission plus "t_start".
+
+Sampled control rules are reset once at the start of the mission. A rule used in several phases keeps its controller
+state, such as the integral of a PID controller, and its sample schedule across the phase boundaries.
+"""
+
+import typing
+
+import numpy as np
+
+from eark import control
+from eark import solver
+from eark.control import ControlRule
+from eark.control import LinearControlRule
+from eark.solution import Solution
+
+PHASE_PARAMETERS = ('beta_vector', 'precursor_constants', 'total_beta', 'period', 'heat_coeff', 'mass_mod', 'heat_cap_mod', 'mass_flow',
+                    'mass_fuel', 'heat_cap_fuel', 'temp_in')
+
+
+class Phase:
+    __slots__ = ('duration', 'num_iters', 'drum_control_rule', 'method', 'rtol', 'atol', 'max_step', 'parameters', 'name')
+
+    def __init__(self, duration: float, num_iters: int = 100, drum_control_rule: ControlRule = None, method: str = solver.ODEINT,
+                 rtol: float = None, atol: float = None, max_step: float = None, parameters: typing.Dict[str, typing.Any] = None,
+                 name: str = None):
+        """A phase of a mission
+
+        Args:
+            duration:
+                float, duration of the phase                            [sec]
+            num_iters:
+                int, default 100, number of output times, including the start and end of the phase
+            drum_control_rule:
+                ControlRule, default None, control rule of the phase, defaults to holding the drums still
+            method:
+                str, default "odeint", integrator, "odeint" or a solve_ivp method such as "BDF"
+            rtol:
+                float, default None, relative tolerance, defaults to that of the integrator
+            atol:
+                float, default None, absolute tolerance, defaults to that of the integrator
+            max_step:
+                float, default None, largest step of the integrator, unlimited by default    [sec]
+            parameters:
+                dict, default None, values of the mission parameters (see PHASE_PARAMETERS) which differ in this phase
+            name:
+                str, default None, name of the phase
+        """
+        if duration <= 0:
+            raise ValueError('Phase duration must be positive, got: {}'.format(duration))
+        if num_iters < 2:
+            raise ValueError('A phase needs at least 2 output times, got: {}'.format(num_iters))
+        unknown = sorted(set(parameters or {}) - set(PHASE_PARAMETERS))
+        if unknown:
+            raise ValueError('Unknown phase parameters: {}, expected some of {}'.format(unknown, PHASE_PARAMETERS))
+        self.duration = duration
+        self.num_iters = num_iters
+        self.drum_control_rule = LinearControlRule(coeff=0, const=0.0) if drum_control_rule is None else drum_control_rule
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+        self.max_step = max_step
+        self.parameters = {} if parameters is None else dict(parameters)
+        self.name = name
+
+    def __repr__(self):
+        return 'Phase({}, {:.1f}s, {:d} points, {})'.format(self.name, self.duration, self.num_iters, self.method)
+
+
+class Mission:
+    def __init__(self, phases: typing.Sequence[Phase]):
+        """A sequence of phases
+
+        Args:
+            phases:
+                sequence of Phase, in order of time
+        """
+        if not phases:
+            raise ValueError('A mission needs at least one phase')
+        self.phases = list(phases)
+
+    def __repr__(self):
+        return 'Mission({})'.format(', '.join(repr(phase) for phase in self.phases))
+
+    @property
+    def duration(self) -> float:
+        return sum(phase.duration for phase in self.phases)
+
+    def boundaries(self, t_start: float = 0) -> np.ndarray:
+        """Start times of the phases followed by the end time of the mission  [sec]"""
+        return t_start + np.concatenate(([0.0], np.cumsum([phase.duration for phase in self.phases])))
+
+    def solve(self, state_initial: np.ndarray, beta_vector: np.ndarray, precursor_constants: np.ndarray, total_beta: float, period: float,
+              heat_coeff: float, mass_mod: float, heat_cap_mod: float, mass_flow: float, mass_fuel: float, heat_cap_fuel: float,
+              temp_in: float, t_start: float = 0) -> Solution:
+        """Integrate the phases in order and stitch the results
+
+        Args:
+            state_initial:
+                ndarray, state array at the start of the mission, see solver.initial_state
+            beta_vector:
+                ndarray, 1x6 vector of beta_i                           []
+            precursor_constants:
+                ndarray, 1x6 vector of lambda_i                         [1/sec]
+            total_beta:
+                float, delayed neutron fraction                         []
+            period:
+                float, effective generation time                        [sec]
+            heat_coeff:
+                float, heat transfer coefficient of fuel and moderator  [J/K/sec]
+            mass_mod:
+                float, mass of moderator                                [kg]
+            heat_cap_mod:
+                float, specific Heat capacity of moderator              [J/kg/K]
+            mass_flow:
+                float, total moderator/coolant mass flow rate           [kg/sec]
+            mass_fuel:
+                float, mass of fuel                                     [kg]
+            heat_cap_fuel:
+                float, specific heat capacity of fuel                   [J/kg/K]
+            temp_in:
+                float, temperature of inlet coolant                     [K]
+            t_start:
+                float, default 0, starting time of the mission          [sec]
+
+        Returns:
+            Solution, the stitched solution, with the states at the phase boundaries appearing once
+        """
+        parameters = dict(beta_vector=beta_vector, precursor_constants=precursor_constants, total_beta=total_beta, period=period,
+                          heat_coeff=heat_coeff, mass_mod=mass_mod, heat_cap_mod=heat_cap_mod, mass_flow=mass_flow, mass_fuel=mass_fuel,
+                          heat_cap_fuel=heat_cap_fuel, temp_in=temp_in)
+        boundaries = self.boundaries(t_start)
+        state_array = np.asarray(state_initial, dtype=float)
+        solutions = []
+        for phase in self.phases:
+            for rule in control.sampled_rules(phase.drum_control_rule):
+                rule.reset()
+        for phase, t0, t1 in zip(self.phases, boundaries[:-1], boundaries[1:]):
+            deriv_func = solver.state_deriv_func(drum_control_rule=phase.drum_control_rule, **dict(parameters, **phase.parameters))
+            t = np.linspace(t0, t1, phase.num_iters)
+            res = solver.integrate(deriv_func, state_array, t, phase.drum_control_rule, method=phase.method, rtol=phase.rtol,
+                                   atol=phase.atol, max_step=phase.max_step, reset_rules=False)
+            solutions.append(Solution(array=res, t=t))
+            state_array = res[-1]
+        return Solution.concatenate(solutions)
@@ -0,0 +1,45 @@
+"""Reference reactor parameters, shared by scripts/run.py, the scenario defaults and the unittests"""
+
+import numpy as np
+
+################## PHYSICS PARAMETERS #############
+POWER_INITIAL = 25e6                                          # initial Reactor Power                    [W]
+BETA = 0.0071                                                 # delayed neutron fraction
+BETA_VECTOR = np.array([2.23985e-4,
+                        1.18115e-3,
+                        1.16108e-3,
+                        3.29914e-3,
+                        1.00849e-3,
+                        3.57418e-4])
+PERIOD = 2.63382e-5                                           # effective generation time                [s]
+PRECURSOR_CONSTANTS = np.array([1.24906e-2,
+                                3.17621e-2,
+                                1.09665e-1,
+                                3.18385e-1,
+                                1.35073e0,
+                                8.73657e0])
+PRECURSOR_DENSITY_INITIAL = BETA_VECTOR / (PRECURSOR_CONSTANTS * PERIOD) * POWER_INITIAL
+
+
+################## TH PARAMETERS ##################
+HEAT_CAP_FUEL = 200                                           # specific Heat Capacity of Fuel           [J/kg/K]
+HEAT_CAP_MOD = 4000                                           # specific Heat Capacity of Moderator      [J/kg/K]
+HEAT_COEFF = 4e6                                              # heat transfer coefficient fuel/moderator [J/K/sec]
+MASS_FUEL = 575                                               # mass of Fuel                             [kg]
+MASS_MOD = 1000                                               # mass of Moderator                        [kg]
+MASS_FLOW = 22                                                # total moderator/coolant mass flow rate   [kg/sec]
+TEMP_IN = 300                                                 # inlet coolant temperature                [K]
+TEMP_MOD_INITIAL = TEMP_IN + \
+                   (POWER_INITIAL / (2 * MASS_FLOW * HEAT_CAP_MOD))
+
+TEMP_FUEL_INITIAL = TEMP_IN + \
+                    (1 / (2 * MASS_FLOW * HEAT_CAP_MOD) + (1 / HEAT_COEFF)) * POWER_INITIAL
+
+
+########### CONTROL DRUM PARAMETERS ################
+DRUM_ANGLE_INITIAL = 64.65                                    # initial angle of control drum            [deg]
+
+
+################## TIME PARAMETERS #################
+T_MAX = 100                                                   # end of the transient                     [sec]
+NUM_ITERS = 1000                                              # number of output times
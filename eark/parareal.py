@@ -0,0 +1,229 @@
+"""Module for parallel-in-time integration of long transients using the Parareal algorithm.
+
+The time interval is split into slices. A cheap coarse propagator (a few fixed steps of an L-stable implicit Runge-Kutta
+method per slice, see sdirk2) is run serially across the slices, while the accurate fine propagator is run on all slices concurrently
+in a process pool. The slice boundary states are corrected each iteration,
+
+    U[n + 1] = G(U_new[n]) + F(U_old[n]) - G(U_old[n])
+
+until the boundary states stop changing. After k iterations the first k slices are exact, so the iteration always
+terminates, and for smooth transients it converges in far fewer iterations than there are slices.
+
+References:
+    [1] Lions JL, Maday Y, Turinici G. A "parareal" in time discretization of PDEs. C R Acad Sci Paris. 2001;332:661-668.
+"""
+
+import concurrent.futures
+import time
+import typing
+
+import numpy as np
+from scipy.integrate import odeint
+from scipy.integrate import solve_ivp
+from scipy.linalg import lu_factor
+from scipy.linalg import lu_solve
+
+ODEINT = 'odeint'
+DEFAULT_NUM_SLICES = 8
+DEFAULT_TOLERANCE = 1e-7
+DEFAULT_COARSE_STEPS = 4
+NEWTON_TOLERANCE = 1e-10
+MAX_NEWTON_ITERS = 10
+
+
+def _fine(deriv_func: typing.Callable, state_initial: np.ndarray, t: np.ndarray, method: str, rtol: float, atol: float):
+    """Fine propagation over one slice, returns the states at "t" and the time spent"""
+    start = time.perf_counter()
+    if method == ODEINT:
+        res = odeint(deriv_func, state_initial, t, rtol=rtol, atol=atol)
+    else:
+        options = {key: value for key, value in (('rtol', rtol), ('atol', atol)) if value is not None}
+        res = solve_ivp(lambda t_, y: deriv_func(y, t_), (t[0], t[-1]), state_initial, method=method, t_eval=t, **options).y.T
+        res[0] = state_initial
+    return res, time.perf_counter() - start
+
+
+def _jacobian(deriv_func: typing.Callable, state: np.ndarray, t: float, deriv: np.ndarray) -> np.ndarray:
+    """Forward-difference Jacobian of the state derivative, with steps relative to the magnitude of each component"""
+    steps = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(state), 1.0)
+    jac = np.empty((len(state), len(state)))
+    for j, step in enumerate(steps):
+        perturbed = state.copy()
+        perturbed[j] += step
+        jac[:, j] = (deriv_func(perturbed, t) - deriv) / step
+    return jac
+
+
+def _newton_solve(deriv_func: typing.Callable, lu: tuple, base: np.ndarray, coeff: float, t: float, guess: np.ndarray,
+                  scale: np.ndarray) -> np.ndarray:
+    """Solve y = base + coeff * f(y, t) with a simplified Newton iteration on the factorization of I - coeff * J"""
+    y = guess.copy()
+    for _ in range(MAX_NEWTON_ITERS):
+        delta = lu_solve(lu, y - base - coeff * deriv_func(y, t))
+        y -= delta
+        if np.max(np.abs(delta) / scale) <= NEWTON_TOLERANCE:
+            break
+    return y
+
+
+def sdirk2(deriv_func: typing.Callable, state_initial: np.ndarray, t0: float, t1: float, num_steps: int) -> np.ndarray:
+    """Integrate from t0 to t1 with fixed steps of the two-stage, second order, L-stable SDIRK method, returns the state at t1
+
+    Both stages of a step share the matrix I - gamma * dt * J, with the finite-difference Jacobian J at the start of the
+    step, so a step costs one factorization of a small matrix and a few derivative evaluations. Being L-stable, steps
+    much longer than the prompt neutron time scale damp the prompt transient as the prompt jump approximation does.
+
+    References:
+        [1] Alexander R. Diagonally implicit Runge-Kutta methods for stiff ODEs. SIAM J Numer Anal. 1977;14:1006-1021.
+    """
+    gamma = 1 - np.sqrt(0.5)
+    dt = (t1 - t0) / num_steps
+    state = np.array(state_initial, dtype=float)
+    identity = np.eye(len(state))
+    for i in range(num_steps):
+        t = t0 + i * dt
+        deriv = deriv_func(state, t)
+        lu = lu_factor(identity - gamma * dt * _jacobian(deriv_func, state, t, deriv))
+        scale = np.maximum(np.abs(state), 1.0)
+        stage = _newton_solve(deriv_func, lu, state, gamma * dt, t + gamma * dt, state, scale)
+        slope = (stage - state) / (gamma * dt)
+        base = state + (1 - gamma) * dt * slope
+        state = _newton_solve(deriv_func, lu, base, gamma * dt, t + dt, stage, scale)
+    return state
+
+
+class Parareal:
+    def __init__(self, num_slices: int = DEFAULT_NUM_SLICES, max_workers: int = None, tol: float = DEFAULT_TOLERANCE,
+                 max_iters: int = None, coarse_steps: int = DEFAULT_COARSE_STEPS, fine_method: str = ODEINT, fine_rtol: float = None,
+                 fine_atol: float = None):
+        """Parareal integrator settings, the statistics of the most recent integration are stored on the instance
+
+        Args:
+            num_slices:
+                int, default 8, number of time slices
+            max_workers:
+                int, default None, size of the process pool, defaults to the number of processors
+            tol:
+                float, default 1e-7, convergence tolerance on the change of the slice boundary states, relative to the
+                largest magnitude of each state component
+            max_iters:
+                int, default None, maximum number of iterations, defaults to the number of slices (exact)
+            coarse_steps:
+                int, default 4, number of steps of the coarse propagator per slice, see sdirk2
+            fine_method:
+                str, default "odeint", fine propagator, "odeint" or a solve_ivp method such as "Radau"
+            fine_rtol:
+                float, default None, relative tolerance of the fine propagator, defaults to that of the integrator
+            fine_atol:
+                float, default None, absolute tolerance of the fine propagator, defaults to that of the integrator
+        """
+        if num_slices < 1:
+            raise ValueError('Number of slices must be positive, got: {}'.format(num_slices))
+        if coarse_steps < 1:
+            raise ValueError('Number of coarse steps must be positive, got: {}'.format(coarse_steps))
+        self.num_slices = num_slices
+        self.max_workers = max_workers
+        self.tol = tol
+        self.max_iters = max_iters
+        self.coarse_steps = coarse_steps
+        self.fine_method = fine_method
+        self.fine_rtol = fine_rtol
+        self.fine_atol = fine_atol
+
+        self.iterations = 0
+        self.wall_time = 0.0
+        self.fine_time = 0.0
+        self.serial_time = 0.0
+        self.critical_time = 0.0
+
+    def __repr__(self):
+        return 'Parareal({:d} slices, {:d} iterations, {:.2f}s wall, {:.2f}x speedup)'.format(self.num_slices, self.iterations,
+                                                                                            self.wall_time, self.speedup)
+
+    @property
+    def speedup(self) -> float:
+        """Estimated speedup of the most recent integration over serial fine integration, with one worker per slice
+
+        The serial cost is the time spent by the fine propagator on its first pass over all slices, which is the cost of
+        integrating the whole interval with the fine propagator. The parallel cost is the critical path: the slowest fine
+        slice of every iteration plus the serial coarse sweeps. Unlike the measured wall time, the estimate does not
+        depend on the number of processors of the machine it was measured on or on the process pool overhead.
+        """
+        return self.serial_time / self.critical_time if self.critical_time > 0 else float('nan')
+
+    def _coarse(self, deriv_func: typing.Callable, state_initial: np.ndarray, t0: float, t1: float) -> np.ndarray:
+        return sdirk2(deriv_func, state_initial, t0, t1, self.coarse_steps)
+
+    def integrate(self, deriv_func: typing.Callable, state_initial: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """Integrate the state derivative over the times "t"
+
+        Args:
+            deriv_func:
+                callable, picklable state derivative with the odeint "func" signature
+            state_initial:
+                ndarray, state array at t[0]
+            t:
+                ndarray, increasing output times, t[0] is the initial time  [sec]
+
+        Returns:
+            ndarray, len(t) x len(state_initial) array of states at times "t"
+        """
+        start = time.perf_counter()
+        self.critical_time = 0.0
+        num_slices = max(1, min(self.num_slices, len(t) - 1))
+        max_iters = num_slices if self.max_iters is None else min(self.max_iters, num_slices)
+        bounds = np.unique(np.round(np.linspace(0, len(t) - 1, num_slices + 1)).astype(int))
+        num_slices = len(bounds) - 1
+
+        # Initial serial coarse pass
+        coarse_start = time.perf_counter()
+        boundary = np.empty((num_slices + 1, len(state_initial)))
+        coarse = np.empty((num_slices, len(state_initial)))
+        boundary[0] = state_initial
+        for n in range(num_slices):
+            coarse[n] = self._coarse(deriv_func, boundary[n], t[bounds[n]], t[bounds[n + 1]])
+            boundary[n + 1] = coarse[n]
+        coarse_time = time.perf_counter() - coarse_start
+
+        res = np.empty((len(t), len(state_initial)))
+        self.iterations = 0
+        self.fine_time = 0.0
+        self.serial_time = 0.0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for k in range(max_iters):
+                # Slices before k have exact initial states from the previous iteration and need not be repeated
+                futures = {n: executor.submit(_fine, deriv_func, boundary[n], t[bounds[n]:bounds[n + 1] + 1], self.fine_method,
+                                              self.fine_rtol, self.fine_atol)
+                           for n in range(k, num_slices)}
+                fine = np.empty((num_slices, len(state_initial)))
+                slowest = 0.0
+                for n, future in futures.items():
+                    segment, elapsed = future.result()
+                    res[bounds[n]:bounds[n + 1] + 1] = segment
+                    fine[n] = segment[-1]
+                    self.fine_time += elapsed
+                    slowest = max(slowest, elapsed)
+                    if k == 0:
+                        self.serial_time += elapsed
+                self.iterations = k + 1
+                self.critical_time += slowest
+
+                # Serial correction sweep
+                coarse_start = time.perf_counter()
+                previous = boundary.copy()
+                boundary[k + 1] = fine[k]
+                for n in range(k + 1, num_slices):
+                    predicted = self._coarse(deriv_func, boundary[n], t[bounds[n]], t[bounds[n + 1]])
+                    boundary[n + 1] = predicted + fine[n] - coarse[n]
+                    coarse[n] = predicted
+
+                coarse_time += time.perf_counter() - coarse_start
+
+                scale = np.max(np.abs(boundary), axis=0)
+                scale[scale == 0] = 1.0
+                if np.max(np.abs(boundary - previous) / scale) <= self.tol:
+                    break
+
+        self.critical_time += coarse_time
+        self.wall_time = time.perf_counter() - start
+        return res
@@ -0,0 +1,142 @@
+"""Module for temperature-dependent material and coolant properties.
+
+Properties are represented by PropertyTables, which resample property data or an (expensive) property function once
+onto a uniform temperature grid. Evaluating a table is then an O(1) index computation and a linear interpolation, cheap
+enough for the right hand side of the integrator and vectorized over arrays of temperatures. Outside the grid the
+property is held at its value at the nearest end.
+
+The solver accepts a float or a PropertyTable for each of the fuel and moderator heat capacities and the heat transfer
+coefficient. The fuel heat capacity is evaluated at the fuel temperature, the others at the moderator temperature.
+
+References:
+    [1] Chase MW. NIST-JANAF Thermochemical Tables, 4th ed. J Phys Chem Ref Data Monograph 9; 1998.
+"""
+
+import functools
+import typing
+
+import numpy as np
+
+DEFAULT_NUM_POINTS = 1024
+GAS_CONSTANT = 8.314462618                                     # molar gas constant                       [J/mol/K]
+HYDROGEN_MOLAR_MASS = 2.01588e-3                               # molar mass of H2                         [kg/mol]
+
+# Isobaric molar heat capacity of ideal gas H2, from [1]
+HYDROGEN_HEAT_CAPACITY_TEMPS = np.array([300, 400, 500, 600, 700, 800, 900, 1000, 1100, 1200, 1300, 1400, 1500, 1600, 1700, 1800,
+                                         1900, 2000, 2200, 2400, 2600, 2800, 3000], dtype=float)                    # [K]
+HYDROGEN_MOLAR_HEAT_CAPACITY = np.array([28.85, 29.18, 29.26, 29.33, 29.44, 29.62, 29.88, 30.20, 30.58, 30.99, 31.42, 31.86,
+                                         32.30, 32.72, 33.13, 33.52, 33.88, 34.22, 34.83, 35.35, 35.80, 36.19, 36.54])  # [J/mol/K]
+
+
+class PropertyTable:
+    __slots__ = ('temp_min', 'temp_max', 'num_points', 'name', '_inv_spacing', '_values', '_slopes', '_value_list', '_slope_list')
+
+    def __init__(self, temps: np.ndarray, values: np.ndarray, num_points: int = DEFAULT_NUM_POINTS, name: str = None):
+        """Property tabulated on a uniform temperature grid, resampled from data by linear interpolation
+
+        Args:
+            temps:
+                ndarray, increasing temperatures of the data             [K]
+            values:
+                ndarray, property values at "temps"
+            num_points:
+                int, default 1024, number of grid points between the first and last data temperature
+            name:
+                str, default None, name of the property
+        """
+        temps = np.asarray(temps, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if temps.ndim != 1 or temps.shape != values.shape or len(temps) < 2:
+            raise ValueError('Property data must be two 1D arrays of equal length of at least 2, got: {} and {}'.format(temps.shape,
+                                                                                                                    values.shape))
+        if np.any(np.diff(temps) <= 0):
+            raise ValueError('Property data temperatures must be increasing')
+        if num_points < 2:
+            raise ValueError('A property table needs at least 2 points, got: {}'.format(num_points))
+        self.temp_min = float(temps[0])
+        self.temp_max = float(temps[-1])
+        self.num_points = num_points
+        self.name = name
+
+        grid = np.linspace(self.temp_min, self.temp_max, num_points)
+        self._inv_spacing = (num_points - 1) / (self.temp_max - self.temp_min)
+        self._values = np.interp(grid, temps, values)
+        # Slope per grid interval, with a zero slope appended so that the last grid point needs no special case
+        self._slopes = np.append(np.diff(self._values), 0.0)
+        self._value_list = self._values.tolist()
+        self._slope_list = self._slopes.tolist()
+
+    def __repr__(self):
+        return 'PropertyTable({}, {:.0f}-{:.0f}K, {:d} points)'.format(self.name, self.temp_min, self.temp_max, self.num_points)
+
+    @staticmethod
+    def from_function(func: typing.Callable[[np.ndarray], np.ndarray], temp_min: float, temp_max: float,
+                      num_points: int = DEFAULT_NUM_POINTS, name: str = None) -> 'PropertyTable':
+        """Tabulate a property function, which is evaluated once on the grid
+
+        Args:
+            func:
+                callable, vectorized property as a function of temperature
+            temp_min:
+                float, lowest temperature of the table                  [K]
+            temp_max:
+                float, highest temperature of the table                 [K]
+            num_points:
+                int, default 1024, number of grid points
+            name:
+                str, default None, name of the property
+
+        Returns:
+            PropertyTable
+        """
+        temps = np.linspace(temp_min, temp_max, num_points)
+        return PropertyTable(temps, func(temps), num_points=num_points, name=name)
+
+    @staticmethod
+    def power_law(value_ref: float, temp_ref: float, exponent: float, temp_min: float, temp_max: float,
+                  num_points: int = DEFAULT_NUM_POINTS, name: str = None) -> 'PropertyTable':
+        """Tabulate the property value_ref * (T / temp_ref) ** exponent, e.g. a heat transfer coefficient correlation"""
+        return PropertyTable.from_function(lambda temp: value_ref * (temp / temp_ref) ** exponent, temp_min=temp_min, temp_max=temp_max,
+                                           num_points=num_points, name=name)
+
+    def _locate(self, temp: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+        x = np.clip((np.asarray(temp, dtype=float) - self.temp_min) * self._inv_spacing, 0, self.num_points - 1)
+        i = x.astype(int)
+        return i, x - i
+
+    def __call__(self, temp: typing.Union[float, np.ndarray]) -> typing.Union[float, np.ndarray]:
+        """Evaluate the property at the temperatures "temp", of any shape  [K]"""
+        if isinstance(temp, float):
+            # Scalar path for the integrator, avoiding the overhead of numpy on scalars
+            x = (temp - self.temp_min) * self._inv_spacing
+            x = 0.0 if x < 0.0 else (self.num_points - 1.0 if x > self.num_points - 1 else x)
+            i = int(x)
+            return self._value_list[i] + (x - i) * self._slope_list[i]
+        i, frac = self._locate(temp)
+        return self._values[i] + frac * self._slopes[i]
+
+    def derivative(self, temp: typing.Union[float, np.ndarray]) -> np.ndarray:
+        """Evaluate the temperature derivative of the property, zero outside the table  [1/K]"""
+        temp = np.asarray(temp, dtype=float)
+        i, _ = self._locate(temp)
+        slope = np.diff(self._values)[np.minimum(i, self.num_points - 2)] * self._inv_spacing
+        return np.where((temp < self.temp_min) | (temp > self.temp_max), 0.0, slope)
+
+
+def evaluate(prop: typing.Union[float, PropertyTable], temp: typing.Union[float, np.ndarray]) -> typing.Union[float, np.ndarray]:
+    """Evaluate a property which is either a constant or a PropertyTable at the temperatures "temp"  [K]"""
+    return prop(temp) if isinstance(prop, PropertyTable) else prop
+
+
+@functools.lru_cache(maxsize=None)
+def hydrogen_heat_capacity(num_points: int = DEFAULT_NUM_POINTS) -> PropertyTable:
+    """Specific isobaric heat capacity of ideal gas hydrogen over 300-3000 K [J/kg/K], cached per resolution"""
+    return PropertyTable(HYDROGEN_HEAT_CAPACITY_TEMPS, HYDROGEN_MOLAR_HEAT_CAPACITY / HYDROGEN_MOLAR_MASS, num_points=num_points,
+                         name='hydrogen heat capacity')
+
+
+@functools.lru_cache(maxsize=None)
+def hydrogen_density(pressure: float, num_points: int = DEFAULT_NUM_POINTS) -> PropertyTable:
+    """Ideal gas density of hydrogen at the pressure "pressure" [Pa] over 300-3000 K [kg/m^3], cached per pressure"""
+    return PropertyTable.from_function(lambda temp: pressure * HYDROGEN_MOLAR_MASS / (GAS_CONSTANT * temp), temp_min=300.0,
+                                       temp_max=3000.0, num_points=num_points, name='hydrogen density')
@@ -0,0 +1,152 @@
+"""Module for recording selected parts of a solution while it is integrated.
+
+By default "solve" stores every state component in float64 at every output time. A Recorder instead stores only the
+chosen components, optionally in a smaller floating point type and at a coarser cadence per component, and accumulates
+reductions (peak value, time of peak, time integral) over the full output grid. The integrator always works on the full
+double precision state, and the states are handed to the recorder in chunks so the full state history is never held in
+memory at once. The angles of individually modelled drums (see eark.drums) are always stored at every output time, in
+the columns after the components, so that Solution.drum_angles is available.
+"""
+
+import typing
+
+import numpy as np
+
+from eark.solution import Solution
+from eark.state import NUM_COMPONENTS
+from eark.state import StateComponent
+
+DEFAULT_CHUNK_SIZE = 10000   # number of output times handed to the recorder at once
+
+
+class Recorder:
+    def __init__(self, components: typing.Sequence[StateComponent] = None, cadence: typing.Dict[StateComponent, int] = None,
+                 dtype: np.dtype = np.float64, peaks: typing.Sequence[StateComponent] = (),
+                 integrals: typing.Sequence[StateComponent] = (), chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress: typing.Callable[[float], None] = None):
+        """Settings for recording a solution, passed to solver.solve as "record"
+
+        Reductions are evaluated on the full output grid in double precision, whether or not the component is recorded.
+        The time integral of the neutron population is the energy deposited over the transient.
+
+        Args:
+            components:
+                sequence of StateComponent, default None, components to store, defaults to all
+            cadence:
+                dict of StateComponent to int, default None, store the component at every n-th output time only.
+                Components not listed are stored at every output time
+            dtype:
+                numpy dtype, default float64, floating point type of the stored components
+            peaks:
+                sequence of StateComponent, default (), components for which the peak value and its time are tracked
+            integrals:
+                sequence of StateComponent, default (), components which are integrated over time (trapezoidal rule)
+            chunk_size:
+                int, default 10000, number of output times handed to the recorder at once, this bounds
+                the memory held by the integrator but does not change the states
+            progress:
+                callable, default None, called after each chunk with the fraction of the output times recorded so far
+        """
+        self.components = tuple(StateComponent) if components is None else tuple(StateComponent(c) for c in components)
+        self.cadence = {} if cadence is None else {StateComponent(c): int(n) for c, n in cadence.items()}
+        for component, stride in self.cadence.items():
+            if component not in self.components:
+                raise ValueError('Cadence given for unrecorded component: {}'.format(component.name))
+            if stride < 1:
+                raise ValueError('Cadence must be a positive integer, got: {} for {}'.format(stride, component.name))
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be positive, got: {}'.format(chunk_size))
+        self.dtype = np.dtype(dtype)
+        self.peaks = tuple(StateComponent(c) for c in peaks)
+        self.integrals = tuple(StateComponent(c) for c in integrals)
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+        self._t = None
+        self._indices = None
+        self._array = None
+        self._decimated = {}
+        self._peak = None
+        self._time_of_peak = None
+        self._integral = None
+        self._last = None
+
+    @property
+    def columns(self) -> typing.Tuple[StateComponent, ...]:
+        """The components stored at every output time"""
+        return tuple(c for c in self.components if self.cadence.get(c, 1) == 1)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the stored components of the current recording  [bytes]"""
+        if self._array is None:
+            return 0
+        return self._array.nbytes + sum(values.nbytes for values in self._decimated.values())
+
+    def reset(self, t: np.ndarray, num_states: int = NUM_COMPONENTS):
+        """Allocate the storage for recording at the output times "t", discarding any previous recording
+
+        Args:
+            t:
+                ndarray, output times                                   [sec]
+            num_states:
+                int, default NUM_COMPONENTS, length of the state array, which ends with the drum angles of
+                individually modelled drums
+        """
+        self._t = np.asarray(t, dtype=float)
+        num_times = len(self._t)
+        self._indices = list(self.columns) + list(range(NUM_COMPONENTS, num_states))
+        self._array = np.empty((num_times, len(self._indices)), dtype=self.dtype)
+        self._decimated = {c: np.empty((num_times - 1) // stride + 1, dtype=self.dtype) for c, stride in self.cadence.items()
+                           if stride > 1}
+        self._peak = np.full(len(self.peaks), -np.inf)
+        self._time_of_peak = np.full(len(self.peaks), np.nan)
+        self._integral = np.zeros(len(self.integrals))
+        self._last = None
+
+    def update(self, start: int, states: np.ndarray):
+        """Record the states at consecutive output times t[start:start + len(states)]
+
+        Args:
+            start:
+                int, index of the output time of the first state
+            states:
+                ndarray, num_states x num_components array of full precision states
+        """
+        stop = start + len(states)
+        self._array[start:stop] = states[:, self._indices]
+        for component, values in self._decimated.items():
+            stride = self.cadence[component]
+            first = -(-start // stride) * stride
+            values[first // stride:(stop - 1) // stride + 1] = states[first - start::stride, component]
+
+        if self.peaks:
+            peak_states = states[:, list(self.peaks)]
+            i = np.argmax(peak_states, axis=0)
+            peak = peak_states[i, np.arange(len(self.peaks))]
+            higher = peak > self._peak
+            self._peak = np.where(higher, peak, self._peak)
+            self._time_of_peak = np.where(higher, self._t[start + i], self._time_of_peak)
+
+        if self.integrals:
+            t = self._t[start:stop]
+            y = states[:, list(self.integrals)]
+            if self._last is not None:
+                t = np.concatenate(([self._last[0]], t))
+                y = np.concatenate((self._last[1][np.newaxis], y))
+            self._integral = self._integral + np.sum(0.5 * (y[1:] + y[:-1]) * np.diff(t)[:, np.newaxis], axis=0)
+            self._last = (t[-1], y[-1])
+
+        if self.progress is not None:
+            self.progress(stop / len(self._t))
+
+    def solution(self) -> Solution:
+        """The recorded solution"""
+        decimated = {c: (self._t[::self.cadence[c]], values) for c, values in self._decimated.items()}
+        reductions = {}
+        for component, peak, time_of_peak in zip(self.peaks, self._peak, self._time_of_peak):
+            reductions[('peak', component)] = peak
+            reductions[('time_of_peak', component)] = time_of_peak
+        for component, integral in zip(self.integrals, self._integral):
+            reductions[('integral', component)] = integral
+        return Solution(array=self._array, t=self._t, components=self.columns, decimated=decimated, reductions=reductions)
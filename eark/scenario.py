@@ -0,0 +1,314 @@
+"""Module for defining transients in scenario files, so that variants of a run need no copied scripts.
+
+A scenario is a nested mapping, read from a JSON or TOML file, with the sections
+
+    physics:             power_initial, beta_vector, precursor_constants, total_beta, period, precursor_density_initial
+    thermal_hydraulics:  heat_coeff, mass_mod, heat_cap_mod, mass_flow, mass_fuel, heat_cap_fuel, temp_in,
+                         temp_mod_initial, temp_fuel_initial
+    control:             drum_angle_initial, rules (list of control rules, each with a "type" and its arguments),
+                         optional drums (Drums arguments, each bank with its drums, name and its own list of rules)
+    time:                t_start, t_max, num_iters
+    record:              optional Recorder arguments, components are given by their StateComponent names
+
+The keys are the arguments of solver.solve. Missing values are taken from DEFAULT_CONFIG, which holds the reference
+parameters of eark.parameters; missing initial precursor densities and temperatures default to the equilibrium at the initial power.
+For example, in TOML:
+
+    name = "drum_withdrawal"
+
+    [time]
+    t_max = 100
+
+    [[control.rules]]
+    type = "linear"
+    coeff = 0
+    const = -1.0
+    t_min = 2
+    t_max = 4
+"""
+
+import copy
+import hashlib
+import json
+import pathlib
+import typing
+
+import numpy as np
+
+import eark
+from eark import control
+from eark import parameters
+from eark import solver
+from eark.drums import DrumBank
+from eark.drums import Drums
+from eark.recording import Recorder
+from eark.solution import Solution
+from eark.state import StateComponent
+
+try:
+    import tomllib as _toml  # python >= 3.11
+except ImportError:
+    try:
+        import toml as _toml
+    except ImportError:
+        _toml = None
+
+DEFAULT_CONFIG = {
+    'physics': {
+        'power_initial': parameters.POWER_INITIAL,
+        'beta_vector': parameters.BETA_VECTOR.tolist(),
+        'precursor_constants': parameters.PRECURSOR_CONSTANTS.tolist(),
+        'total_beta': parameters.BETA,
+        'period': parameters.PERIOD,
+    },
+    'thermal_hydraulics': {
+        'heat_coeff': parameters.HEAT_COEFF,
+        'mass_mod': parameters.MASS_MOD,
+        'heat_cap_mod': parameters.HEAT_CAP_MOD,
+        'mass_flow': parameters.MASS_FLOW,
+        'mass_fuel': parameters.MASS_FUEL,
+        'heat_cap_fuel': parameters.HEAT_CAP_FUEL,
+        'temp_in': parameters.TEMP_IN,
+    },
+    'control': {
+        'drum_angle_initial': parameters.DRUM_ANGLE_INITIAL,
+        'rules': [],
+    },
+    'time': {
+        't_start': 0,
+        't_max': parameters.T_MAX,
+        'num_iters': parameters.NUM_ITERS,
+    },
+}
+
+CONTROL_RULES = {
+    'linear': control.LinearControlRule,
+    'pid': control.PIDControlRule,
+    'fuel_temperature_hold': control.FuelTemperatureHoldControlRule,
+}
+
+PROGRESS_UPDATES = 20   # number of progress reports of a solve without a record section
+ARRAY_ARGUMENTS = ('beta_vector', 'precursor_constants', 'precursor_density_initial')
+SUMMARY_COMPONENTS = (('power', StateComponent.NeutronPopulation), ('temp_fuel', StateComponent.TFuel),
+                      ('temp_mod', StateComponent.TMod), ('drum_angle', StateComponent.DrumAngle))
+
+
+def _merge(base: dict, update: dict) -> dict:
+    """Recursively merge the mapping "update" into a copy of the mapping "base", replacing all but nested mappings"""
+    merged = copy.deepcopy(base)
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _parse_value(text: str):
+    """Parse an override value as JSON, falling back to the plain string"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_override(text: str) -> typing.Tuple[str, typing.Any]:
+    """Parse a command line override of the form "section.key=value", the value being JSON or a plain string"""
+    path, sep, value = text.partition('=')
+    if not sep or not path:
+        raise ValueError('Override must have the form "section.key=value", got: {}'.format(text))
+    return path.strip(), _parse_value(value.strip())
+
+
+def summarize(soln: Solution) -> dict:
+    """Summary metrics of a solution, for the recorded components"""
+    summary = {}
+    recorded = soln.recorded
+    for name, component in SUMMARY_COMPONENTS:
+        if component in recorded:
+            _, values = soln.decimated(component)
+            summary['max_' + name] = float(np.max(values))
+            summary['final_' + name] = float(values[-1])
+    if ('integral', StateComponent.NeutronPopulation) in soln.reductions:
+        summary['energy'] = float(soln.integral(StateComponent.NeutronPopulation))
+    elif StateComponent.NeutronPopulation in soln.components:
+        summary['energy'] = float(soln.energy[-1])
+    return summary
+
+
+def read_config(path: typing.Union[str, pathlib.Path]) -> dict:
+    """Read a scenario mapping from a JSON or TOML file"""
+    path = pathlib.Path(path)
+    if path.suffix == '.json':
+        with open(path, 'r') as fh:
+            return json.load(fh)
+    if path.suffix == '.toml':
+        if _toml is None:
+            raise ImportError('Reading TOML scenario files requires python >= 3.11 or the "toml" package, install it with '
+                              '"pip install toml" or use a JSON scenario file: {}'.format(path))
+        if _toml.__name__ == 'tomllib':
+            with open(path, 'rb') as fh:
+                return _toml.load(fh)
+        with open(path, 'r') as fh:
+            return _toml.load(fh)
+    raise ValueError('Unknown scenario file type: {}, expected .json or .toml'.format(path.suffix))
+
+
+class Scenario:
+    __slots__ = ('name', 'config')
+
+    def __init__(self, config: dict, name: str = None):
+        """A transient defined by a nested mapping of solve arguments, see the module docstring for the layout
+
+        Args:
+            config:
+                dict, scenario mapping, merged over DEFAULT_CONFIG
+            name:
+                str, default None, name of the scenario, defaults to the "name" entry of the mapping
+        """
+        config = dict(config)
+        config_name = config.pop('name', 'scenario')
+        self.name = config_name if name is None else name
+        self.config = _merge(DEFAULT_CONFIG, config)
+
+    def __repr__(self):
+        return 'Scenario({}, {})'.format(self.name, self.digest[:12])
+
+    @staticmethod
+    def load(path: typing.Union[str, pathlib.Path], overrides: typing.Dict[str, typing.Any] = None) -> 'Scenario':
+        """Read a scenario from a JSON or TOML file, named after the file unless the file gives a name
+
+        Args:
+            path:
+                str or Path, the scenario file
+            overrides:
+                dict, default None, values replacing those of the file, keyed by dotted paths such as "physics.total_beta"
+
+        Returns:
+            Scenario
+        """
+        config = read_config(path)
+        scenario = Scenario(config, name=config.get('name', pathlib.Path(path).stem))
+        return scenario.with_overrides(overrides) if overrides else scenario
+
+    def with_overrides(self, overrides: typing.Dict[str, typing.Any]) -> 'Scenario':
+        """Copy of the scenario with the values at the dotted paths replaced, integer keys index lists such as the
+        control rules, e.g. "control.rules.0.const"
+        """
+        config = copy.deepcopy(self.config)
+        for path, value in overrides.items():
+            keys = path.split('.')
+            section = config
+            for key in keys[:-1]:
+                if isinstance(section, list):
+                    section = section[int(key)]
+                else:
+                    section = section.setdefault(key, {})
+                if not isinstance(section, (dict, list)):
+                    raise ValueError('Override path {} does not name a section: {}'.format(path, key))
+            if isinstance(section, list):
+                section[int(keys[-1])] = copy.deepcopy(value)
+            else:
+                section[keys[-1]] = copy.deepcopy(value)
+        return Scenario(config, name=self.name)
+
+    @property
+    def digest(self) -> str:
+        """Hash of the scenario mapping and the eark version, identifying the results of the scenario"""
+        text = json.dumps({'version': eark.__version__, 'config': self.config}, sort_keys=True)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def drum_control_rule(self) -> control.ControlRule:
+        """Build the control rule, the sum of the rules in the control section"""
+        return self._control_rule(self.config['control']['rules'])
+
+    def _control_rule(self, specs: typing.Sequence[dict]) -> control.ControlRule:
+        """Build the sum of the control rules of a list of rule specifications"""
+        rules = []
+        for spec in specs:
+            kwargs = dict(spec)
+            rule_type = kwargs.pop('type')
+            if rule_type not in CONTROL_RULES:
+                raise ValueError('Unknown control rule type: {}, expected one of {}'.format(rule_type, sorted(CONTROL_RULES)))
+            if rule_type == 'fuel_temperature_hold':
+                kwargs.setdefault('total_beta', self.config['physics']['total_beta'])
+            rules.append(CONTROL_RULES[rule_type](**kwargs))
+        if not rules:
+            return control.LinearControlRule(coeff=0, const=0.0)
+        return rules[0] if len(rules) == 1 else control.CompositeControlRule(rules=rules)
+
+    def drums(self) -> typing.Optional[Drums]:
+        """Build the individually modelled drums of the control section, or None for the single drum angle
+
+        A bank without rules is driven by the rules of the control section, for example in TOML:
+
+            [control.drums]
+            num_drums = 12
+            stuck = [3]
+
+            [[control.drums.banks]]
+            drums = [0, 1, 2, 3, 4, 5]
+
+            [[control.drums.banks]]
+            drums = [6, 7, 8, 9, 10, 11]
+            rules = [{type = "linear", coeff = 0, const = 0.5, t_min = 2, t_max = 4}]
+        """
+        spec = self.config['control'].get('drums')
+        if not spec:
+            return None
+        kwargs = dict(spec)
+        if 'banks' in kwargs:
+            kwargs['banks'] = [DrumBank(drums=bank['drums'], name=bank.get('name'),
+                                        drum_control_rule=self._control_rule(bank['rules']) if bank.get('rules') else None)
+                               for bank in kwargs['banks']]
+        return Drums(**kwargs)
+
+    def recorder(self) -> typing.Optional[Recorder]:
+        """Build the recorder of the record section, or None to record everything"""
+        spec = self.config.get('record')
+        if not spec:
+            return None
+        kwargs = dict(spec)
+        for key in ('components', 'peaks', 'integrals'):
+            if key in kwargs:
+                kwargs[key] = [StateComponent[name] for name in kwargs[key]]
+        if 'cadence' in kwargs:
+            kwargs['cadence'] = {StateComponent[name]: stride for name, stride in kwargs['cadence'].items()}
+        return Recorder(**kwargs)
+
+    def solve_kwargs(self) -> dict:
+        """Keyword arguments of solver.solve, excluding the control rule and recorder"""
+        kwargs = {}
+        for section in ('physics', 'thermal_hydraulics', 'time'):
+            kwargs.update(self.config[section])
+        kwargs['drum_angle_initial'] = self.config['control']['drum_angle_initial']
+        for key in ARRAY_ARGUMENTS:
+            if key in kwargs:
+                kwargs[key] = np.asarray(kwargs[key], dtype=float)
+
+        # Equilibrium at the initial power, as in eark.parameters
+        power = kwargs['power_initial']
+        if 'precursor_density_initial' not in kwargs:
+            kwargs['precursor_density_initial'] = kwargs['beta_vector'] / (kwargs['precursor_constants'] * kwargs['period']) * power
+        temp_rise_mod = power / (2 * kwargs['mass_flow'] * kwargs['heat_cap_mod'])
+        kwargs.setdefault('temp_mod_initial', kwargs['temp_in'] + temp_rise_mod)
+        kwargs.setdefault('temp_fuel_initial', kwargs['temp_in'] + temp_rise_mod + power / kwargs['heat_coeff'])
+        return kwargs
+
+    def solve(self, jacobian: bool = False, statistics: solver.IntegratorStatistics = None,
+              progress: typing.Callable[[float], None] = None, method: str = solver.ODEINT, rtol: float = None,
+              atol: float = None, warm_start: solver.WarmStart = None) -> Solution:
+        """Solve the transient of the scenario, see solver.solve for the "jacobian", "statistics", "method", "rtol",
+        "atol" and "warm_start" options
+
+        "progress" is called with the fraction of the output times solved so far, after each chunk handed to the
+        recorder (see Recorder.progress). Without a record section everything is recorded, in PROGRESS_UPDATES chunks.
+        """
+        record = self.recorder()
+        if progress is not None:
+            if record is None:
+                record = Recorder(chunk_size=-(-self.config['time']['num_iters'] // PROGRESS_UPDATES))
+            record.progress = progress
+        return solver.solve(drum_control_rule=self.drum_control_rule(), record=record, method=method, rtol=rtol, atol=atol,
+                            jacobian=jacobian, statistics=statistics, drums=self.drums(), warm_start=warm_start,
+                            **self.solve_kwargs())
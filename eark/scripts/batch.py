@@ -0,0 +1,136 @@
+"""Batch runner for scenario files, installed as the "eark-batch" console command
+
+Each scenario is solved in a process pool and written to the output directory as "<name>.npz" (see Solution.save),
+with a "<name>.json" record holding the scenario digest and summary metrics. Scenarios whose record matches the
+current digest are skipped, unless a requested dashboard figure "<name>.png" is missing. A summary table of all
+scenarios is written to "summary.csv".
+
+Usage:
+    eark-batch scenarios/*.toml --output-dir results --workers 4 --set time.t_max=200
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import json
+import pathlib
+import sys
+import time
+import traceback
+import typing
+
+from eark.scenario import Scenario
+from eark.scenario import SUMMARY_COMPONENTS
+from eark.scenario import parse_override
+from eark.scenario import summarize
+
+SUMMARY_FILE = 'summary.csv'
+SUMMARY_FIELDS = ('name', 'status', 'digest', 'wall_time') + \
+                 tuple('{}_{}'.format(stat, name) for name, _ in SUMMARY_COMPONENTS for stat in ('max', 'final')) + \
+                 ('energy', 'error')
+
+
+def _paths(output_dir: pathlib.Path, name: str) -> typing.Tuple[pathlib.Path, pathlib.Path]:
+    return output_dir / '{}.npz'.format(name), output_dir / '{}.json'.format(name)
+
+
+def _figure_path(output_dir: pathlib.Path, name: str) -> pathlib.Path:
+    return output_dir / '{}.png'.format(name)
+
+
+def up_to_date(scenario: Scenario, output_dir: pathlib.Path, plot: bool = False) -> typing.Optional[dict]:
+    """The stored record of the scenario if its results, and its figure when plotting, are current, otherwise None"""
+    result_file, record_file = _paths(output_dir, scenario.name)
+    if not (result_file.exists() and record_file.exists()):
+        return None
+    if plot and not _figure_path(output_dir, scenario.name).exists():
+        return None
+    with open(record_file, 'r') as fh:
+        record = json.load(fh)
+    return record if record.get('digest') == scenario.digest else None
+
+
+def run_scenario(scenario: Scenario, output_dir: pathlib.Path, plot: bool = False) -> dict:
+    """Solve a scenario and write its results, returning its summary record. Errors are reported in the record"""
+    record = dict(name=scenario.name, digest=scenario.digest)
+    start = time.perf_counter()
+    try:
+        soln = scenario.solve()
+        result_file, record_file = _paths(output_dir, scenario.name)
+        soln.save(result_file)
+        if plot:
+            soln.plot_dashboard(output_file=_figure_path(output_dir, scenario.name).as_posix())
+        record.update(summarize(soln), status='solved', wall_time=time.perf_counter() - start, config=scenario.config)
+        with open(record_file, 'w') as fh:
+            json.dump(record, fh, indent=2, sort_keys=True)
+    except Exception:
+        record.update(status='failed', wall_time=time.perf_counter() - start, error=traceback.format_exc(limit=1).strip())
+    return record
+
+
+def write_summary(records: typing.List[dict], path: pathlib.Path):
+    with open(path, 'w', newline='') as fh:
+        writer = csv.DictWriter(fh, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+
+
+def run(scenarios: typing.List[Scenario], output_dir: pathlib.Path, max_workers: int = None, force: bool = False,
+        plot: bool = False) -> typing.List[dict]:
+    """Solve the scenarios in parallel, skipping those with current results, and write the summary table
+
+    Returns:
+        list of dict, the summary record of each scenario, in the order given
+    """
+    names = [scenario.name for scenario in scenarios]
+    duplicates = sorted(set(name for name in names if names.count(name) > 1))
+    if duplicates:
+        raise ValueError('Scenario names must be unique, got duplicates: {}'.format(duplicates))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    records = {}
+    pending = []
+    for scenario in scenarios:
+        record = None if force else up_to_date(scenario, output_dir, plot=plot)
+        if record is None:
+            pending.append(scenario)
+        else:
+            records[scenario.name] = dict(record, status='skipped')
+
+    if pending:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run_scenario, scenario, output_dir, plot): scenario.name for scenario in pending}
+            for future in concurrent.futures.as_completed(futures):
+                record = future.result()
+                records[record['name']] = record
+                print('{:<8s} {} ({:.2f}s)'.format(record['status'], record['name'], record['wall_time']))
+
+    records = [records[name] for name in names]
+    write_summary(records, output_dir / SUMMARY_FILE)
+    return records
+
+
+def main(argv: typing.List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='eark-batch', description='Solve eark scenario files in parallel')
+    parser.add_argument('scenarios', nargs='+', help='scenario files (.json or .toml)')
+    parser.add_argument('-o', '--output-dir', default='results', help='directory for results and the summary table')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes, defaults to the number of CPUs')
+    parser.add_argument('-s', '--set', dest='overrides', action='append', default=[], metavar='SECTION.KEY=VALUE',
+                        help='override a scenario value in all scenarios, the value is parsed as JSON if possible')
+    parser.add_argument('-f', '--force', action='store_true', help='solve all scenarios, even those with current results')
+    parser.add_argument('--plot', action='store_true', help='also write a dashboard figure for each scenario')
+    args = parser.parse_args(argv)
+
+    overrides = dict(parse_override(text) for text in args.overrides)
+    scenarios = [Scenario.load(path, overrides=overrides) for path in args.scenarios]
+    records = run(scenarios, pathlib.Path(args.output_dir), max_workers=args.workers, force=args.force, plot=args.plot)
+
+    failed = [record for record in records if record['status'] == 'failed']
+    for record in failed:
+        print('Scenario {} failed:\n{}'.format(record['name'], record['error']), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
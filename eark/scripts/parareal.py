@@ -0,0 +1,49 @@
+"""Benchmark of Parareal integration on a slow drum withdrawal, using the unittest parameters
+
+The drums are withdrawn at a constant speed for an hour and both the serial solve and the fine propagator use the
+implicit Radau integrator at a tight tolerance, so that the fine propagation dominates the cost of the coarse sweeps.
+The measured speedup is bounded by the number of processors of the machine, the estimated speedup is that of the
+critical path with one worker per slice, see Parareal.speedup.
+"""
+
+import os
+import time
+
+import numpy as np
+
+from eark.control import LinearControlRule
+from eark.parareal import Parareal
+from eark.tests import _parameters
+
+T_MAX = 3600                                                              # duration of the withdrawal   [s]
+NUM_ITERS = 3601                                                          # number of output times
+DRUM_SPEED = LinearControlRule(coeff=0, const=0.01, t_min=0, t_max=T_MAX)   # slow withdrawal           [degrees/s]
+METHOD = 'Radau'
+RTOL = 1e-10
+NUM_SLICES = 16
+
+
+def run(**kwargs):
+    return _parameters.solve(drum_control_rule=DRUM_SPEED, t_max=T_MAX, num_iters=NUM_ITERS, **kwargs)
+
+
+def main():
+    start = time.perf_counter()
+    serial = run(method=METHOD, rtol=RTOL)
+    serial_time = time.perf_counter() - start
+
+    parareal = Parareal(num_slices=NUM_SLICES, fine_method=METHOD, fine_rtol=RTOL)
+    soln = run(parareal=parareal)
+
+    error = np.max(np.abs(soln.array - serial.array) / np.max(np.abs(serial.array), axis=0))
+    print('Serial:   {:.2f}s'.format(serial_time))
+    print('Parareal: {:.2f}s on {:d} processors, {:d} iterations over {:d} slices'.format(parareal.wall_time, os.cpu_count(),
+                                                                                       parareal.iterations, parareal.num_slices))
+    print('Fine:     {:.2f}s first pass, {:.2f}s critical path'.format(parareal.serial_time, parareal.critical_time))
+    print('Speedup:  {:.2f}x measured, {:.2f}x estimated with one worker per slice'.format(serial_time / parareal.wall_time,
+                                                                                         parareal.speedup))
+    print('Max relative deviation from serial: {:.2e}'.format(error))
+
+
+if __name__ == '__main__':
+    main()
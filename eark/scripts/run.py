@@ -1,99 +1,40 @@
-import numpy as np
+"""Solve a single scenario file and plot its dashboard, the scenario defaults to the reference transient shipped with
+eark (eark/scenarios/reference.json). Results are written as by eark-batch, which solves many scenarios in parallel
 
-from eark import solver
-from eark.control import LinearControlRule
+Usage:
+    python -m eark.scripts.run my_scenario.toml --output-dir results --set time.t_max=200
+"""
 
-###################################################
-#         USER INPUTS - DEFINE QUANTITIES         #
-###################################################
+import argparse
+import pathlib
+import sys
+import typing
 
-################## PHYSICS PARAMETERS #############
+from eark.scenario import Scenario
+from eark.scenario import parse_override
+from eark.scripts import batch
 
+REFERENCE_SCENARIO = pathlib.Path(__file__).parent.parent / 'scenarios' / 'reference.json'
 
-POWER_INITIAL = 25e6                                          # initial Reactor Power                    [W]
-BETA = 0.0071                                                 # delayed neutron fraction
-BETA_VECTOR = np.array([2.23985e-4,
-                        1.18115e-3,
-                        1.16108e-3,
-                        3.29914e-3,
-                        1.00849e-3,
-                        3.57418e-4])
-PERIOD = 2.63382e-5                                           # effective generation time                [s]
-PRECURSOR_CONSTANTS = np.array([1.24906e-2,
-                                3.17621e-2,
-                                1.09665e-1,
-                                3.18385e-1,
-                                1.35073e0,
-                                8.73657e0])
-PRECURSOR_DENSITY_INITIAL = BETA_VECTOR / (PRECURSOR_CONSTANTS * PERIOD) * POWER_INITIAL
-
-
-################## TH PARAMETERS ##################
-HEAT_CAP_FUEL = 200                                           # specific Heat Capacity of Fuel           [J/kg/K]
-HEAT_CAP_MOD = 4000                                           # specific Heat Capacity of Moderator      [J/kg/K]
-HEAT_COEFF = 4e6                                              # heat transfer coefficient fuel/moderator [J/K/sec]
-MASS_FUEL = 575                                               # mass of Fuel                             [kg]
-MASS_MOD = 1000                                               # mass of Moderator                        [kg]
-MASS_FLOW = 22                                                # total moderator/coolant mass flow rate   [kg/sec]
-TEMP_IN = 300                                                 # inlet coolant temperature                [K]
-TEMP_MOD_INITIAL = TEMP_IN + \
-                   (POWER_INITIAL / (2 * MASS_FLOW * HEAT_CAP_MOD))
-
-TEMP_FUEL_INITIAL = TEMP_IN + \
-                    (1 / (2 * MASS_FLOW * HEAT_CAP_MOD) + (1 / HEAT_COEFF)) * POWER_INITIAL
-
-FUEL_GAS_DENSITY = 0.001                                      # fuel element gas density                 [g/cc]
-MODR_GAS_DENSITY = 0.015                                      # moderator return channel gas density     [g/cc]
-MODS_GAS_DENSITY = 0.035                                      # moderator supply channel gas density     [g/cc]
-
-
-################# FUEL PIN PARAMETERS ##############           (NOT IN USE CURRENTLY!)
-L_F       = 75                                                 # Length of Fuel Element                   [cm]
-D_FLAT    = 1.9050                                             # Flat-to-Flat distance of Fuel Element    [cm]
-D_COOLANT = 0.3454                                             # Coolant Channel Diameter                 [cm]
-D_EFF = D_FLAT * ((2 * np.sqrt(3)) / np.pi)**0.5               # Effective Equivalent Unit Cell Diameter  [cm]
-A_H = np.pi * L_F * D_COOLANT                                  # Heat Interface Area                      [cm^2]
-V_F = np.pi * (D_EFF**2 - D_COOLANT**2) * L_F                  # Fuel Material Volume                     [cm^3]
-
-########### CONTROL DRUM PARAMETERS ################
-DRUM_SPEED   =  LinearControlRule(coeff=0, const= 0.0, t_min=0, t_max=0)
-
-DRUM_ANGLE_INITIAL = 64.65                                     # initial angle of control drum            [deg]
-
-def main():
-
-    # Solve
-    soln = solver.solve(power_initial=POWER_INITIAL,
-                        precursor_density_initial=PRECURSOR_DENSITY_INITIAL,
-                        beta_vector=BETA_VECTOR,
-                        precursor_constants=PRECURSOR_CONSTANTS,
-                        total_beta=BETA, period=PERIOD,
-                        heat_coeff=HEAT_COEFF,
-                        mass_mod=MASS_MOD,
-                        heat_cap_mod=HEAT_CAP_MOD,
-                        mass_flow=MASS_FLOW,
-                        mass_fuel=MASS_FUEL,
-                        heat_cap_fuel=HEAT_CAP_FUEL,
-                        temp_in=TEMP_IN,
-                        temp_mod_initial=TEMP_MOD_INITIAL,
-                        temp_fuel_initial=TEMP_FUEL_INITIAL,
-                        drum_control_rule=DRUM_SPEED,
-                        drum_angle_initial= DRUM_ANGLE_INITIAL,
-                        t_max= 100,
-                        num_iters=1000)
-
-    # Plot
-    soln.plot_power()
-    soln.plot_densities()
-    soln.plot_temp_mod()
-    soln.plot_temp_fuel()
-    soln.plot_rho_fuel_temp()
-    soln.plot_rho_mod_temp()
-    soln.plot_rho_con_drum()
-    soln.plot_rho_con_drum_angle()
 
+def main(argv: typing.List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='eark.scripts.run', description='Solve an eark scenario file and plot the results')
+    parser.add_argument('scenario', nargs='?', default=REFERENCE_SCENARIO.as_posix(), help='scenario file (.json or .toml)')
+    parser.add_argument('-o', '--output-dir', default='results', help='directory for the results and the dashboard figure')
+    parser.add_argument('-s', '--set', dest='overrides', action='append', default=[], metavar='SECTION.KEY=VALUE',
+                        help='override a scenario value, the value is parsed as JSON if possible')
+    args = parser.parse_args(argv)
 
+    scenario = Scenario.load(args.scenario, overrides=dict(parse_override(text) for text in args.overrides))
+    output_dir = pathlib.Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    record = batch.run_scenario(scenario, output_dir, plot=True)
+    if record['status'] == 'failed':
+        print('Scenario {} failed:\n{}'.format(record['name'], record['error']), file=sys.stderr)
+        return 1
+    print('Solved {} in {:.2f}s, results in {}'.format(record['name'], record['wall_time'], output_dir))
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Simulation service, installed as the "eark-serve" console command, see eark.service for the protocol
+
+Usage:
+    eark-serve --socket /tmp/eark.sock --workers 4
+    eark-serve --port 8765
+"""
+
+import argparse
+import typing
+
+from eark import service
+
+
+def main(argv: typing.List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='eark-serve', description='Serve eark transients from warm worker processes')
+    parser.add_argument('--socket', default=None, help='path of the Unix socket to listen on, instead of TCP')
+    parser.add_argument('--host', default=service.DEFAULT_HOST, help='TCP host to listen on')
+    parser.add_argument('--port', type=int, default=service.DEFAULT_PORT, help='TCP port to listen on')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes, defaults to the number of CPUs')
+    args = parser.parse_args(argv)
+
+    simulation_service = service.SimulationService(max_workers=args.workers)
+    try:
+        service.run(simulation_service.serve_forever(path=args.socket, host=args.host, port=args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    main()
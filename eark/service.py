@@ -0,0 +1,330 @@
+"""Module for serving transients to interactive tools from warm worker processes.
+
+Starting a python process per transient spends most of its time importing numpy, scipy and eark. The service instead
+keeps a pool of worker processes, each of which has imported eark and solved a trivial transient before the first
+request arrives, and accepts requests over a Unix socket or a localhost TCP port. The warm-up tasks wait for each other
+at a barrier, so that every worker process runs exactly one of them.
+
+The protocol is newline-delimited JSON. Each request line is an object
+
+    {"id": <any>, "scenario": <scenario mapping, see eark.scenario>, "series": <bool, default false>}
+
+and the service answers with a stream of event lines carrying the same "id":
+
+    {"id": ..., "event": "accepted", "digest": ...}    the scenario was parsed
+    {"id": ..., "event": "running"}                     the scenario was submitted to a worker
+    {"id": ..., "event": "joined"}                      an identical scenario is already running, its result is shared
+    {"id": ..., "event": "progress", "fraction": ...}   fraction of the output times solved so far
+    {"id": ..., "event": "result", "summary": {...}, "wall_time": ..., "t": [...], "series": {...}}
+    {"id": ..., "event": "error", "error": ...}
+
+"t" and "series", the recorded state components keyed by StateComponent name, are only included when requested. A
+request {"id": ..., "type": "status"} is answered with a "status" event describing the pool. Requests on one
+connection are served concurrently, so responses to different ids may interleave. Events are written with flow control,
+so a slow client holds back the responses to its own connection only. Workers report their progress through a queue
+after each recorded chunk (see Scenario.solve), and the service forwards it to every request sharing the solve.
+
+The service runs on python >= 3.6, so it only uses the asyncio API of that version.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import time
+import typing
+
+from eark.scenario import Scenario
+from eark.scenario import summarize
+from eark.solution import Solution
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+WARM_SCENARIO = {'time': {'t_max': 1.0, 'num_iters': 11}}
+STREAM_LIMIT = 2 ** 24   # longest request line  [bytes]
+WARM_TIMEOUT = 600       # longest wait of a warm-up task for the other workers  [sec]
+
+
+_warmed = False
+
+
+def _ping(barrier) -> int:
+    """Solve a trivial transient on the first call in a worker, so that the first request pays no first-call costs, then
+    wait at the barrier until every worker holds one of these tasks"""
+    global _warmed
+    if not _warmed:
+        Scenario(WARM_SCENARIO).solve()
+        _warmed = True
+    barrier.wait(WARM_TIMEOUT)
+    return os.getpid()
+
+
+def _solve(config: dict, digest: str, progress) -> typing.Tuple[Solution, float]:
+    """Solve a scenario in a worker, putting (digest, fraction solved) on the "progress" queue as it goes, and return
+    the solution and the time spent"""
+    start = time.perf_counter()
+    soln = Scenario(config).solve(progress=lambda fraction: progress.put((digest, fraction)))
+    return soln, time.perf_counter() - start
+
+
+async def _forward(events: typing.Callable[[dict], typing.Awaitable], message: dict):
+    """Send an event to a request, whose connection may have been closed in the meantime"""
+    try:
+        await events(message)
+    except ConnectionError:
+        pass
+
+
+def run(coroutine: typing.Awaitable):
+    """Run a coroutine to completion in a new event loop, as asyncio.run does on python >= 3.7"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def _close(writer: asyncio.StreamWriter):
+    writer.close()
+    if hasattr(writer, 'wait_closed'):  # python >= 3.7
+        await writer.wait_closed()
+
+
+def _series(soln: Solution) -> dict:
+    """The recorded state components of a solution as JSON-compatible lists, with their own times if decimated"""
+    series = {}
+    for component in soln.recorded:
+        t, values = soln.decimated(component)
+        series[component.name] = values.tolist()
+        if t is not soln.t:
+            series[component.name + '_t'] = t.tolist()
+    return series
+
+
+class SimulationService:
+    def __init__(self, max_workers: int = None):
+        """Asynchronous service solving scenarios in a pool of warm worker processes
+
+        Args:
+            max_workers:
+                int, default None, number of worker processes, defaults to the number of processors
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        self._dispatcher = None
+        self._server = None
+        self._in_flight = {}
+        self._listeners = {}
+        self.worker_pids = ()
+        self.num_requests = 0
+        self.num_solved = 0
+        self.num_joined = 0
+
+    def __repr__(self):
+        return 'SimulationService({:d} workers, {:d} in flight, {:d} solved)'.format(self.max_workers, len(self._in_flight),
+                                                                                   self.num_solved)
+
+    async def start_pool(self):
+        """Start the worker processes and wait until all of them are warm"""
+        if self._executor is not None:
+            return
+        self._manager = multiprocessing.Manager()
+        self._progress = self._manager.Queue()
+        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+        loop = asyncio.get_event_loop()
+        # No warm-up task finishes before all of them are running, so each runs in its own worker
+        barrier = self._manager.Barrier(self.max_workers)
+        pids = await asyncio.gather(*(loop.run_in_executor(self._executor, _ping, barrier) for _ in range(self.max_workers)))
+        self.worker_pids = tuple(sorted(pids))
+        self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    async def _dispatch(self):
+        """Forward the progress reported by the workers to the requests sharing each solve, until a None is queued"""
+        loop = asyncio.get_event_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._progress.get)
+            if item is None:
+                return
+            digest, fraction = item
+            for events in self._listeners.get(digest, ()):
+                asyncio.ensure_future(_forward(events, dict(event='progress', fraction=fraction)))
+
+    async def start(self, path: str = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """Warm the pool and listen on the Unix socket "path", or on the TCP address (host, port) if no path is given"""
+        await self.start_pool()
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path, limit=STREAM_LIMIT)
+        else:
+            self._server = await asyncio.start_server(self._handle, host=host, port=port, limit=STREAM_LIMIT)
+        return self._server
+
+    async def serve_forever(self, path: str = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        server = await self.start(path=path, host=host, port=port)
+        try:
+            await server.wait_closed()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._dispatcher is not None:
+            self._progress.put(None)
+            await self._dispatcher
+            self._dispatcher = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+            self._progress = None
+
+    def status(self) -> dict:
+        return dict(workers=self.max_workers, in_flight=len(self._in_flight), requests=self.num_requests, solved=self.num_solved,
+                    joined=self.num_joined)
+
+    async def solve(self, scenario: Scenario,
+                    events: typing.Callable[[dict], typing.Awaitable] = None) -> typing.Tuple[Solution, float]:
+        """Solve a scenario in the pool, sharing the result of an identical scenario which is already running. Cancelling
+        a request does not cancel the solve, whose result stays shared with the requests which joined it
+
+        Args:
+            scenario:
+                Scenario, the transient to solve
+            events:
+                coroutine function, default None, awaited with a "running" or "joined" event, then with the "progress"
+                events of the solve
+
+        Returns:
+            tuple of the Solution and the time spent solving it  [sec]
+        """
+        await self.start_pool()
+        digest = scenario.digest
+        future = self._in_flight.get(digest)
+        if future is not None:
+            self.num_joined += 1
+            event = dict(event='joined')
+        else:
+            future = asyncio.get_event_loop().run_in_executor(self._executor, _solve, scenario.config, digest, self._progress)
+            self._in_flight[digest] = future
+            future.add_done_callback(lambda done: self._finished(digest, done))
+            event = dict(event='running')
+        if events is None:
+            return await asyncio.shield(future)
+
+        await events(event)
+        listeners = self._listeners.setdefault(digest, [])
+        listeners.append(events)
+        try:
+            return await asyncio.shield(future)
+        finally:
+            listeners.remove(events)
+            if not listeners and self._listeners.get(digest) is listeners:
+                del self._listeners[digest]
+
+    def _finished(self, digest: str, future: asyncio.Future):
+        """Stop sharing a solve once it is done, whether or not its requests are still waiting"""
+        if self._in_flight.get(digest) is future:
+            del self._in_flight[digest]
+        if not future.cancelled() and future.exception() is None:
+            self.num_solved += 1
+
+    async def _respond(self, request: dict, send: typing.Callable[[dict], typing.Awaitable]):
+        request_id = request.get('id')
+
+        async def event(message: dict):
+            await send(dict(message, id=request_id))
+
+        if request.get('type') == 'status':
+            await event(dict(event='status', **self.status()))
+            return
+        try:
+            scenario = Scenario(request['scenario'])
+            await event(dict(event='accepted', digest=scenario.digest))
+            soln, wall_time = await self.solve(scenario, events=event)
+            result = dict(event='result', summary=summarize(soln), wall_time=wall_time)
+            if request.get('series', False):
+                result.update(t=soln.t.tolist(), series=_series(soln))
+        except Exception as error:
+            result = dict(event='error', error='{}: {}'.format(type(error).__name__, error))
+        await event(result)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Only one task may wait for the transport to drain at a time
+        lock = asyncio.Lock()
+
+        async def send(message: dict):
+            async with lock:
+                writer.write(json.dumps(message).encode('utf-8') + b'\n')
+                await writer.drain()
+
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                self.num_requests += 1
+                try:
+                    request = json.loads(line)
+                except ValueError as error:
+                    await send(dict(event='error', id=None, error='Invalid request: {}'.format(error)))
+                    continue
+                task = asyncio.ensure_future(self._respond(request, send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+
+async def request(message: dict, path: str = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                  events: typing.Callable[[dict], None] = None) -> dict:
+    """Send one request to a running service and wait for its final event
+
+    Args:
+        message:
+            dict, the request, see the module docstring
+        path:
+            str, default None, Unix socket of the service, if None the TCP address (host, port) is used
+        host:
+            str, default 127.0.0.1, host of the service
+        port:
+            int, default 8765, port of the service
+        events:
+            callable, default None, called with each intermediate event
+
+    Returns:
+        dict, the "result", "error" or "status" event
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path=path, limit=STREAM_LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(host=host, port=port, limit=STREAM_LIMIT)
+    try:
+        writer.write(json.dumps(message).encode('utf-8') + b'\n')
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError('Service closed the connection before answering')
+            reply = json.loads(line)
+            if reply['event'] in ('result', 'error', 'status'):
+                return reply
+            if events is not None:
+                events(reply)
+    finally:
+        await _close(writer)
@@ -1,31 +1,238 @@
+import collections
+import typing
+
 import numpy as np
 
+from eark import derived
 from eark.state import StateComponent
-from eark.utilities import plot
+
+# Plot settings for each quantity, "x" and "y" name the Solution attributes plotted
+PLOT_PANELS = collections.OrderedDict([
+    ('power', dict(y='neutron_population', label='$P(t)$', y_label='Power', title='Power v. Time')),
+    ('densities', dict(y='precursor_densities', label=lambda i: '$c_{:d}$'.format(i + 1),
+                       title="Concentration of Neutron Precursors vs. Time",
+                       y_label=r"Concentration of Neutron Precursors, $c_i [\#/dr^3]$")),
+    ('temp_fuel', dict(y='temp_fuel', y_label="Fuel  Temperature [K]", label=r'$T_{fuel}$', title='Fuel Temperature vs. Time')),
+    ('temp_mod', dict(y='temp_mod', y_label="Moderator Temperature [K]", label=r'$T_{mod}$', title='Moderator Temperature vs. Time')),
+    ('rho_fuel_temp', dict(y='rho_fuel_temp', y_label=r"Fuel Temperature Reactivity [$\Delta k$]", label=r'$\rho_{fuel temp}$',
+                           title='Fuel Temperature Reactivity vs. Time')),
+    ('rho_mod_temp', dict(y='rho_mod_temp', y_label=r"Moderator Temperature Reactivity [$\Delta k$]", label=r'$\rho_{mod temp}$',
+                          title='Moderator Temperature Reactivity vs. Time')),
+    ('rho_con_drum', dict(y='rho_con_drum', y_label=r"Control Drum Reactivity [$\Delta k$]", label=r'$\rho_{CD}$',
+                          title='Control Drum Reactivity vs. Time')),
+    ('rho_con_drum_angle', dict(x='drum_angle', y='rho_con_drum', y_label=r"Control Drum Reactivity [$\Delta k$]",
+                                x_label=r'Drum Angle [$\theta_{CD}$]', label=r'$\rho_{CD}$',
+                                title='Control Drum Reactivity vs. Drum Angle')),
+])
+
+
+def _plot():
+    """Import the plotting utilities on first use, so that solving never pays for importing matplotlib"""
+    from eark.utilities import plot
+    return plot
+
+
+# State component plotted against time in each panel
+PANEL_COMPONENTS = {
+    'power': StateComponent.NeutronPopulation,
+    'densities': StateComponent.PrecursorDensity1,
+    'temp_fuel': StateComponent.TFuel,
+    'temp_mod': StateComponent.TMod,
+    'rho_fuel_temp': StateComponent.RhoFuelTemp,
+    'rho_mod_temp': StateComponent.RhoModTemp,
+    'rho_con_drum': StateComponent.RhoConDrum,
+    'rho_con_drum_angle': StateComponent.RhoConDrum,
+}
+PRECURSOR_COMPONENTS = tuple(StateComponent(i) for i in range(StateComponent.PrecursorDensity1, StateComponent.TMod))
+REDUCTIONS = ('peak', 'time_of_peak', 'integral')
+# Quantities derived from the state components at every output time, computed on first access and cached
+DERIVED_QUANTITIES = ('total_reactivity', 'reactor_period', 'energy', 'temp_fuel_rate', 'temp_mod_rate')
 
 
 class Solution:
-    __slots__ = ('_array', '_t')
+    __slots__ = ('_array', '_t', '_components', '_columns', '_decimated', '_reductions', '_cache')
+
+    def __init__(self, array: np.ndarray, t: np.ndarray, components: typing.Sequence[StateComponent] = None,
+                 decimated: typing.Dict[StateComponent, typing.Tuple[np.ndarray, np.ndarray]] = None,
+                 reductions: typing.Dict[typing.Tuple[str, StateComponent], float] = None):
+        """Time series of the reactor state, possibly recorded for a subset of the state components
 
-    def __init__(self, array: np.ndarray, t: np.ndarray):
+        Args:
+            array:
+                ndarray, len(t) x len(components) array of state components at times "t"
+            t:
+                ndarray, output times                                   [sec]
+            components:
+                sequence of StateComponent, default None, the components in the columns of "array", defaults to all
+            decimated:
+                dict of StateComponent to (ndarray, ndarray), default None, components recorded at their own output
+                times, as (times, values) pairs
+            reductions:
+                dict of (str, StateComponent) to float, default None, reductions over the transient keyed by the
+                reduction name, one of REDUCTIONS, and the reduced component
+        """
         self._array = array
         self._t = t
+        self._components = tuple(StateComponent)[:np.shape(array)[1]] if components is None else tuple(components)
+        self._columns = {c: i for i, c in enumerate(self._components)}
+        self._decimated = {} if decimated is None else dict(decimated)
+        self._reductions = {} if reductions is None else dict(reductions)
+        self._cache = {}
+
+    def save(self, path: str):
+        """Write the solution to a compressed numpy archive
+
+        Args:
+            path:
+                str, path of the file to write, conventionally with the ".npz" suffix
+        """
+        arrays = dict(array=self._array, t=self._t, components=np.array(self._components, dtype=int))
+        for component, (t, values) in self._decimated.items():
+            arrays['t_{:d}'.format(component)] = t
+            arrays['values_{:d}'.format(component)] = values
+        if self._reductions:
+            arrays['reduction_names'] = np.array([name for name, _ in self._reductions])
+            arrays['reduction_components'] = np.array([component for _, component in self._reductions], dtype=int)
+            arrays['reduction_values'] = np.array(list(self._reductions.values()), dtype=float)
+        with open(path, 'wb') as fh:
+            np.savez_compressed(fh, **arrays)
+
+    @staticmethod
+    def load(path: str) -> 'Solution':
+        """Read a solution written by "save"
+
+        Args:
+            path:
+                str, path of the file to read
+
+        Returns:
+            Solution
+        """
+        with np.load(path) as data:
+            components = [StateComponent(c) for c in data['components']] if 'components' in data else None
+            decimated = {StateComponent(int(key[2:])): (data[key], data['values_' + key[2:]]) for key in data.files
+                         if key.startswith('t_')}
+            reductions = {}
+            if 'reduction_names' in data:
+                reductions = {(str(name), StateComponent(c)): float(value) for name, c, value in
+                              zip(data['reduction_names'], data['reduction_components'], data['reduction_values'])}
+            return Solution(array=data['array'], t=data['t'], components=components, decimated=decimated, reductions=reductions)
+
+    @staticmethod
+    def concatenate(solutions: typing.Sequence['Solution']) -> 'Solution':
+        """Join solutions over consecutive time intervals, dropping the first state of each solution which repeats the
+        last state of the one before. Decimated components and reductions are not carried over
+
+        Args:
+            solutions:
+                sequence of Solution, with the same components, in order of time
+
+        Returns:
+            Solution
+        """
+        components = solutions[0].components
+        arrays = [solutions[0].array]
+        times = [solutions[0].t]
+        for previous, soln in zip(solutions[:-1], solutions[1:]):
+            if soln.components != components:
+                raise ValueError('Solutions must have the same components, got: {} and {}'.format(components, soln.components))
+            if soln.t[0] < previous.t[-1]:
+                raise ValueError('Solutions must be in order of time, got start {} before end {}'.format(soln.t[0], previous.t[-1]))
+            start = 1 if soln.t[0] == previous.t[-1] else 0
+            arrays.append(soln.array[start:])
+            times.append(soln.t[start:])
+        return Solution(array=np.concatenate(arrays), t=np.concatenate(times), components=components)
+
+    @staticmethod
+    def stack(solutions: typing.Sequence['Solution'],
+              quantity: typing.Union[StateComponent, str]) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Stack a quantity of many solutions on common output times, for bulk post-processing with the functions of
+        eark.derived, e.g. derived.windowed_peak(*Solution.stack(solutions, 'total_reactivity'), t_min=2)
+
+        Args:
+            solutions:
+                sequence of Solution, with the same output times
+            quantity:
+                StateComponent or str, a state component or one of DERIVED_QUANTITIES
+
+        Returns:
+            (ndarray, ndarray), the output times and the len(solutions) x len(t) array of the quantity
+        """
+        t = solutions[0].quantity_times(quantity)
+        for soln in solutions[1:]:
+            if not np.array_equal(soln.quantity_times(quantity), t):
+                raise ValueError('Solutions must have the same output times to be stacked')
+        return t, np.stack([soln.quantity(quantity) for soln in solutions])
 
     @property
     def array(self):
+        """The state components recorded at every output time, with columns ordered as in the "components" property"""
         return self._array
 
     @property
     def t(self):
         return self._t
 
+    @property
+    def components(self) -> typing.Tuple[StateComponent, ...]:
+        """The state components in the columns of the "array" property"""
+        return self._components
+
+    @property
+    def recorded(self) -> typing.Tuple[StateComponent, ...]:
+        """All recorded state components, including those recorded at a coarser cadence"""
+        return tuple(sorted(set(self._components) | set(self._decimated)))
+
+    @property
+    def reductions(self) -> typing.Dict[typing.Tuple[str, StateComponent], float]:
+        return dict(self._reductions)
+
+    def component(self, component: StateComponent) -> np.ndarray:
+        """Get the time series of a state component at every output time. Components recorded at a coarser cadence are
+        only available from the "decimated" method, with their own output times"""
+        if component in self._columns:
+            return self._array[:, self._columns[component]]
+        if component in self._decimated:
+            raise KeyError('State component {} was recorded at a coarser cadence, get it with Solution.decimated'.format(
+                StateComponent(component).name))
+        raise KeyError('State component {} was not recorded'.format(StateComponent(component).name))
+
+    def decimated(self, component: StateComponent) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Get the output times and the time series of a recorded state component, at its own cadence. Components
+        recorded at every output time are returned with the "t" property"""
+        if component in self._decimated:
+            return self._decimated[component]
+        return self._t, self.component(component)
+
+    def _reduction(self, name: str, component: StateComponent) -> float:
+        try:
+            return self._reductions[(name, component)]
+        except KeyError:
+            raise KeyError('Reduction {} of {} was not recorded'.format(name, StateComponent(component).name)) from None
+
+    def peak(self, component: StateComponent) -> float:
+        """Peak value of a state component over the output times, recorded with the Recorder "peaks" option"""
+        return self._reduction('peak', component)
+
+    def time_of_peak(self, component: StateComponent) -> float:
+        """Time of the peak value of a state component, recorded with the Recorder "peaks" option  [sec]"""
+        return self._reduction('time_of_peak', component)
+
+    def integral(self, component: StateComponent) -> float:
+        """Time integral of a state component, recorded with Recorder "integrals". The integral of the neutron population
+        is the energy deposited over the transient  [J]"""
+        return self._reduction('integral', component)
+
     @property
     def neutron_population(self):
-        return self._array[:, StateComponent.NeutronPopulation]
+        return self.component(StateComponent.NeutronPopulation)
 
     @property
     def precursor_densities(self):
-        return self._array[:, StateComponent.PrecursorDensity1:StateComponent.TMod]
+        columns = [self._columns.get(c) for c in PRECURSOR_COMPONENTS]
+        if None not in columns and columns == list(range(columns[0], columns[0] + len(columns))):
+            return self._array[:, columns[0]:columns[-1] + 1]
+        return np.column_stack([self.component(c) for c in PRECURSOR_COMPONENTS])
 
     def precursor_density(self, i: int):
         """Get a time series of precursor densities of the ith kind
@@ -41,58 +248,170 @@ class Solution:
 
     @property
     def temp_mod(self):
-        return self._array[:, StateComponent.TMod]
+        return self.component(StateComponent.TMod)
 
     @property
     def temp_fuel(self):
-        return self._array[:, StateComponent.TFuel]
+        return self.component(StateComponent.TFuel)
 
     @property
     def rho_fuel_temp(self):
-        return self._array[:, StateComponent.RhoFuelTemp]
+        return self.component(StateComponent.RhoFuelTemp)
 
     @property
     def rho_mod_temp(self):
-        return self._array[:, StateComponent.RhoModTemp]
+        return self.component(StateComponent.RhoModTemp)
 
     @property
     def drum_angle(self):
-        return self._array[:, StateComponent.DrumAngle]
+        return self.component(StateComponent.DrumAngle)
 
     @property
     def rho_con_drum(self):
-        return self._array[:, StateComponent.RhoConDrum]
+        return self.component(StateComponent.RhoConDrum)
+
+    @property
+    def drum_angles(self) -> np.ndarray:
+        """Angles of the individually modelled drums (see eark.drums), stored in the columns after the components  [degrees]"""
+        if np.shape(self._array)[1] <= len(self._components):
+            raise KeyError('Drum angles were not recorded')
+        return self._array[:, len(self._components):]
+
+    def _cached(self, key, func: typing.Callable[[], typing.Any]):
+        """Compute a derived quantity on first access. Solutions are treated as immutable, so it is never recomputed"""
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func()
+            return value
+
+    @property
+    def total_reactivity(self) -> np.ndarray:
+        """Sum of the fuel temperature, moderator temperature and control drum reactivities  [dk]"""
+        return self._cached('total_reactivity', lambda: derived.total_reactivity(self.rho_fuel_temp, self.rho_mod_temp, self.rho_con_drum))
+
+    @property
+    def reactor_period(self) -> np.ndarray:
+        """Instantaneous reactor period P / (dP/dt), infinite where the power is stationary  [sec]"""
+        return self._cached('reactor_period', lambda: derived.reactor_period(self._t, self.neutron_population))
+
+    @property
+    def energy(self) -> np.ndarray:
+        """Cumulative energy deposited since the first output time  [J]"""
+        return self._cached('energy', lambda: derived.cumulative_integral(self._t, self.neutron_population))
+
+    @property
+    def temp_fuel_rate(self) -> np.ndarray:
+        """Rate of change of the fuel temperature  [K/sec]"""
+        return self._cached('temp_fuel_rate', lambda: derived.rate(self._t, self.temp_fuel))
+
+    @property
+    def temp_mod_rate(self) -> np.ndarray:
+        """Rate of change of the moderator temperature  [K/sec]"""
+        return self._cached('temp_mod_rate', lambda: derived.rate(self._t, self.temp_mod))
+
+    @staticmethod
+    def _check_derived(quantity: str):
+        if quantity not in DERIVED_QUANTITIES:
+            raise KeyError('Unknown derived quantity: {}, expected one of {}'.format(quantity, DERIVED_QUANTITIES))
+
+    def quantity(self, quantity: typing.Union[StateComponent, str]) -> np.ndarray:
+        """Get the time series of a state component or of one of DERIVED_QUANTITIES by name, at every output time"""
+        if isinstance(quantity, str):
+            self._check_derived(quantity)
+            return getattr(self, quantity)
+        return self.component(quantity)
+
+    def quantity_times(self, quantity: typing.Union[StateComponent, str]) -> np.ndarray:
+        """Get the output times of a state component or of one of DERIVED_QUANTITIES by name. Components recorded at a
+        coarser cadence have their own output times, as returned by the "decimated" method"""
+        if isinstance(quantity, str):
+            self._check_derived(quantity)
+            return self._t
+        if quantity in self._decimated:
+            return self._decimated[quantity][0]
+        self.component(quantity)
+        return self._t
+
+    def windowed_peak(self, quantity: typing.Union[StateComponent, str], t_min: float = None,
+                      t_max: float = None) -> typing.Tuple[float, float]:
+        """Peak value of a state component or derived quantity within [t_min, t_max] and the time of the peak
+
+        Args:
+            quantity:
+                StateComponent or str, a state component, possibly decimated, or one of DERIVED_QUANTITIES
+            t_min:
+                float, default None, start of the window, defaults to the first output time   [sec]
+            t_max:
+                float, default None, end of the window, defaults to the last output time      [sec]
+
+        Returns:
+            (float, float), the peak value and the time of the peak    [sec]
+        """
+        def peak():
+            t, values = (self._t, self.quantity(quantity)) if isinstance(quantity, str) else self.decimated(quantity)
+            value, t = derived.windowed_peak(t, values, t_min=t_min, t_max=t_max)
+            return float(value), float(t)
+        return self._cached(('windowed_peak', quantity, t_min, t_max), peak)
+
+    def _panel(self, name: str) -> dict:
+        """Keyword arguments for plotting the named quantity. Single components are plotted at their own cadence"""
+        spec = dict(PLOT_PANELS[name])
+        x = spec.pop('x', None)
+        if x is not None:
+            spec['t'], spec['y'] = getattr(self, x), getattr(self, spec['y'])
+        elif name == 'densities':
+            spec['t'], spec['y'] = self._t, list(self.precursor_densities.T)
+        else:
+            spec['t'], spec['y'] = self.decimated(PANEL_COMPONENTS[name])
+        if name == 'densities':
+            spec['color'] = _plot().DENSITY_COLORS
+        return spec
+
+    def _has_panel(self, name: str) -> bool:
+        if name == 'densities':
+            return all(c in self._columns for c in PRECURSOR_COMPONENTS)
+        if name == 'rho_con_drum_angle':
+            return StateComponent.DrumAngle in self._columns and StateComponent.RhoConDrum in self._columns
+        return PANEL_COMPONENTS[name] in self.recorded
 
     def plot_power(self, output_file: str = None):
-        plot.plot_soln_quantity(t=self.t, y=self.neutron_population, label='$P(t)$', y_label='Power',
-                                title='Power v. Time', output_file=output_file)
+        _plot().plot_soln_quantity(output_file=output_file, **self._panel('power'))
 
     def plot_densities(self, output_file: str = None):
-        plot.plot_soln_quantity(t=self.t, y=[self.precursor_density(i) for i in range(1, 7)], label=lambda i: '$c_{:d}$'.format(i),
-                                color=plot.DENSITY_COLORS,
-                                title="Concentration of Neutron Precursors vs. Time",
-                                y_label=r"Concentration of Neutron Precursors, $c_i [\#/dr^3]$", output_file=output_file)
+        _plot().plot_soln_quantity(output_file=output_file, **self._panel('densities'))
 
     def plot_temp_fuel(self, output_file: str = None):
-        plot.plot_soln_quantity(t=self.t, y=self.temp_fuel, y_label="Fuel  Temperature [K]",
-                                label=r'$T_{fuel}$', title='Fuel Temperature vs. Time', output_file=output_file)
+        _plot().plot_soln_quantity(output_file=output_file, **self._panel('temp_fuel'))
 
     def plot_temp_mod(self, output_file: str = None):
-        plot.plot_soln_quantity(t=self.t, y=self.temp_mod, y_label="Moderator Temperature [K]",
-                                label=r'$T_{mod}$', title='Moderator Temperature vs. Time', output_file=output_file)
+        _plot().plot_soln_quantity(output_file=output_file, **self._panel('temp_mod'))
 
     def plot_rho_fuel_temp(self, output_file: str = None):
-        plot.plot_soln_quantity(t=self.t, y=self.rho_fuel_temp, y_label=r"Fuel Temperature Reactivity [$\Delta k$]",
-                                label=r'$\rho_{fuel temp}$', title='Fuel Temperature Reactivity vs. Time', output_file=output_file)
+        _plot().plot_soln_quantity(output_file=output_file, **self._panel('rho_fuel_temp'))
 
     def plot_rho_mod_temp(self, output_file: str = None):
-        plot.plot_soln_quantity(t=self.t, y=self.rho_mod_temp, y_label=r"Moderator Temperature Reactivity [$\Delta k$]",
-                                label=r'$\rho_{mod temp}$', title='Moderator Temperature Reactivity vs. Time', output_file=output_file)
+        _plot().plot_soln_quantity(output_file=output_file, **self._panel('rho_mod_temp'))
 
     def plot_rho_con_drum(self, output_file: str = None):
-        plot.plot_soln_quantity(t=self.t, y=self.rho_con_drum, y_label=r"Control Drum Reactivity [$\Delta k$]",
-                                label=r'$\rho_{CD}$', title='Control Drum Reactivity vs. Time', output_file=output_file)
+        _plot().plot_soln_quantity(output_file=output_file, **self._panel('rho_con_drum'))
 
     def plot_rho_con_drum_angle(self, output_file: str = None):
-        plot.plot_soln_quantity(t=self.drum_angle, y=self.rho_con_drum, y_label=r"Control Drum Reactivity [$\Delta k$]",
-                                x_label=r'Drum Angle [$\theta_{CD}$]',label=r'$\rho_{CD}$', title='Control Drum Reactivity vs. Drum Angle', output_file=output_file)
+        _plot().plot_soln_quantity(output_file=output_file, **self._panel('rho_con_drum_angle'))
+
+    def plot_dashboard(self, output_file: str = None, panels: typing.Sequence[str] = None, max_points: int = None):
+        """Plot all quantities in a single multi-panel figure
+
+        Args:
+            output_file:
+                str, default None, path of the file to write, if None the figure is shown interactively
+            panels:
+                sequence of str, default None, names of the quantities to plot (keys of PLOT_PANELS), defaults to all
+                recorded quantities
+            max_points:
+                int, default None, maximum number of points drawn per series, defaults to plot.DEFAULT_MAX_POINTS
+        """
+        plot = _plot()
+        names = [name for name in PLOT_PANELS if self._has_panel(name)] if panels is None else panels
+        kwargs = {} if max_points is None else dict(max_points=max_points)
+        plot.plot_panels([self._panel(name) for name in names], output_file=output_file, **kwargs)
@@ -3,26 +3,85 @@ arguments that relate to the state of the reactor and the initial conditions of
 """
 
 import functools
+import typing
 
 import numpy as np
+import scipy.integrate
+from scipy.integrate import ode
 from scipy.integrate import odeint
 
+from eark import control
 from eark import dynamics
+from eark import linear
+from eark import properties
 from eark.control import ControlRule
+from eark.drums import Drums
+from eark.parareal import Parareal
+from eark.properties import PropertyTable
+from eark.recording import Recorder
 from eark.solution import Solution
 from eark.state import State
 
+ODEINT = 'odeint'
+ODEINT_TOLERANCE = 1.49012e-8  # default rtol and atol of odeint
+IMPLICIT_METHODS = ('Radau', 'BDF', 'LSODA')  # solve_ivp methods which use the Jacobian
+
+
+Property = typing.Union[float, PropertyTable]
+
+
+class IntegratorStatistics:
+    """Work done by the integrator, accumulated over integrations: the number of steps and of derivative and Jacobian
+    evaluations. Recording with the odeint method streams the states from scipy's "ode" interface to LSODA, which reports
+    neither steps nor Jacobian evaluations, so only its derivative evaluations are counted
+    """
+    __slots__ = ('num_steps', 'num_rhs', 'num_jac')
+
+    def __init__(self):
+        self.num_steps = 0
+        self.num_rhs = 0
+        self.num_jac = 0
+
+    def __repr__(self):
+        return 'IntegratorStatistics({:d} steps, {:d} derivative and {:d} Jacobian evaluations)'.format(self.num_steps, self.num_rhs,
+                                                                                                       self.num_jac)
+
+
+class WarmStart:
+    """Integrator settings carried from one solve to the next, for a sequence of nearby scenarios along a continuation
+    path (see eark.sweep). A solve with a solve_ivp method of IMPLICIT_METHODS starts with the first step size and the
+    initial analytic Jacobian stored here, instead of choosing its first step and evaluating the Jacobian, and stores its
+    own for the next solve. Results agree with those of a cold start within the integrator tolerance
+    """
+    __slots__ = ('first_step', 'jacobian')
+
+    def __init__(self):
+        self.first_step = None
+        self.jacobian = None
+
+    def __repr__(self):
+        return 'WarmStart(first step {}, {} Jacobian)'.format(self.first_step, 'no' if self.jacobian is None else 'a')
+
 
 def state_deriv_array(state_array: np.ndarray, t: float, beta_vector: np.ndarray, precursor_constants: np.ndarray,
-                      total_beta: float, period: float, heat_coeff: float, mass_mod: float, heat_cap_mod: float, mass_flow: float,
-                      mass_fuel: float, heat_cap_fuel: float, temp_in: float, drum_control_rule: ControlRule) -> np.ndarray:
+                      total_beta: float, period: float, heat_coeff: Property, mass_mod: float, heat_cap_mod: Property, mass_flow: float,
+                      mass_fuel: float, heat_cap_fuel: Property, temp_in: float, drum_control_rule: ControlRule,
+                      drums: Drums = None) -> np.ndarray:
     """Function to compute the time derivative of the reactor state
 
+    The heat capacities and heat transfer coefficient may be PropertyTables, the fuel heat capacity is evaluated at the
+    fuel temperature and the others at the moderator temperature. With individually modelled drums the state array
+    ends with the drum angles, see eark.drums.
+
     Returns:
         ndarray, the time derivative of the reactor state at time "t"
     """
     state = State.from_array(state_array)
 
+    heat_cap_fuel = properties.evaluate(heat_cap_fuel, state.t_fuel)
+    heat_cap_mod = properties.evaluate(heat_cap_mod, state.t_mod)
+    heat_coeff = properties.evaluate(heat_coeff, state.t_mod)
+
     dndt = dynamics.total_neutron_deriv(beta=total_beta, period=period, power=state.neutron_population,
                                         precursor_constants=precursor_constants, precursor_density=state.precursor_densities,
                                         rho_fuel_temp=state.rho_fuel_temp, rho_mod_temp=state.rho_mod_temp,
@@ -44,19 +103,390 @@ def state_deriv_array(state_array: np.ndarray, t: float, beta_vector: np.ndarray
     drho_mod_temp_dt = dynamics.temp_mod_reactivity_deriv(beta=total_beta, heat_coeff=heat_coeff, mass_mod=mass_mod, heat_cap_mod=heat_cap_mod,
                                                     mass_flow=mass_flow, temp_fuel=state.t_fuel, temp_mod=state.t_mod, temp_in=temp_in)
 
-    ddrum_angle_dt = drum_control_rule.drum_speed(t=t, state=state)
+    if drums is None:
+        drum_speeds = None
+        ddrum_angle_dt = drum_control_rule.drum_speed(t=t, state=state)
+        drho_con_drum_dt = dynamics.con_drum_reactivity_deriv(beta=total_beta, drum_speed=ddrum_angle_dt, drum_angle=state.drum_angle)
+    else:
+        drum_speeds, ddrum_angle_dt, drho_con_drum_dt = drums.derivatives(beta=total_beta, t=t, state=state,
+                                                                           drum_control_rule=drum_control_rule)
 
-    drho_con_drum_dt = dynamics.con_drum_reactivity_deriv(beta=total_beta, drum_speed=ddrum_angle_dt, drum_angle=state.drum_angle)
-
-    state_deriv = State(dndt, dcdt, dT_moddt, dT_fueldt, drho_fuel_temp_dt, drho_mod_temp_dt, ddrum_angle_dt, drho_con_drum_dt)
+    state_deriv = State(dndt, dcdt, dT_moddt, dT_fueldt, drho_fuel_temp_dt, drho_mod_temp_dt, ddrum_angle_dt, drho_con_drum_dt,
+                        drum_angles=drum_speeds)
     return state_deriv.to_array()
 
 
+def sample_times(rules: typing.List[control.SampledControlRule], t_start: float, t_end: float) -> np.ndarray:
+    """Compute the segment boundaries for integrating sampled control rules. Rules which have already been sampled
+    continue their sample schedule, the others start sampling at t_start
+
+    Returns:
+        ndarray, sorted union of t_start and the sample times of all rules in [t_start, t_end), followed by t_end
+    """
+    times = [[t_start]]
+    for rule in rules:
+        first = rule.next_sample_time(t_start)
+        times.append(first + rule.sample_period * np.arange(max(np.ceil((t_end - first) / rule.sample_period), 0)))
+    times = np.unique(np.concatenate(times))
+    return np.append(times[times < t_end], t_end)
+
+
+def integrate_segment(deriv_func: typing.Callable, state_initial: np.ndarray, t: np.ndarray, method: str = ODEINT, rtol: float = None,
+                      atol: float = None, max_step: float = None, jacobian: typing.Callable = None,
+                      statistics: IntegratorStatistics = None, warm_start: WarmStart = None) -> np.ndarray:
+    """Integrate the state derivative over the times "t" with a single integrator call
+
+    Args:
+        deriv_func:
+            callable, state derivative with the odeint "func" signature
+        state_initial:
+            ndarray, state array at t[0]
+        t:
+            ndarray, increasing output times, t[0] is the initial time  [sec]
+        method:
+            str, default "odeint", "odeint" for LSODA through odeint [1], or a solve_ivp method such as "BDF" [2]
+        rtol:
+            float, default None, relative tolerance, defaults to that of the integrator
+        atol:
+            float, default None, absolute tolerance, defaults to that of the integrator
+        max_step:
+            float, default None, largest step of the integrator, unlimited by default    [sec]
+        jacobian:
+            callable, default None, Jacobian of "deriv_func" with the odeint "Dfun" signature, defaults to finite
+            differences
+        statistics:
+            IntegratorStatistics, default None, add the work done by this integration
+        warm_start:
+            WarmStart, default None, start from the first step and Jacobian of the previous solve and store those of this
+            one, for the solve_ivp methods of IMPLICIT_METHODS only
+
+    Returns:
+        ndarray, len(t) x len(state_initial) array of states at times "t"
+
+    References:
+        [1] https://docs.scipy.org/doc/scipy/reference/generated/scipy.integrate.odeint.html
+        [2] https://docs.scipy.org/doc/scipy/reference/generated/scipy.integrate.solve_ivp.html
+    """
+    if method == ODEINT:
+        if warm_start is not None:
+            raise ValueError('Warm starts are only defined for the solve_ivp methods {}'.format(IMPLICIT_METHODS))
+        hmax = 0.0 if max_step is None else max_step
+        if statistics is None:
+            return odeint(deriv_func, state_initial, t, Dfun=jacobian, rtol=rtol, atol=atol, hmax=hmax)
+        res, info = odeint(deriv_func, state_initial, t, Dfun=jacobian, rtol=rtol, atol=atol, hmax=hmax, full_output=True)
+        statistics.num_steps += int(info['nst'][-1])
+        statistics.num_rhs += int(info['nfe'][-1])
+        statistics.num_jac += int(info['nje'][-1])
+        return res
+
+    res = np.empty((len(t), len(state_initial)))
+    res[0] = state_initial
+    for start, states in _ivp_steps(deriv_func, state_initial, t, method=method, rtol=rtol, atol=atol, max_step=max_step,
+                                    jacobian=jacobian, statistics=statistics, warm_start=warm_start):
+        res[start:start + len(states)] = states
+    return res
+
+
+def _ivp_steps(deriv_func: typing.Callable, state_initial: np.ndarray, t: np.ndarray, method: str, rtol: float = None,
+               atol: float = None, max_step: float = None, jacobian: typing.Callable = None,
+               statistics: IntegratorStatistics = None,
+               warm_start: WarmStart = None) -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+    """Step a solve_ivp integrator over the times "t", as solve_ivp does with "t_eval", yielding the index of the first
+    output time passed by each step and the dense output states at the output times passed, t[0] excluded
+    """
+    if warm_start is not None and method not in IMPLICIT_METHODS:
+        raise ValueError('Warm starts are only defined for the solve_ivp methods {}'.format(IMPLICIT_METHODS))
+    options = {key: value for key, value in (('rtol', rtol), ('atol', atol), ('max_step', max_step)) if value is not None}
+    if warm_start is not None and warm_start.first_step is not None:
+        options['first_step'] = min(warm_start.first_step, t[-1] - t[0])
+    num_seeded = [0]
+    if jacobian is not None and method in IMPLICIT_METHODS:
+        seed = [None if warm_start is None else warm_start.jacobian]
+
+        def jac(t_, y):
+            # The first request is answered with the Jacobian of the previous solve, later ones are evaluated
+            if seed[0] is not None:
+                matrix, seed[0] = seed[0], None
+                num_seeded[0] += 1
+                return matrix
+            matrix = jacobian(y, t_)
+            if warm_start is not None and t_ == t[0]:
+                warm_start.jacobian = matrix
+            return matrix
+        options['jac'] = jac
+    integrator = getattr(scipy.integrate, method)(lambda t_, y: deriv_func(y, t_), t[0], state_initial, t[-1], **options)
+    start = 1
+    num_steps = 0
+    while integrator.status == 'running':
+        message = integrator.step()
+        if integrator.status == 'failed':
+            raise RuntimeError('Integration with {} failed at t={}: {}'.format(method, integrator.t, message))
+        num_steps += 1
+        if warm_start is not None and num_steps == 1:
+            warm_start.first_step = integrator.t - t[0]
+        stop = np.searchsorted(t, integrator.t, side='right')
+        if stop > start:
+            yield start, integrator.dense_output()(t[start:stop]).T
+            start = stop
+    if statistics is not None:
+        statistics.num_steps += num_steps
+        statistics.num_rhs += int(integrator.nfev)
+        statistics.num_jac += int(integrator.njev) - num_seeded[0]
+
+
+def stream_segment(deriv_func: typing.Callable, state_initial: np.ndarray, t: np.ndarray, emit: typing.Callable[[int, np.ndarray], None],
+                   chunk_size: int, method: str = ODEINT, rtol: float = None, atol: float = None, max_step: float = None,
+                   jacobian: typing.Callable = None, statistics: IntegratorStatistics = None, warm_start: WarmStart = None):
+    """Integrate the state derivative over the times "t" with a single integrator, as "integrate_segment" does, handing the
+    states at t[1:] to "emit" in chunks of at most "chunk_size" output times as they are computed
+
+    The states are identical to those of "integrate_segment", but the full state history is never held in memory. The
+    odeint method steps the same LSODA integrator through the scipy "ode" interface, which reports no step or Jacobian
+    counts, so only the derivative evaluations are added to "statistics" for it.
+
+    Args:
+        emit:
+            callable, emit(start, states) receives the states at consecutive output times t[start:start + len(states)]
+        chunk_size:
+            int, largest number of output times handed to "emit" at once
+
+    See "integrate_segment" for the other arguments.
+    """
+    buffer = np.empty((min(chunk_size, len(t) - 1), len(state_initial)))
+    filled = 0
+    start = 1
+    if method != ODEINT:
+        for first, states in _ivp_steps(deriv_func, state_initial, t, method=method, rtol=rtol, atol=atol, max_step=max_step,
+                                        jacobian=jacobian, statistics=statistics, warm_start=warm_start):
+            for state in states:
+                buffer[filled] = state
+                filled += 1
+                if filled == len(buffer):
+                    emit(start, buffer)
+                    start, filled = start + filled, 0
+        if filled:
+            emit(start, buffer[:filled])
+        return
+    if warm_start is not None:
+        raise ValueError('Warm starts are only defined for the solve_ivp methods {}'.format(IMPLICIT_METHODS))
+
+    num_rhs = [0]
+
+    def func(t_, y):
+        num_rhs[0] += 1
+        return deriv_func(y, t_)
+
+    integrator = ode(func, None if jacobian is None else lambda t_, y: jacobian(y, t_))
+    integrator.set_integrator('lsoda', rtol=ODEINT_TOLERANCE if rtol is None else rtol, atol=ODEINT_TOLERANCE if atol is None else atol,
+                              max_step=0.0 if max_step is None else max_step)
+    integrator.set_initial_value(state_initial, t[0])
+    for t_out in t[1:]:
+        buffer[filled] = integrator.integrate(t_out)
+        if not integrator.successful():
+            raise RuntimeError('Integration with {} failed at t={}'.format(method, integrator.t))
+        filled += 1
+        if filled == len(buffer):
+            emit(start, buffer)
+            start, filled = start + filled, 0
+    if filled:
+        emit(start, buffer[:filled])
+    if statistics is not None:
+        statistics.num_rhs += num_rhs[0]
+
+
+def integrate(deriv_func: typing.Callable, state_initial: np.ndarray, t: np.ndarray, drum_control_rule: ControlRule,
+              parareal: Parareal = None, recorder: Recorder = None, method: str = ODEINT, rtol: float = None, atol: float = None,
+              max_step: float = None, jacobian: typing.Callable = None, statistics: IntegratorStatistics = None,
+              reset_rules: bool = True, warm_start: WarmStart = None) -> typing.Optional[np.ndarray]:
+    """Integrate the state derivative over the times "t"
+
+    When the control rule contains sampled (discrete-time) rules the integration is split into segments between the
+    sample times. The rules are sampled at the start of each segment and their outputs held constant over the segment.
+
+    Args:
+        deriv_func:
+            callable, state derivative with the odeint "func" signature, see [1]
+        state_initial:
+            ndarray, state array at t[0]
+        t:
+            ndarray, increasing output times, t[0] is the initial time  [sec]
+        drum_control_rule:
+            ControlRule, the rule used by "deriv_func"
+        parareal:
+            Parareal, default None, integrate in parallel over time slices with these settings
+        recorder:
+            Recorder, default None, hand the states to this recorder as they are computed instead of returning them.
+            The states are handed over in chunks of "recorder.chunk_size" output times from a single integrator, so
+            they equal those returned without a recorder
+        method:
+            str, default "odeint", integrator, see "integrate_segment"
+        rtol:
+            float, default None, relative tolerance, defaults to that of the integrator
+        atol:
+            float, default None, absolute tolerance, defaults to that of the integrator
+        max_step:
+            float, default None, largest step of the integrator, unlimited by default    [sec]
+        jacobian:
+            callable, default None, Jacobian of "deriv_func", see "integrate_segment"
+        statistics:
+            IntegratorStatistics, default None, add the work done by the integrator
+        reset_rules:
+            bool, default True, reset the sampled rules of "drum_control_rule" before integrating. If False, rules
+            keep their controller state and sample schedule from an earlier integration, e.g. an earlier mission phase
+        warm_start:
+            WarmStart, default None, start from the first step and Jacobian of the previous solve, see "integrate_segment".
+            With sampled rules only the first segment is warm started
+
+    Returns:
+        ndarray, len(t) x len(state_initial) array of states at times "t", or None when recording
+
+    References:
+        [1] https://docs.scipy.org/doc/scipy/reference/generated/scipy.integrate.odeint.html
+    """
+    rules = control.sampled_rules(drum_control_rule)
+    if parareal is not None and rules:
+        raise ValueError('Parareal integration is not defined for sampled control rules: {}'.format(rules))
+    if parareal is not None and (method != ODEINT or any(option is not None for option in (rtol, atol, max_step, jacobian, statistics,
+                                                                                          warm_start))):
+        raise ValueError('Parareal integration uses its own integrator settings, set them on the Parareal object')
+    options = dict(method=method, rtol=rtol, atol=atol, max_step=max_step, jacobian=jacobian, statistics=statistics)
+
+    if recorder is None:
+        if parareal is not None:
+            return parareal.integrate(deriv_func, state_initial, t)
+        if not rules:
+            return integrate_segment(deriv_func, state_initial, t, warm_start=warm_start, **options)
+        res = np.empty((len(t), len(state_initial)))
+
+        def emit(start: int, states: np.ndarray):
+            res[start:start + len(states)] = states
+    else:
+        recorder.reset(t, num_states=len(state_initial))
+        emit = recorder.update
+        res = None
+        if parareal is not None:
+            recorder.update(0, parareal.integrate(deriv_func, state_initial, t))
+            return None
+
+    emit(0, np.asarray(state_initial)[np.newaxis])
+    state_array = state_initial
+    if not rules:
+        stream_segment(deriv_func, state_array, t, emit, recorder.chunk_size, warm_start=warm_start, **options)
+        return res
+
+    if reset_rules:
+        for rule in rules:
+            rule.reset()
+
+    boundaries = sample_times(rules, t_start=t[0], t_end=t[-1])
+    for t0, t1 in zip(boundaries[:-1], boundaries[1:]):
+        state = State.from_array(state_array)
+        for rule in rules:
+            rule.sample(t0, state)
+
+        # Output times within (t0, t1], bracketed by the segment boundaries
+        start, stop = np.searchsorted(t, [t0, t1], side='right')
+        t_segment = np.concatenate(([t0], t[start:stop]))
+        if t_segment[-1] < t1:
+            t_segment = np.append(t_segment, t1)
+
+        segment = integrate_segment(deriv_func, state_array, t_segment, warm_start=warm_start if t0 == boundaries[0] else None,
+                                    **options)
+        if stop > start:
+            emit(start, segment[1:1 + stop - start])
+        state_array = segment[-1]
+    return res
+
+
+def initial_state(power_initial: float, precursor_density_initial: np.ndarray, total_beta: float, temp_mod_initial: float,
+                  temp_fuel_initial: float, drum_angle_initial: typing.Union[float, np.ndarray], drums: Drums = None) -> np.ndarray:
+    """Build the initial state array, with the reactivities consistent with the initial temperatures and drum angle
+
+    With individually modelled drums "drum_angle_initial" is the angle of all drums or of every drum, and the drum angles
+    are appended to the state array.
+
+    Returns:
+        ndarray, the state array
+    """
+    rho_fuel_temp_initial = dynamics.temp_fuel_reactivity(beta=total_beta, temp_fuel=temp_fuel_initial)
+    rho_mod_temp_initial = dynamics.temp_mod_reactivity(beta=total_beta, temp_mod=temp_mod_initial)
+    drum_angles = None
+    if drums is None:
+        rho_con_drum_initial = dynamics.con_drum_reactivity(beta=total_beta, drum_angle=drum_angle_initial)
+    else:
+        drum_angles = drums.initial_angles(drum_angle_initial)
+        drum_angle_initial = np.mean(drum_angles)
+        rho_con_drum_initial = drums.reactivity(beta=total_beta, drum_angles=drum_angles)
+
+    state = State(power_initial, precursor_density_initial, temp_mod_initial, temp_fuel_initial, rho_fuel_temp_initial, rho_mod_temp_initial,
+                  drum_angle_initial, rho_con_drum_initial, drum_angles=drum_angles)
+    return state.to_array()
+
+
+def state_deriv_func(beta_vector: np.ndarray, precursor_constants: np.ndarray, total_beta: float, period: float, heat_coeff: Property,
+                     mass_mod: float, heat_cap_mod: Property, mass_flow: float, mass_fuel: float, heat_cap_fuel: Property, temp_in: float,
+                     drum_control_rule: ControlRule, drums: Drums = None) -> typing.Callable:
+    """Partialize the state derivative function for signature compatibility with scipy.odeint, see [1] for "func" signature details
+
+    Returns:
+        callable, picklable state derivative func(state_array, t)
+
+    References:
+        [1] https://docs.scipy.org/doc/scipy/reference/generated/scipy.integrate.odeint.html
+    """
+    return functools.partial(state_deriv_array,
+                             beta_vector=beta_vector,
+                             precursor_constants=precursor_constants,
+                             total_beta=total_beta,
+                             period=period,
+                             heat_coeff=heat_coeff,
+                             mass_mod=mass_mod,
+                             heat_cap_mod=heat_cap_mod,
+                             mass_flow=mass_flow,
+                             mass_fuel=mass_fuel,
+                             heat_cap_fuel=heat_cap_fuel,
+                             temp_in=temp_in,
+                             drum_control_rule=drum_control_rule,
+                             drums=drums)
+
+
+def _state_jacobian_array(state_array: np.ndarray, t: float, beta_vector: np.ndarray, precursor_constants: np.ndarray,
+                          total_beta: float, period: float, heat_coeff: Property, mass_mod: float, heat_cap_mod: Property,
+                          mass_flow: float, mass_fuel: float, heat_cap_fuel: Property, temp_in: float,
+                          drum_control_rule: ControlRule) -> np.ndarray:
+    state = State.from_array(state_array)
+    return linear.state_jacobian(state_array, beta_vector=beta_vector, precursor_constants=precursor_constants, total_beta=total_beta,
+                                 period=period, heat_coeff=properties.evaluate(heat_coeff, state.t_mod), mass_mod=mass_mod,
+                                 heat_cap_mod=properties.evaluate(heat_cap_mod, state.t_mod), mass_flow=mass_flow, mass_fuel=mass_fuel,
+                                 heat_cap_fuel=properties.evaluate(heat_cap_fuel, state.t_fuel), temp_in=temp_in,
+                                 drum_speed=drum_control_rule.drum_speed(t=t, state=state))
+
+
+def state_jacobian_func(beta_vector: np.ndarray, precursor_constants: np.ndarray, total_beta: float, period: float, heat_coeff: Property,
+                        mass_mod: float, heat_cap_mod: Property, mass_flow: float, mass_fuel: float, heat_cap_fuel: Property, temp_in: float,
+                        drum_control_rule: ControlRule) -> typing.Callable:
+    """Partialize the Jacobian of the state derivative with the odeint "Dfun" signature, see linear.state_jacobian
+
+    The Jacobian neglects the dependence of the drum speed and of PropertyTables on the state. An approximate
+    Jacobian only slows the convergence of the corrector of the stiff integrators, the accuracy of the result is
+    governed by the tolerances.
+
+    Returns:
+        callable, picklable Jacobian func(state_array, t)
+    """
+    return functools.partial(_state_jacobian_array, beta_vector=beta_vector, precursor_constants=precursor_constants, total_beta=total_beta,
+                             period=period, heat_coeff=heat_coeff, mass_mod=mass_mod, heat_cap_mod=heat_cap_mod, mass_flow=mass_flow,
+                             mass_fuel=mass_fuel, heat_cap_fuel=heat_cap_fuel, temp_in=temp_in, drum_control_rule=drum_control_rule)
+
+
 def solve(power_initial: float, precursor_density_initial: np.ndarray, beta_vector: np.ndarray,
-          precursor_constants: np.ndarray, total_beta: float, period: float, heat_coeff: float,
-          mass_mod: float, heat_cap_mod: float, mass_flow: float, mass_fuel: float, heat_cap_fuel: float,
+          precursor_constants: np.ndarray, total_beta: float, period: float, heat_coeff: Property,
+          mass_mod: float, heat_cap_mod: Property, mass_flow: float, mass_fuel: float, heat_cap_fuel: Property,
           temp_in: float, temp_mod_initial: float, temp_fuel_initial: float, drum_control_rule: ControlRule,
-          drum_angle_initial: float, t_max: float, t_start: float = 0, num_iters: int = 100) -> Solution:
+          drum_angle_initial: typing.Union[float, np.ndarray], t_max: float, t_start: float = 0, num_iters: int = 100,
+          parareal: Parareal = None, record: Recorder = None, method: str = ODEINT, rtol: float = None, atol: float = None,
+          jacobian: bool = False, statistics: IntegratorStatistics = None, drums: Drums = None,
+          warm_start: WarmStart = None) -> Solution:
 
     """Solving differential equations to calculate parameters of reactor at a certain state
 
@@ -74,17 +504,17 @@ def solve(power_initial: float, precursor_density_initial: np.ndarray, beta_vect
         period:
             float, effective generation time                            [sec]
         heat_coeff:
-            float, heat transfer coefficient of fuel and moderator      [J/K/sec]
+            float or PropertyTable, heat transfer coefficient of fuel and moderator, evaluated at T_mod   [J/K/sec]
         mass_mod:
             float, mass of moderator                                    [kg]
         heat_cap_mod:
-            float, specific Heat capacity of moderator                  [J/kg/K]
+            float or PropertyTable, specific Heat capacity of moderator, evaluated at T_mod   [J/kg/K]
         mass_flow:
             float, total moderator/coolant mass flow rate               [kg/sec]
         mass_fuel:
             float, mass of fuel                                         [kg]
         heat_cap_fuel:
-            float, specific heat capacity of fuel                       [J/kg/K]
+            float or PropertyTable, specific heat capacity of fuel, evaluated at T_fuel   [J/kg/K]
         T_fuel:
             float, temperature of fuel                                  [K]
         T_mod:
@@ -107,6 +537,31 @@ def solve(power_initial: float, precursor_density_initial: np.ndarray, beta_vect
             float, default 0, starting time of simulation               [sec]
         num_iters:
             int, default 100, number of iterations                      []
+        parareal:
+            Parareal, default None, integrate in parallel over time slices with these settings, the iteration count and
+            speedup of the run are recorded on this object
+        record:
+            Recorder, default None, store only the selected state components and reductions, see eark.recording.
+            Defaults to storing all components at every output time
+        method:
+            str, default "odeint", integrator, "odeint" or a solve_ivp method, see "integrate_segment"
+        rtol:
+            float, default None, relative tolerance, defaults to that of the integrator
+        atol:
+            float, default None, absolute tolerance, defaults to that of the integrator
+        jacobian:
+            bool, default False, give the stiff integrators the analytic Jacobian of the state derivative instead of
+            building it from finite differences, see "state_jacobian_func"
+        statistics:
+            IntegratorStatistics, default None, add the work done by the integrator
+        drums:
+            Drums, default None, model the drums individually, grouped into banks, see eark.drums. "drum_angle_initial"
+            is then the angle of all drums or an array of the angle of every drum, and "drum_control_rule" drives the
+            banks without their own rule. The drum angles are stored after the state components, see
+            Solution.drum_angles
+        warm_start:
+            WarmStart, default None, start the solve_ivp methods of IMPLICIT_METHODS from the first step and Jacobian of
+            the previous solve of a continuation path, see WarmStart
 
     Returns:
         ndarray, state vector evolution 7xnum_iters
@@ -114,34 +569,40 @@ def solve(power_initial: float, precursor_density_initial: np.ndarray, beta_vect
     References:
         [1] https://docs.scipy.org/doc/scipy/reference/generated/scipy.integrate.odeint.html
     """
-    # Build the initial state
-    rho_fuel_temp_initial = dynamics.temp_fuel_reactivity(beta=total_beta, temp_fuel=temp_fuel_initial)
-    rho_mod_temp_initial = dynamics.temp_mod_reactivity(beta=total_beta, temp_mod=temp_mod_initial)
-    rho_con_drum_initial = dynamics.con_drum_reactivity(beta=total_beta, drum_angle=drum_angle_initial)
+    if drums is not None and jacobian:
+        raise ValueError('The analytic Jacobian is not defined for individually modelled drums')
 
-    initial_state = State(power_initial, precursor_density_initial, temp_mod_initial, temp_fuel_initial, rho_fuel_temp_initial, rho_mod_temp_initial,
-                          drum_angle_initial, rho_con_drum_initial)
+    # Build the initial state
+    state_initial = initial_state(power_initial=power_initial, precursor_density_initial=precursor_density_initial, total_beta=total_beta,
+                                  temp_mod_initial=temp_mod_initial, temp_fuel_initial=temp_fuel_initial,
+                                  drum_angle_initial=drum_angle_initial, drums=drums)
 
     # Compute time intervals for odeint integrator
     t = np.linspace(t_start, t_max, num_iters)
 
-    # Partialize the state derivative function for signature compatibility with scipy.odeint, see [1] for "func" signature details
-    deriv_func = functools.partial(state_deriv_array,
-                                   beta_vector=beta_vector,
-                                   precursor_constants=precursor_constants,
-                                   total_beta=total_beta,
-                                   period=period,
-                                   heat_coeff=heat_coeff,
-                                   mass_mod=mass_mod,
-                                   heat_cap_mod=heat_cap_mod,
-                                   mass_flow=mass_flow,
-                                   mass_fuel=mass_fuel,
-                                   heat_cap_fuel=heat_cap_fuel,
-                                   temp_in=temp_in,
-                                   drum_control_rule=drum_control_rule)
+    deriv_func = state_deriv_func(beta_vector=beta_vector, precursor_constants=precursor_constants, total_beta=total_beta, period=period,
+                                  heat_coeff=heat_coeff, mass_mod=mass_mod, heat_cap_mod=heat_cap_mod, mass_flow=mass_flow,
+                                  mass_fuel=mass_fuel, heat_cap_fuel=heat_cap_fuel, temp_in=temp_in, drum_control_rule=drum_control_rule,
+                                  drums=drums)
+
+    jacobian_func = None
+    if jacobian:
+        jacobian_func = state_jacobian_func(beta_vector=beta_vector, precursor_constants=precursor_constants, total_beta=total_beta,
+                                            period=period, heat_coeff=heat_coeff, mass_mod=mass_mod, heat_cap_mod=heat_cap_mod,
+                                            mass_flow=mass_flow, mass_fuel=mass_fuel, heat_cap_fuel=heat_cap_fuel, temp_in=temp_in,
+                                            drum_control_rule=drum_control_rule)
+
+    # Bind the rules using the drum worth to the drums they move, and drive the drums with all rules so that the sampled
+    # rules among them are sampled
+    if drums is not None:
+        drums.bind(drum_control_rule)
+        drum_control_rule = control.CompositeControlRule(rules=drums.control_rules(drum_control_rule))
 
     # Compute result using odeint integrator, see [1] for numerical details
-    res = odeint(deriv_func, initial_state.to_array(), t)
+    res = integrate(deriv_func, state_initial, t, drum_control_rule, parareal=parareal, recorder=record, method=method, rtol=rtol,
+                    atol=atol, jacobian=jacobian_func, statistics=statistics, warm_start=warm_start)
 
     # Create solution object
-    return Solution(array=res, t=np.arange(t_start, t_max, (t_max - t_start) / num_iters))
+    if record is not None:
+        return record.solution()
+    return Solution(array=res, t=t)
@@ -24,12 +24,16 @@ class StateComponent(enum.IntEnum):
     RhoConDrum = 12
 
 
+# With individually modelled drums (see eark.drums) the drum angles follow the state components in the state array
+NUM_COMPONENTS = len(StateComponent)
+
+
 class State:
     __slots__ = ('neutron_population', 'precursor_densities', 't_mod', 't_fuel', 'rho_fuel_temp', 'rho_mod_temp', 'drum_angle',
-                 'rho_con_drum')
+                 'rho_con_drum', 'drum_angles')
 
     def __init__(self, neutron_population: float, precursor_densities: np.ndarray, t_mod: float, t_fuel: float,
-                 rho_fuel_temp: float, rho_mod_temp:float, drum_angle: float, rho_con_drum: float):
+                 rho_fuel_temp: float, rho_mod_temp:float, drum_angle: float, rho_con_drum: float, drum_angles: np.ndarray = None):
         """[TBD]
 
         Args:
@@ -41,6 +45,8 @@ class State:
             rho_mod_temp:
             drum_angle:
             rho_con_drum:
+            drum_angles:
+                ndarray, default None, angles of the individual drums, the drum angle is then their mean
         """
         self.neutron_population = neutron_population
         self.precursor_densities = precursor_densities
@@ -50,16 +56,20 @@ class State:
         self.rho_mod_temp = rho_mod_temp
         self.drum_angle = drum_angle
         self.rho_con_drum = rho_con_drum
+        self.drum_angles = drum_angles
 
     def to_array(self):
-        return np.concatenate((np.array([self.neutron_population]),
-                               self.precursor_densities,
-                               np.array([self.t_mod,
-                                         self.t_fuel,
-                                         self.rho_fuel_temp,
-                                         self.rho_mod_temp,
-                                         self.drum_angle,
-                                         self.rho_con_drum])), axis=0)
+        arrays = (np.array([self.neutron_population]),
+                  self.precursor_densities,
+                  np.array([self.t_mod,
+                            self.t_fuel,
+                            self.rho_fuel_temp,
+                            self.rho_mod_temp,
+                            self.drum_angle,
+                            self.rho_con_drum]))
+        if self.drum_angles is not None:
+            arrays += (self.drum_angles,)
+        return np.concatenate(arrays, axis=0)
 
     @staticmethod
     def from_array(state_array: np.ndarray):
@@ -70,4 +80,5 @@ class State:
                      rho_fuel_temp=state_array[StateComponent.RhoFuelTemp],
                      rho_mod_temp=state_array[StateComponent.RhoModTemp],
                      drum_angle=state_array[StateComponent.DrumAngle],
-                     rho_con_drum=state_array[StateComponent.RhoConDrum])
+                     rho_con_drum=state_array[StateComponent.RhoConDrum],
+                     drum_angles=state_array[NUM_COMPONENTS:] if len(state_array) > NUM_COMPONENTS else None)
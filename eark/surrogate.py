@@ -0,0 +1,315 @@
+"""Module for response surfaces, answering repeated what-if queries by interpolation instead of solving.
+
+A ResponseSurface maps a box of scenario parameters, named by their dotted scenario paths (see eark.scenario), to scalar
+outputs of the transient such as the peak fuel temperature within a time window. The box is sampled by Latin hypercube
+sampling and the samples are solved in parallel. The outputs are interpolated by a cubic polyharmonic spline with a
+linear polynomial tail in the parameters scaled to the unit box,
+
+    f(x) = sum_j w_j |x - x_j| ** 3 + c_0 + sum_k c_k x_k
+
+which is free of shape parameters and reproduces linear responses exactly. Evaluating it is one distance computation
+per sample, so a query costs microseconds.
+
+The leave-one-out error of every sample, the error of the interpolant fit without that sample, is computed without
+refitting using Rippa's formula [1], e_i = a_i / (M^-1)_ii with a the spline coefficients and M the interpolation
+matrix. The error estimate of a query is the leave-one-out error of its nearest sample, and refinement adds samples
+where the product of this error and the distance to the nearest sample is largest.
+
+References:
+    [1] Rippa S. An algorithm for selecting a good value for the parameter c in radial basis function interpolation.
+        Adv Comput Math. 1999;11:193-210.
+"""
+
+import concurrent.futures
+import json
+import typing
+
+import numpy as np
+
+from eark import derived
+from eark.scenario import Scenario
+from eark.solution import Solution
+from eark.state import StateComponent
+
+STATISTICS = ('peak', 'time_of_peak', 'min', 'mean', 'final')
+DEFAULT_NUM_CANDIDATES = 50   # refinement candidates per added sample
+
+
+class Output:
+    __slots__ = ('component', 'statistic', 't_min', 't_max', 'name')
+
+    def __init__(self, component: StateComponent, statistic: str = 'peak', t_min: float = None, t_max: float = None, name: str = None):
+        """Scalar output of a transient, a statistic of one state component over a time window
+
+        Args:
+            component:
+                StateComponent, the state component
+            statistic:
+                str, default "peak", one of STATISTICS
+            t_min:
+                float, default None, start of the window, defaults to the start of the transient   [sec]
+            t_max:
+                float, default None, end of the window, defaults to the end of the transient       [sec]
+            name:
+                str, default None, name of the output, defaults to "<statistic>_<component name>"
+        """
+        if statistic not in STATISTICS:
+            raise ValueError('Unknown statistic: {}, expected one of {}'.format(statistic, STATISTICS))
+        self.component = StateComponent(component)
+        self.statistic = statistic
+        self.t_min = t_min
+        self.t_max = t_max
+        self.name = '{}_{}'.format(statistic, self.component.name) if name is None else name
+
+    def __repr__(self):
+        return 'Output({}, {}, {}, {})'.format(self.component.name, self.statistic, self.t_min, self.t_max)
+
+    def to_dict(self) -> dict:
+        return dict(component=self.component.name, statistic=self.statistic, t_min=self.t_min, t_max=self.t_max, name=self.name)
+
+    @staticmethod
+    def from_dict(spec: dict) -> 'Output':
+        return Output(**dict(spec, component=StateComponent[spec['component']]))
+
+    def __call__(self, soln: Solution) -> float:
+        if self.statistic in ('peak', 'time_of_peak'):
+            value, t = soln.windowed_peak(self.component, t_min=self.t_min, t_max=self.t_max)
+            return value if self.statistic == 'peak' else t
+        t, values = soln.decimated(self.component)
+        span = derived.window(t, self.t_min, self.t_max)
+        t, values = t[span], values[span]
+        if self.statistic == 'min':
+            return float(np.min(values))
+        if self.statistic == 'mean':
+            if len(t) < 2:
+                # A window holding a single output time has no duration to average over
+                return float(values[0])
+            return float(np.sum(0.5 * (values[1:] + values[:-1]) * np.diff(t)) / (t[-1] - t[0]))
+        return float(values[-1])
+
+
+def latin_hypercube(num_points: int, num_dims: int, rng: np.random.Generator) -> np.ndarray:
+    """Latin hypercube sample of the unit box, one point in each of "num_points" equal slices of every dimension
+
+    Returns:
+        ndarray, num_points x num_dims array of points in [0, 1)
+    """
+    slices = np.argsort(rng.random((num_dims, num_points)), axis=1).T
+    return (slices + rng.random((num_points, num_dims))) / num_points
+
+
+def _evaluate(config: dict, outputs: typing.Sequence[Output]) -> typing.List[float]:
+    """Solve a scenario and evaluate the outputs, in a worker process"""
+    soln = Scenario(config).solve()
+    return [output(soln) for output in outputs]
+
+
+class ResponseSurface:
+    def __init__(self, scenario: Scenario, parameters: typing.Dict[str, typing.Tuple[float, float]], outputs: typing.Sequence[Output],
+                 max_workers: int = None):
+        """Interpolated response of scalar outputs to scenario parameters over a box
+
+        Args:
+            scenario:
+                Scenario, the base scenario, its values at the parameter paths are replaced by the samples
+            parameters:
+                dict of str to (float, float), lower and upper bound of each parameter, keyed by dotted scenario path.
+                The order of the parameters is the order of the columns of points
+            outputs:
+                sequence of Output, the interpolated outputs
+            max_workers:
+                int, default None, size of the process pool for solving the samples, defaults to the number of processors
+        """
+        self.scenario = scenario
+        self.parameters = list(parameters)
+        bounds = np.array([parameters[name] for name in self.parameters], dtype=float).reshape(-1, 2)
+        if np.any(bounds[:, 1] <= bounds[:, 0]):
+            raise ValueError('Parameter upper bounds must exceed the lower bounds, got: {}'.format(dict(parameters)))
+        self.lower = bounds[:, 0]
+        self.upper = bounds[:, 1]
+        self.outputs = list(outputs)
+        self.max_workers = max_workers
+
+        self.points = np.empty((0, len(self.parameters)))
+        self.values = np.empty((0, len(self.outputs)))
+        self._centers = None
+        self._weights = None
+        self._tail = None
+        self._loo = None
+
+    def __repr__(self):
+        return 'ResponseSurface({} -> {}, {:d} samples)'.format(self.parameters, [output.name for output in self.outputs],
+                                                               len(self.points))
+
+    def _scale(self, points: np.ndarray) -> np.ndarray:
+        return (points - self.lower) / (self.upper - self.lower)
+
+    def _points(self, points: typing.Union[np.ndarray, typing.Dict[str, typing.Any]]) -> np.ndarray:
+        """Points as an array, from an array with a column per parameter or from a dict keyed by parameter"""
+        if isinstance(points, dict):
+            points = np.stack(np.broadcast_arrays(*(np.asarray(points[name], dtype=float) for name in self.parameters)), axis=-1)
+        points = np.asarray(points, dtype=float)
+        return points.reshape(-1, len(self.parameters)) if points.ndim < 2 else points
+
+    def _configs(self, points: np.ndarray) -> typing.List[dict]:
+        scenario = self.scenario
+        if not scenario.config.get('record'):
+            # Only the components of the outputs need to be stored
+            components = sorted(set(output.component for output in self.outputs))
+            scenario = scenario.with_overrides({'record': {'components': [c.name for c in components]}})
+        return [scenario.with_overrides({name: float(x) for name, x in zip(self.parameters, point)}).config for point in points]
+
+    def evaluate(self, points: np.ndarray) -> np.ndarray:
+        """Solve the scenario at each point in parallel and evaluate the outputs
+
+        Args:
+            points:
+                ndarray, num_points x num_parameters array of parameter values
+
+        Returns:
+            ndarray, num_points x num_outputs array of output values
+        """
+        points = self._points(points)
+        if len(points) == 0:
+            return np.empty((0, len(self.outputs)))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            values = list(executor.map(_evaluate, self._configs(points), [self.outputs] * len(points)))
+        return np.array(values, dtype=float).reshape(len(points), len(self.outputs))
+
+    def fit(self, points: np.ndarray, values: np.ndarray):
+        """Fit the interpolant to solved samples, replacing any previous samples"""
+        self.points = self._points(points)
+        self.values = np.asarray(values, dtype=float).reshape(len(self.points), len(self.outputs))
+        num_points, num_dims = self.points.shape
+        if num_points < num_dims + 1:
+            raise ValueError('At least {:d} samples are needed for {:d} parameters, got: {:d}'.format(num_dims + 1, num_dims, num_points))
+
+        centers = self._scale(self.points)
+        tail = np.hstack((np.ones((num_points, 1)), centers))
+        matrix = np.zeros((num_points + num_dims + 1, num_points + num_dims + 1))
+        matrix[:num_points, :num_points] = np.linalg.norm(centers[:, np.newaxis] - centers[np.newaxis], axis=-1) ** 3
+        matrix[:num_points, num_points:] = tail
+        matrix[num_points:, :num_points] = tail.T
+        inverse = np.linalg.inv(matrix)
+        coeffs = inverse[:, :num_points] @ self.values
+
+        self._centers = centers
+        self._weights = coeffs[:num_points]
+        self._tail = coeffs[num_points:]
+        self._loo = self._weights / np.diag(inverse)[:num_points, np.newaxis]
+
+    @property
+    def loo_errors(self) -> np.ndarray:
+        """Leave-one-out error of each sample and output, num_samples x num_outputs"""
+        return self._loo
+
+    def sample(self, num_points: int, seed: int = None) -> np.ndarray:
+        """Latin hypercube sample of the parameter box, num_points x num_parameters"""
+        rng = np.random.default_rng(seed)
+        return self.lower + latin_hypercube(num_points, len(self.parameters), rng) * (self.upper - self.lower)
+
+    def build(self, num_points: int, seed: int = None):
+        """Sample the parameter box, solve the samples in parallel and fit the interpolant"""
+        points = self.sample(num_points, seed=seed)
+        self.fit(points, self.evaluate(points))
+
+    def _nearest(self, centers: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Index of and distance to the nearest sample of each scaled point"""
+        distances = np.linalg.norm(centers[:, np.newaxis] - self._centers[np.newaxis], axis=-1)
+        nearest = np.argmin(distances, axis=1)
+        return nearest, distances[np.arange(len(centers)), nearest]
+
+    def refine(self, num_points: int, num_candidates: int = None, seed: int = None) -> np.ndarray:
+        """Add samples where the interpolation error is expected to be largest, solve them and refit
+
+        Candidates from a Latin hypercube sample are scored by the largest relative leave-one-out error of their nearest
+        sample times the distance to it, and the best are chosen greedily, counting the chosen points as samples.
+
+        Args:
+            num_points:
+                int, number of samples to add
+            num_candidates:
+                int, default None, number of candidate points, defaults to 50 per added sample
+            seed:
+                int, default None, seed of the candidate sample
+
+        Returns:
+            ndarray, the added points
+        """
+        num_candidates = DEFAULT_NUM_CANDIDATES * num_points if num_candidates is None else num_candidates
+        candidates = self.sample(num_candidates, seed=seed)
+        scaled = self._scale(candidates)
+        spread = np.ptp(self.values, axis=0)
+        spread[spread == 0] = 1.0
+        error = np.max(np.abs(self._loo) / spread, axis=1)
+
+        nearest, distance = self._nearest(scaled)
+        score_error = error[nearest]
+        chosen = []
+        for _ in range(min(num_points, num_candidates)):
+            best = int(np.argmax(score_error * distance))
+            chosen.append(best)
+            distance = np.minimum(distance, np.linalg.norm(scaled - scaled[best], axis=1))
+
+        points = candidates[chosen]
+        self.fit(np.vstack((self.points, points)), np.vstack((self.values, self.evaluate(points))))
+        return points
+
+    def predict(self, points: typing.Union[np.ndarray, typing.Dict[str, typing.Any]], return_error: bool = False):
+        """Interpolate the outputs
+
+        Args:
+            points:
+                ndarray or dict, num_points x num_parameters array, or dict of parameter values keyed by parameter
+            return_error:
+                bool, default False, also return the error estimate, the leave-one-out error of the nearest sample
+
+        Returns:
+            ndarray, num_points x num_outputs array of output values, and the error estimates if "return_error"
+        """
+        if self._weights is None:
+            raise ValueError('The response surface has not been fit, call "build" or "fit" first')
+        centers = self._scale(self._points(points))
+        distances = np.linalg.norm(centers[:, np.newaxis] - self._centers[np.newaxis], axis=-1)
+        values = (distances ** 3) @ self._weights + self._tail[0] + centers @ self._tail[1:]
+        if not return_error:
+            return values
+        nearest = np.argmin(distances, axis=1)
+        return values, np.abs(self._loo[nearest])
+
+    def query(self, **values: float) -> typing.Dict[str, float]:
+        """Interpolate the outputs at one point, with parameters given by keyword, using "__" in place of "."
+
+        Returns:
+            dict of output name to value
+        """
+        point = {name.replace('__', '.'): value for name, value in values.items()}
+        missing = sorted(set(self.parameters) - set(point))
+        if missing:
+            raise ValueError('Missing parameters: {}'.format(missing))
+        return {output.name: float(value) for output, value in zip(self.outputs, self.predict(point)[0])}
+
+    def save(self, path: str):
+        """Write the scenario, parameters, outputs and samples to a compressed numpy archive, the interpolant is refit
+        when loading
+        """
+        spec = dict(scenario=dict(self.scenario.config, name=self.scenario.name), parameters=self.parameters,
+                    outputs=[output.to_dict() for output in self.outputs])
+        with open(path, 'wb') as fh:
+            np.savez_compressed(fh, spec=np.array(json.dumps(spec)), lower=self.lower, upper=self.upper, points=self.points,
+                                values=self.values)
+
+    @staticmethod
+    def load(path: str, max_workers: int = None) -> 'ResponseSurface':
+        """Read a response surface written by "save"
+
+        Returns:
+            ResponseSurface
+        """
+        with np.load(path) as data:
+            spec = json.loads(str(data['spec']))
+            parameters = dict(zip(spec['parameters'], zip(data['lower'], data['upper'])))
+            surface = ResponseSurface(Scenario(spec['scenario']), parameters=parameters,
+                                      outputs=[Output.from_dict(output) for output in spec['outputs']], max_workers=max_workers)
+            surface.fit(data['points'], data['values'])
+        return surface
@@ -0,0 +1,143 @@
+"""Module for dense parameter sweeps of a scenario.
+
+The stiff integrator spends most of a solve building Jacobians from finite differences, one derivative evaluation per
+state component each time. A Sweep gives it the analytic Jacobian of the state derivative instead (see
+solver.state_jacobian_func), which nearly halves the derivative evaluations per point. The points are cut into one
+contiguous chunk per worker process, so each worker imports eark and pickles its results once rather than per point.
+The results agree with those of Scenario.solve within the integrator tolerance.
+
+With a warm start the points are ordered along a continuation path, each point next to its nearest unsolved neighbour,
+and the BDF or Radau integrator of each point starts from the first step size and initial Jacobian of the point before it
+(see solver.WarmStart), which saves the first-step selection and most initial Jacobian evaluations. The states of a point
+are not seeded from its neighbour: an initial value problem starts from the state given by its parameters.
+"""
+
+import concurrent.futures
+import os
+import time
+import typing
+
+import numpy as np
+
+from eark import solver
+from eark.scenario import Scenario
+from eark.solution import Solution
+
+
+def continuation_order(points: np.ndarray) -> np.ndarray:
+    """Order of the points along a continuation path, which starts at the lowest point (compared parameter by parameter)
+    and always moves on to the nearest point not yet visited, with every parameter scaled by its range
+
+    Args:
+        points:
+            ndarray, num_points x num_parameters array of parameter values
+
+    Returns:
+        ndarray, indices of the points in path order
+    """
+    span = np.ptp(points, axis=0)
+    span[span == 0] = 1.0
+    scaled = points / span
+    order = [int(np.lexsort(scaled.T[::-1])[0])]
+    unvisited = np.ones(len(points), dtype=bool)
+    unvisited[order[0]] = False
+    for _ in range(len(points) - 1):
+        distance = np.where(unvisited, np.sum((scaled - scaled[order[-1]]) ** 2, axis=1), np.inf)
+        order.append(int(np.argmin(distance)))
+        unvisited[order[-1]] = False
+    return np.array(order)
+
+
+def _solve_chunk(configs: typing.Sequence[dict], jacobian: bool, method: str, rtol: float, atol: float,
+                 warm_start: bool) -> typing.Tuple[typing.List[Solution], typing.Tuple[int, int, int]]:
+    """Solve scenarios in a worker process, in order and each warm started from the one before if requested, returns the
+    solutions and the integrator statistics"""
+    statistics = solver.IntegratorStatistics()
+    warm = solver.WarmStart() if warm_start else None
+    solutions = [Scenario(config).solve(jacobian=jacobian, statistics=statistics, method=method, rtol=rtol, atol=atol, warm_start=warm)
+                 for config in configs]
+    return solutions, (statistics.num_steps, statistics.num_rhs, statistics.num_jac)
+
+
+class Sweep:
+    def __init__(self, scenario: Scenario, parameters: typing.Sequence[str], jacobian: bool = True, max_workers: int = None,
+                 method: str = solver.ODEINT, rtol: float = None, atol: float = None, warm_start: bool = False):
+        """Sweep of a scenario over points in a space of scenario parameters, the integrator statistics of the most recent
+        sweep are stored on the instance
+
+        Args:
+            scenario:
+                Scenario, the base scenario, its values at the parameter paths are replaced by the points
+            parameters:
+                sequence of str, dotted scenario paths of the parameters, in the order of the columns of points
+            jacobian:
+                bool, default True, solve with the analytic Jacobian, otherwise every point is solved as by Scenario.solve
+            max_workers:
+                int, default None, number of worker processes, each solving one chunk of the points, defaults to the
+                number of processors. With one worker the sweep is solved in this process
+            method:
+                str, default "odeint", integrator, see solver.integrate_segment
+            rtol:
+                float, default None, relative tolerance, defaults to that of the integrator
+            atol:
+                float, default None, absolute tolerance, defaults to that of the integrator
+            warm_start:
+                bool, default False, solve the points along a continuation path, each starting from the integrator
+                settings of the one before, see continuation_order and solver.WarmStart. Requires a solve_ivp method of
+                solver.IMPLICIT_METHODS, such as "BDF" or "Radau"
+        """
+        if warm_start and method not in solver.IMPLICIT_METHODS:
+            raise ValueError('Warm starts are only defined for the solve_ivp methods {}, got: {}'.format(solver.IMPLICIT_METHODS, method))
+        self.scenario = scenario
+        self.parameters = list(parameters)
+        self.jacobian = jacobian
+        self.max_workers = max_workers
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+        self.warm_start = warm_start
+
+        self.statistics = solver.IntegratorStatistics()
+        self.wall_time = 0.0
+
+    def __repr__(self):
+        return 'Sweep({}, {}, {:.2f}s wall)'.format(self.parameters, self.statistics, self.wall_time)
+
+    def solve(self, points: np.ndarray) -> typing.List[Solution]:
+        """Solve the scenario at each point
+
+        Args:
+            points:
+                ndarray, num_points x num_parameters array of parameter values, or a 1D array for a single parameter
+
+        Returns:
+            list of Solution, in the order of "points"
+        """
+        start = time.perf_counter()
+        points = np.asarray(points, dtype=float)
+        points = points.reshape(-1, len(self.parameters)) if points.ndim < 2 else points
+        self.statistics = solver.IntegratorStatistics()
+        if len(points) == 0:
+            return []
+
+        configs = [self.scenario.with_overrides({name: float(x) for name, x in zip(self.parameters, point)}).config for point in points]
+        # Each chunk is a contiguous section of the continuation path when warm starting
+        order = continuation_order(points) if self.warm_start else np.arange(len(points))
+        num_chunks = min(len(points), self.max_workers or os.cpu_count() or 1)
+        chunks = [[configs[i] for i in chunk] for chunk in np.array_split(order, num_chunks)]
+        if num_chunks == 1:
+            results = [_solve_chunk(chunks[0], self.jacobian, self.method, self.rtol, self.atol, self.warm_start)]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=num_chunks) as executor:
+                results = list(executor.map(_solve_chunk, chunks, *([setting] * num_chunks for setting in
+                                                                    (self.jacobian, self.method, self.rtol, self.atol, self.warm_start))))
+
+        for _, (num_steps, num_rhs, num_jac) in results:
+            self.statistics.num_steps += num_steps
+            self.statistics.num_rhs += num_rhs
+            self.statistics.num_jac += num_jac
+        solutions = [None] * len(points)
+        for i, soln in zip(order, (soln for chunk_solutions, _ in results for soln in chunk_solutions)):
+            solutions[i] = soln
+        self.wall_time = time.perf_counter() - start
+        return solutions
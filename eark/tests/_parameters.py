@@ -1,48 +1,28 @@
-"""Parameters for unittests, borrowed from scripts/run on 20200509"""
+"""Parameters for unittests, the reference parameters of eark.parameters and those of the tests only"""
 
 import numpy as np
 
+from eark import solver
 from eark.control import LinearControlRule
-
-###################################################
-#         USER INPUTS - DEFINE QUANTITIES         #
-###################################################
-
-################## PHYSICS PARAMETERS #############
-
-
-POWER_INITIAL = 25e6                                            # initial Reactor Power                    [W]
-BETA = 0.0071                                                   # delayed neutron fraction
-BETA_VECTOR = np.array([2.23985e-4,
-                        1.18115e-3,
-                        1.16108e-3,
-                        3.29914e-3,
-                        1.00849e-3,
-                        3.57418e-4])
-PERIOD = 2.63382e-5                                             # effective generation time                [s]
-PRECURSOR_CONSTANTS = np.array([1.24906e-2,
-                                3.17621e-2,
-                                1.09665e-1,
-                                3.18385e-1,
-                                1.35073e0,
-                                8.73657e0])
-PRECURSOR_DENSITY_INITIAL = BETA_VECTOR / (PRECURSOR_CONSTANTS * PERIOD) * POWER_INITIAL
-
+from eark.parameters import BETA
+from eark.parameters import BETA_VECTOR
+from eark.parameters import DRUM_ANGLE_INITIAL
+from eark.parameters import HEAT_CAP_FUEL
+from eark.parameters import HEAT_CAP_MOD
+from eark.parameters import HEAT_COEFF
+from eark.parameters import MASS_FLOW
+from eark.parameters import MASS_FUEL
+from eark.parameters import MASS_MOD
+from eark.parameters import PERIOD
+from eark.parameters import POWER_INITIAL
+from eark.parameters import PRECURSOR_CONSTANTS
+from eark.parameters import PRECURSOR_DENSITY_INITIAL
+from eark.parameters import TEMP_FUEL_INITIAL
+from eark.parameters import TEMP_IN
+from eark.parameters import TEMP_MOD_INITIAL
+from eark.solution import Solution
 
 ################## TH PARAMETERS ##################
-HEAT_CAP_FUEL = 200                                           # specific Heat Capacity of Fuel           [J/kg/K]
-HEAT_CAP_MOD = 4000                                           # specific Heat Capacity of Moderator      [J/kg/K]
-HEAT_COEFF = 4e6                                              # heat transfer coefficient fuel/moderator [J/K/sec]
-MASS_FUEL = 575                                               # mass of Fuel                             [kg]
-MASS_MOD = 1000                                               # mass of Moderator                        [kg]
-MASS_FLOW = 22                                                # total moderator/coolant mass flow rate   [kg/sec]
-TEMP_IN = 300                                                 # inlet coolant temperature                [K]
-TEMP_MOD_INITIAL = TEMP_IN + \
-                   (POWER_INITIAL / (2 * MASS_FLOW * HEAT_CAP_MOD))
-
-TEMP_FUEL_INITIAL = TEMP_IN + \
-                    (1 / (2 * MASS_FLOW * HEAT_CAP_MOD) + (1 / HEAT_COEFF)) * POWER_INITIAL
-
 FUEL_GAS_DENSITY = 0.001                                      # fuel element gas density                 [g/cc]
 MODR_GAS_DENSITY = 0.015                                      # moderator return channel gas density     [g/cc]
 MODS_GAS_DENSITY = 0.035                                      # moderator supply channel gas density     [g/cc]
@@ -59,4 +39,27 @@ V_F = np.pi * (D_EFF**2 - D_COOLANT**2) * L_F                  # Fuel Material V
 ########### CONTROL DRUM PARAMETERS ################
 DRUM_SPEED   =  LinearControlRule(coeff=0, const= 0.0, t_min=0, t_max=0)
 
-DRUM_ANGLE_INITIAL = 64.65                                     # initial angle of control drum           [deg]
+# Drum withdrawal used by most transient tests: -1 deg/sec from 2 to 4 seconds
+WITHDRAWAL = LinearControlRule(coeff=0, const=-1.0, t_min=2, t_max=4)
+
+
+def solve(drum_control_rule: LinearControlRule = WITHDRAWAL, t_max: float = 20, num_iters: int = 201, **kwargs) -> Solution:
+    """Solve a transient with the parameters of this module, keyword arguments replace any other argument of solver.solve"""
+    arguments = dict(power_initial=POWER_INITIAL,
+                     precursor_density_initial=PRECURSOR_DENSITY_INITIAL,
+                     beta_vector=BETA_VECTOR,
+                     precursor_constants=PRECURSOR_CONSTANTS,
+                     total_beta=BETA,
+                     period=PERIOD,
+                     heat_coeff=HEAT_COEFF,
+                     mass_mod=MASS_MOD,
+                     heat_cap_mod=HEAT_CAP_MOD,
+                     mass_flow=MASS_FLOW,
+                     mass_fuel=MASS_FUEL,
+                     heat_cap_fuel=HEAT_CAP_FUEL,
+                     temp_in=TEMP_IN,
+                     temp_mod_initial=TEMP_MOD_INITIAL,
+                     temp_fuel_initial=TEMP_FUEL_INITIAL,
+                     drum_angle_initial=DRUM_ANGLE_INITIAL)
+    arguments.update(kwargs)
+    return solver.solve(drum_control_rule=drum_control_rule, t_max=t_max, num_iters=num_iters, **arguments)
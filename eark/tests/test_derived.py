@@ -0,0 +1,86 @@
+"""Unittests for the derived module
+"""
+
+import numpy as np
+import pytest
+
+from eark import control
+from eark import derived
+from eark.recording import Recorder
+from eark.solution import Solution
+from eark.state import StateComponent
+from eark.tests import _parameters
+
+
+class TestDerived:
+    def test_analytic(self):
+        t = np.linspace(0, 10, 1001)
+        power = np.exp(t / 2.5)
+        np.testing.assert_allclose(derived.reactor_period(t, power)[1:-1], 2.5, rtol=1e-4)
+        np.testing.assert_array_equal(derived.reactor_period(np.arange(11.0), np.ones(11)), np.inf)
+        np.testing.assert_allclose(derived.cumulative_integral(t, 2 * t), t ** 2, atol=1e-12)
+        np.testing.assert_allclose(derived.rate(t, 3 * t ** 2)[1:-1], 6 * t[1:-1], rtol=1e-12)
+
+    def test_window(self):
+        t = np.linspace(0, 10, 11)
+        assert derived.window(t) == slice(0, 11)
+        assert derived.window(t, 2.0, 4.5) == slice(2, 5)
+        with pytest.raises(ValueError):
+            derived.window(t, 4.2, 4.8)
+
+    def test_windowed_peak_stack(self):
+        t = np.linspace(0, 10, 101)
+        values = np.stack([np.sin(t + phase) for phase in np.linspace(0, 3, 50)])
+        peaks, times = derived.windowed_peak(t, values, t_min=1, t_max=6)
+        assert peaks.shape == times.shape == (50,)
+        for row, peak, time in zip(values, peaks, times):
+            assert derived.windowed_peak(t, row, t_min=1, t_max=6) == (peak, time)
+
+
+class TestSolutionDerived:
+    def setup_method(self):
+        self.soln = _parameters.solve()
+
+    def test_cached(self):
+        soln = self.soln
+        assert soln.total_reactivity is soln.total_reactivity
+        np.testing.assert_array_equal(soln.total_reactivity, soln.rho_fuel_temp + soln.rho_mod_temp + soln.rho_con_drum)
+        assert soln.energy[-1] == pytest.approx(np.sum(np.diff(soln.t) * (soln.neutron_population[1:] + soln.neutron_population[:-1]) / 2), rel=1e-12)
+        np.testing.assert_allclose(soln.temp_fuel_rate, np.gradient(soln.temp_fuel, soln.t))
+        np.testing.assert_allclose(soln.reactor_period, soln.neutron_population / np.gradient(soln.neutron_population, soln.t))
+        with pytest.raises(KeyError):
+            soln.quantity('temp_in')
+        assert soln.quantity_times('energy') is soln.t
+        with pytest.raises(KeyError):
+            soln.quantity_times('temp_in')
+
+    def test_windowed_peak(self):
+        peak, t = self.soln.windowed_peak(StateComponent.TFuel, t_min=2, t_max=20)
+        i = np.argmax(np.where(self.soln.t >= 2, self.soln.temp_fuel, -np.inf))
+        assert (peak, t) == (self.soln.temp_fuel[i], self.soln.t[i])
+        assert self.soln.windowed_peak('total_reactivity')[0] == np.max(self.soln.total_reactivity)
+
+    def test_decimated(self):
+        soln = _parameters.solve(record=Recorder(components=[StateComponent.NeutronPopulation, StateComponent.TFuel],
+                                                 cadence={StateComponent.NeutronPopulation: 10}))
+        with pytest.raises(KeyError, match='decimated'):
+            soln.energy
+        with pytest.raises(KeyError):
+            soln.total_reactivity
+        t, values = soln.decimated(StateComponent.NeutronPopulation)
+        np.testing.assert_array_equal(soln.quantity_times(StateComponent.NeutronPopulation), t)
+        np.testing.assert_array_equal(soln.quantity_times(StateComponent.TFuel), soln.t)
+        assert soln.windowed_peak(StateComponent.NeutronPopulation) == (np.max(values), t[np.argmax(values)])
+        np.testing.assert_array_equal(soln.temp_fuel_rate, derived.rate(soln.t, soln.temp_fuel))
+
+    def test_stack(self):
+        solutions = [self.soln, _parameters.solve(drum_control_rule=control.LinearControlRule(coeff=0, const=-0.5, t_min=2, t_max=4)),
+                     _parameters.solve(drum_control_rule=control.LinearControlRule(coeff=0, const=0.5, t_min=2, t_max=4))]
+        t, values = Solution.stack(solutions, 'energy')
+        assert values.shape == (3, len(self.soln.t))
+        np.testing.assert_array_equal(values[0], self.soln.energy)
+        peaks, times = derived.windowed_peak(*Solution.stack(solutions, StateComponent.TFuel), t_min=2)
+        assert [(peak, time) for peak, time in zip(peaks, times)] == [soln.windowed_peak(StateComponent.TFuel, t_min=2)
+                                                                     for soln in solutions]
+        with pytest.raises(ValueError):
+            Solution.stack([self.soln, Solution(self.soln.array[::2], self.soln.t[::2])], 'energy')
@@ -0,0 +1,145 @@
+"""Unittests for the drums module
+"""
+
+import numpy as np
+import pytest
+
+from eark import dynamics
+from eark import solver
+from eark.control import FuelTemperatureHoldControlRule
+from eark.control import LinearControlRule
+from eark.drums import DRUM_WORTH_COEFFICIENTS
+from eark.drums import DrumBank
+from eark.drums import Drums
+from eark.scenario import Scenario
+from eark.state import NUM_COMPONENTS
+from eark.state import State
+from eark.state import StateComponent
+from eark.tests import _parameters
+
+SCENARIO = Scenario({'control': {'rules': [{'type': 'linear', 'coeff': 0, 'const': -1.0, 't_min': 2, 't_max': 4}]},
+                     'time': {'t_max': 20, 'num_iters': 201}})
+
+
+class TestDrums:
+    def test_worth(self):
+        drums = Drums(12)
+        angles = np.array([[0.0] * 12, [90.0] * 12, [_parameters.DRUM_ANGLE_INITIAL] * 12])
+        desired = dynamics.con_drum_reactivity(beta=_parameters.BETA, drum_angle=angles[:, 0])
+        np.testing.assert_allclose(drums.reactivity(_parameters.BETA, angles), desired)
+        assert drums.worth(_parameters.BETA, angles).shape == (3, 12)
+
+        speeds = np.linspace(0, 2, 12)
+        desired = sum(dynamics.con_drum_reactivity_deriv(beta=_parameters.BETA, drum_speed=speed, drum_angle=40.0) for speed in speeds) / 12
+        np.testing.assert_allclose(drums.reactivity_deriv(_parameters.BETA, np.full(12, 40.0), speeds), desired)
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            Drums(0)
+        with pytest.raises(ValueError):
+            Drums(4, banks=[DrumBank([0, 1]), DrumBank([1, 2])])
+        with pytest.raises(ValueError):
+            Drums(4, banks=[DrumBank([0, 4])])
+        with pytest.raises(ValueError):
+            Drums(4, stuck=[5])
+
+    def test_drum_speeds(self):
+        rule = LinearControlRule(coeff=0, const=2.0)
+        drums = Drums(6, banks=[DrumBank([0, 1, 2]), DrumBank([3, 4], drum_control_rule=LinearControlRule(coeff=0, const=-1.0))],
+                      stuck=[1])
+        state = State.from_array(np.zeros(NUM_COMPONENTS + 6))
+        np.testing.assert_array_equal(drums.drum_speeds(t=0, state=state, drum_control_rule=rule), [2, 0, 2, -1, -1, 0])
+        drum_speeds, mean_speed, _ = drums.derivatives(beta=_parameters.BETA, t=0, state=state, drum_control_rule=rule)
+        np.testing.assert_array_equal(drum_speeds, [2, 0, 2, -1, -1, 0])
+        assert mean_speed == pytest.approx(2 / 6)
+
+    def test_bind(self):
+        hold = FuelTemperatureHoldControlRule(setpoint=_parameters.TEMP_FUEL_INITIAL, kp=5e-6, sample_period=0.5,
+                                              total_beta=_parameters.BETA)
+        other = LinearControlRule(coeff=0, const=1.0)
+        coefficients = np.outer(np.arange(1.0, 7.0), DRUM_WORTH_COEFFICIENTS) / 21
+        drums = Drums(6, coefficients=coefficients, banks=[DrumBank([0, 1, 2], drum_control_rule=hold + other), DrumBank([3, 4])],
+                      stuck=[1])
+        np.testing.assert_array_equal(drums.driven(hold, other), [True, False, True, False, False, False])
+        np.testing.assert_array_equal(drums.driven(other, hold), [False] * 6)
+        drums.bind(other)
+        assert hold.drums is drums
+
+        # The command is converted with the summed worth of the moving drums of its bank, weighted by their coefficients
+        angles = np.full(6, 40.0)
+        state = State.from_array(np.concatenate([np.zeros(NUM_COMPONENTS), angles]))
+        worth = drums.differential_worth(_parameters.BETA, angles)
+        assert hold.differential_worth(state) == pytest.approx(worth[0] + worth[2])
+        assert hold.actuate(1e-5, state) == pytest.approx(1e-5 / (worth[0] + worth[2]))
+        assert hold.drum_worth_floor == pytest.approx(hold.worth_floor * 4 / 21)
+
+        # Without drum angles in the state the worth curve of the base model applies
+        base = State.from_array(np.full(NUM_COMPONENTS, 40.0))
+        assert hold.actuate(1e-5, base) == pytest.approx(1e-5 / dynamics.con_drum_reactivity_deriv(beta=_parameters.BETA, drum_speed=1.0,
+                                                                                                    drum_angle=40.0))
+
+        # A rule moving stuck drums only has no authority, its output stays finite
+        drums = Drums(6, banks=[DrumBank([0], drum_control_rule=hold)], stuck=[0])
+        drums.bind(other)
+        assert hold.differential_worth(state) == 0
+        assert np.isfinite(hold.actuate(1e-5, state))
+
+
+class TestSolveDrums:
+    @pytest.mark.parametrize('num_drums', [1, 12])
+    def test_matches_single_drum(self, num_drums):
+        desired = SCENARIO.solve()
+        soln = SCENARIO.with_overrides({'control.drums': {'num_drums': num_drums}}).solve()
+        np.testing.assert_allclose(soln.array[:, :NUM_COMPONENTS], desired.array, rtol=1e-5)
+        assert soln.drum_angles.shape == (201, num_drums)
+        np.testing.assert_allclose(soln.drum_angles[:, 0], desired.drum_angle, rtol=1e-5)
+        with pytest.raises(KeyError):
+            desired.drum_angles
+
+    def test_stuck_and_banks(self):
+        scenario = SCENARIO.with_overrides({'control.drums': {
+            'num_drums': 12, 'stuck': [0],
+            'banks': [{'drums': list(range(6))},
+                      {'drums': list(range(6, 12)), 'rules': [{'type': 'linear', 'coeff': 0, 'const': 0.5, 't_min': 2, 't_max': 4}]}]}})
+        soln = scenario.solve()
+        angles = soln.drum_angles
+        initial = SCENARIO.config['control']['drum_angle_initial']
+        np.testing.assert_allclose(angles[:, 0], initial)
+        np.testing.assert_allclose(angles[-1, 1:6], initial - 2.0)
+        np.testing.assert_allclose(angles[-1, 6:], initial + 1.0)
+        np.testing.assert_allclose(soln.drum_angle, angles.mean(axis=1))
+        drums = scenario.drums()
+        np.testing.assert_allclose(soln.rho_con_drum, drums.reactivity(_parameters.BETA, angles), rtol=1e-6)
+
+    def test_temperature_hold(self):
+        # Half of the drums are stuck, the rule moves the others twice as fast as the drums of the base model
+        setpoint = _parameters.TEMP_FUEL_INITIAL + 20
+        kwargs = dict(t_max=100, num_iters=1001)
+
+        def hold():
+            return FuelTemperatureHoldControlRule(setpoint=setpoint, kp=5e-6, kd=1e-4, sample_period=0.5, total_beta=_parameters.BETA,
+                                                  max_drum_speed=5.0)
+        desired = _parameters.solve(drum_control_rule=hold(), **kwargs)
+        soln = _parameters.solve(drum_control_rule=hold(), drums=Drums(12, stuck=range(0, 12, 2)), **kwargs)
+        np.testing.assert_allclose(soln.array[:, :NUM_COMPONENTS], desired.array, rtol=1e-4)
+        # Twice the excursion on the curved worth curve gives nearly, not exactly, the same reactivity
+        np.testing.assert_allclose(soln.drum_angles[:, 1] - soln.drum_angles[0, 1], 2 * (desired.drum_angle - desired.drum_angle[0]),
+                                   rtol=1e-2, atol=1e-4)
+        np.testing.assert_allclose(soln.drum_angles[:, 0], soln.drum_angles[0, 0])
+
+    def test_record(self):
+        overrides = {'control.drums': {'num_drums': 4, 'stuck': [0]}}
+        desired = SCENARIO.with_overrides(overrides).solve()
+        soln = SCENARIO.with_overrides(dict(overrides, record={'components': ['DrumAngle', 'RhoConDrum'], 'chunk_size': 50})).solve()
+        assert soln.components == (StateComponent.DrumAngle, StateComponent.RhoConDrum)
+        np.testing.assert_array_equal(soln.drum_angles, desired.drum_angles)
+        np.testing.assert_array_equal(soln.rho_con_drum, desired.rho_con_drum)
+
+    def test_initial_angles_and_jacobian(self):
+        kwargs = SCENARIO.solve_kwargs()
+        kwargs['drum_angle_initial'] = np.linspace(60, 70, 4)
+        soln = solver.solve(drum_control_rule=SCENARIO.drum_control_rule(), drums=Drums(4), **kwargs)
+        np.testing.assert_allclose(soln.drum_angles[0], kwargs['drum_angle_initial'])
+        assert soln.component(StateComponent.DrumAngle)[0] == pytest.approx(65)
+        with pytest.raises(ValueError):
+            solver.solve(drum_control_rule=SCENARIO.drum_control_rule(), drums=Drums(4), jacobian=True, **kwargs)
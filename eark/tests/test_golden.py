@@ -0,0 +1,41 @@
+"""Golden-file regression tests, comparing canonical transients against stored reference solutions
+
+Run with EARK_UPDATE_GOLDEN=1 to regenerate the reference solutions after an intended change of the results.
+"""
+
+import numpy as np
+import pytest
+
+from eark import control
+from eark.drums import DrumBank
+from eark.drums import Drums
+from eark.tests import TEST_ROOT
+from eark.tests import _parameters
+from eark.utilities import testing
+
+GOLDEN_ROOT = TEST_ROOT / 'tests' / 'golden'
+
+SCENARIOS = {
+    'hold': dict(drum_control_rule=control.LinearControlRule(coeff=0, const=0.0), t_max=100, num_iters=1001),
+    'drum_withdrawal': dict(drum_control_rule=control.LinearControlRule(coeff=0, const=-1.0, t_min=2, t_max=4), t_max=100,
+                            num_iters=1001),
+    'temperature_hold': dict(drum_control_rule=control.FuelTemperatureHoldControlRule(setpoint=_parameters.TEMP_FUEL_INITIAL + 20,
+                                                                                       kp=5e-6, kd=1e-4, sample_period=0.5,
+                                                                                       total_beta=_parameters.BETA, max_drum_speed=5.0),
+                             t_max=100, num_iters=1001),
+    'drum_banks': dict(drum_control_rule=control.LinearControlRule(coeff=0, const=0.0),
+                       drums=Drums(num_drums=6, banks=[DrumBank([0, 1, 2], drum_control_rule=_parameters.WITHDRAWAL), DrumBank([3, 4])],
+                                   stuck=[1]),
+                       drum_angle_initial=_parameters.DRUM_ANGLE_INITIAL + np.array([0.0, 5.0, 0.0, -5.0, 0.0, 10.0]),
+                       t_max=100, num_iters=1001),
+}
+
+
+def solve_scenario(name: str):
+    return _parameters.solve(**SCENARIOS[name])
+
+
+class TestGolden:
+    @pytest.mark.parametrize('name', sorted(SCENARIOS))
+    def test_scenario(self, name):
+        testing.assert_matches_golden(solve_scenario(name), GOLDEN_ROOT / '{}.npz'.format(name))
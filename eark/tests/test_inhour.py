@@ -0,0 +1,57 @@
+"""Unittests for the inhour module
+"""
+
+import numpy as np
+import pytest
+
+from eark import inhour
+from eark.tests import _parameters
+
+
+def _companion_roots(rho: float) -> np.ndarray:
+    """Roots of the inhour equation after clearing denominators, computed with the numpy companion matrix"""
+    denominator = np.poly1d([1.0])
+    for lambda_i in _parameters.PRECURSOR_CONSTANTS:
+        denominator *= np.poly1d([1.0, lambda_i])
+    numerator = (np.poly1d([_parameters.PERIOD, 0.0]) - rho) * denominator
+    for beta_i, lambda_i in zip(_parameters.BETA_VECTOR, _parameters.PRECURSOR_CONSTANTS):
+        numerator += np.poly1d([beta_i, 0.0]) * (denominator / np.poly1d([1.0, lambda_i]))[0]
+    return np.sort(numerator.roots.real)
+
+
+class TestInhour:
+    def test_roots(self):
+        rho = np.array([-0.01, -0.001, 0.0, 0.001, 0.005])
+        res = inhour.roots(rho=rho, beta_vector=_parameters.BETA_VECTOR, precursor_constants=_parameters.PRECURSOR_CONSTANTS,
+                           period=_parameters.PERIOD)
+        assert res.shape == (5, 7)
+        for r, row in zip(rho, res):
+            np.testing.assert_allclose(row, _companion_roots(r), rtol=1e-6)
+
+    def test_stable_root(self):
+        rho = np.linspace(-0.05, 0.05, 9999).reshape(101, 99)
+        kwargs = dict(beta_vector=_parameters.BETA_VECTOR, precursor_constants=_parameters.PRECURSOR_CONSTANTS, period=_parameters.PERIOD)
+        res = inhour.stable_root(rho=rho, **kwargs)
+        assert res.shape == rho.shape
+        np.testing.assert_allclose(res, inhour.roots(rho=rho, **kwargs)[..., -1], rtol=1e-10)
+        np.testing.assert_allclose(inhour.inhour_reactivity(omega=res, **kwargs), rho, atol=1e-12)
+
+    def test_stable_period(self):
+        kwargs = dict(beta_vector=_parameters.BETA_VECTOR, precursor_constants=_parameters.PRECURSOR_CONSTANTS, period=_parameters.PERIOD,
+                      total_beta=_parameters.BETA)
+        offset = _parameters.BETA - np.sum(_parameters.BETA_VECTOR)
+        res = inhour.stable_period(rho=np.array([offset, offset + 0.001, offset - 0.001]), **kwargs)
+        assert np.isinf(res[0])
+        assert res[1] > 0
+        assert res[2] < 0
+
+        reactor_period = np.array([-100.0, 1.0, 10.0, 100.0, np.inf])
+        np.testing.assert_allclose(inhour.stable_period(rho=inhour.reactivity(reactor_period=reactor_period, **kwargs), **kwargs),
+                                   reactor_period, rtol=1e-9)
+
+    def test_invalid(self):
+        kwargs = dict(beta_vector=_parameters.BETA_VECTOR, precursor_constants=_parameters.PRECURSOR_CONSTANTS)
+        with pytest.raises(ValueError):
+            inhour.roots(rho=np.array([0.001, np.nan]), period=_parameters.PERIOD, **kwargs)
+        with pytest.raises(ValueError):
+            inhour.roots(rho=np.array([0.001]), period=-_parameters.PERIOD, **kwargs)
@@ -0,0 +1,35 @@
+"""Unittests for the inverse module
+"""
+
+import numpy as np
+
+from eark import inverse
+from eark.control import LinearControlRule
+from eark.tests import _parameters
+
+
+class TestInverseKinetics:
+    def setup_method(self):
+        self.soln = _parameters.solve(drum_control_rule=LinearControlRule(coeff=0, const=-1, t_min=2, t_max=4), t_max=10,
+                                      num_iters=2001)
+        self.dt = self.soln.t[1] - self.soln.t[0]
+
+    def test_round_trip(self):
+        res = inverse.inverse_kinetics(power=self.soln.neutron_population, dt=self.dt, beta_vector=_parameters.BETA_VECTOR,
+                                       precursor_constants=_parameters.PRECURSOR_CONSTANTS, period=_parameters.PERIOD,
+                                       total_beta=_parameters.BETA)
+        desired = self.soln.rho_fuel_temp + self.soln.rho_mod_temp + self.soln.rho_con_drum
+
+        # The first sample assumes a steady power, which the initial state of the transient is not
+        np.testing.assert_allclose(res[1:], desired[1:], atol=5e-6)
+
+    def test_streaming(self):
+        kwargs = dict(dt=self.dt, beta_vector=_parameters.BETA_VECTOR, precursor_constants=_parameters.PRECURSOR_CONSTANTS,
+                      period=_parameters.PERIOD, total_beta=_parameters.BETA)
+        desired = inverse.inverse_kinetics(power=self.soln.neutron_population, **kwargs)
+
+        processor = inverse.InverseKinetics(**kwargs)
+        chunks = np.array_split(self.soln.neutron_population, [1, 7, 7, 500, 501, 1500])
+        res = np.concatenate([processor.update(chunk) for chunk in chunks])
+        np.testing.assert_array_equal(res, desired)
+        np.testing.assert_allclose(processor.precursor_density, self.soln.precursor_densities[-1], rtol=1e-4)
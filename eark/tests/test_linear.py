@@ -0,0 +1,63 @@
+"""Unittests for the linear module
+"""
+
+import numpy as np
+
+from eark import linear
+from eark import solver
+from eark.control import LinearControlRule
+from eark.tests import _parameters
+
+KINETICS = dict(beta_vector=_parameters.BETA_VECTOR, precursor_constants=_parameters.PRECURSOR_CONSTANTS, total_beta=_parameters.BETA,
+                period=_parameters.PERIOD)
+THERMAL = dict(heat_coeff=_parameters.HEAT_COEFF, mass_mod=_parameters.MASS_MOD, heat_cap_mod=_parameters.HEAT_CAP_MOD,
+               mass_fuel=_parameters.MASS_FUEL, heat_cap_fuel=_parameters.HEAT_CAP_FUEL)
+
+
+class TestLinear:
+    def test_steady_state(self):
+        res = linear.steady_state(power=_parameters.POWER_INITIAL, mass_flow=_parameters.MASS_FLOW, temp_in=_parameters.TEMP_IN,
+                                  heat_coeff=_parameters.HEAT_COEFF, heat_cap_mod=_parameters.HEAT_CAP_MOD, **KINETICS)
+        np.testing.assert_allclose(res[:9], np.concatenate(([_parameters.POWER_INITIAL], _parameters.PRECURSOR_DENSITY_INITIAL,
+                                                             [_parameters.TEMP_MOD_INITIAL, _parameters.TEMP_FUEL_INITIAL])))
+        deriv = solver.state_deriv_array(res, 0.0, mass_flow=_parameters.MASS_FLOW, temp_in=_parameters.TEMP_IN,
+                                         drum_control_rule=_parameters.DRUM_SPEED, **KINETICS, **THERMAL)
+        np.testing.assert_allclose(deriv / np.maximum(np.abs(res), 1.0), 0.0, atol=1e-12)
+
+    def test_state_jacobian(self):
+        rule = LinearControlRule(coeff=0.0, const=0.7)
+        state_array = linear.steady_state(power=_parameters.POWER_INITIAL, mass_flow=_parameters.MASS_FLOW, temp_in=_parameters.TEMP_IN,
+                                          heat_coeff=_parameters.HEAT_COEFF, heat_cap_mod=_parameters.HEAT_CAP_MOD, **KINETICS)
+        state_array += np.array([2e5, 0, 0, 0, 0, 0, 0, -1.0, 3.0, 0, 0, 2.0, 0])
+
+        def deriv(x):
+            return solver.state_deriv_array(x, 0.0, mass_flow=_parameters.MASS_FLOW, temp_in=_parameters.TEMP_IN, drum_control_rule=rule,
+                                            **KINETICS, **THERMAL)
+
+        desired = np.empty((13, 13))
+        for j in range(13):
+            step = np.zeros(13)
+            step[j] = 1e-6 * max(abs(state_array[j]), 1e-3)
+            desired[:, j] = (deriv(state_array + step) - deriv(state_array - step)) / (2 * step[j])
+
+        res = linear.state_jacobian(np.stack([state_array, state_array]), mass_flow=_parameters.MASS_FLOW, temp_in=_parameters.TEMP_IN,
+                                    drum_speed=0.7, **KINETICS, **THERMAL)
+        assert res.shape == (2, 13, 13)
+        np.testing.assert_allclose(res[1], desired, rtol=1e-6, atol=1e-12 * np.abs(desired).max())
+
+    def test_operating_points(self):
+        power, mass_flow = np.meshgrid(np.linspace(5e6, 50e6, 10), np.linspace(10, 40, 4), indexing='ij')
+        res = linear.operating_points(power=power, mass_flow=mass_flow, temp_in=_parameters.TEMP_IN, **KINETICS, **THERMAL)
+        assert res.a.shape == (10, 4, 9, 9)
+        assert res.eigenvalues.shape == (10, 4, 9)
+        assert np.all(res.stable)
+        assert np.all(np.diff(res.time_constants, axis=-1) <= 0)
+
+        # Single operating point matches the dense linear algebra evaluation
+        model = linear.operating_points(power=_parameters.POWER_INITIAL, mass_flow=_parameters.MASS_FLOW, temp_in=_parameters.TEMP_IN,
+                                        **KINETICS, **THERMAL)
+        frequencies = np.array([0.0, 0.1, 10.0])
+        desired = [np.linalg.solve(1j * w * np.eye(9) - model.a, model.b)[0] for w in frequencies]
+        np.testing.assert_allclose(model.transfer_function(frequencies), desired, rtol=1e-8)
+        np.testing.assert_allclose(res.transfer_function(frequencies)[3, 1], linear.operating_points(
+            power=power[3, 1], mass_flow=mass_flow[3, 1], temp_in=_parameters.TEMP_IN, **KINETICS, **THERMAL).transfer_function(frequencies))
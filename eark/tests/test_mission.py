@@ -0,0 +1,91 @@
+"""Unittests for the mission module
+"""
+
+import numpy as np
+import pytest
+
+from eark import solver
+from eark.control import LinearControlRule
+from eark.control import PIDControlRule
+from eark.mission import Mission
+from eark.mission import Phase
+from eark.solution import Solution
+from eark.tests import _parameters
+
+PARAMETERS = dict(beta_vector=_parameters.BETA_VECTOR,
+                  precursor_constants=_parameters.PRECURSOR_CONSTANTS,
+                  total_beta=_parameters.BETA,
+                  period=_parameters.PERIOD,
+                  heat_coeff=_parameters.HEAT_COEFF,
+                  mass_mod=_parameters.MASS_MOD,
+                  heat_cap_mod=_parameters.HEAT_CAP_MOD,
+                  mass_flow=_parameters.MASS_FLOW,
+                  mass_fuel=_parameters.MASS_FUEL,
+                  heat_cap_fuel=_parameters.HEAT_CAP_FUEL,
+                  temp_in=_parameters.TEMP_IN)
+STATE_INITIAL = solver.initial_state(power_initial=_parameters.POWER_INITIAL,
+                                     precursor_density_initial=_parameters.PRECURSOR_DENSITY_INITIAL,
+                                     total_beta=_parameters.BETA,
+                                     temp_mod_initial=_parameters.TEMP_MOD_INITIAL,
+                                     temp_fuel_initial=_parameters.TEMP_FUEL_INITIAL,
+                                     drum_angle_initial=_parameters.DRUM_ANGLE_INITIAL)
+WITHDRAWAL = LinearControlRule(coeff=0, const=-1.0, t_min=2, t_max=4)
+
+
+class TestMission:
+    def test_matches_single_solve(self):
+        single = _parameters.solve(drum_control_rule=WITHDRAWAL)
+        mission = Mission([Phase(duration=5, num_iters=51, drum_control_rule=WITHDRAWAL),
+                           Phase(duration=15, num_iters=151, method='BDF', rtol=1e-9, atol=1e-12)])
+        soln = mission.solve(STATE_INITIAL, **PARAMETERS)
+        np.testing.assert_allclose(soln.t, single.t, rtol=1e-12)
+        np.testing.assert_allclose(soln.array, single.array, rtol=1e-5)
+
+    def test_sampled_rule_state(self):
+        def pid():
+            return PIDControlRule(setpoint=_parameters.TEMP_FUEL_INITIAL + 10, kp=1e-2, ki=5e-3, sample_period=0.5, output_min=-2,
+                                  output_max=2)
+
+        rule = pid()
+        single = _parameters.solve(drum_control_rule=rule)
+        # The phase boundary is between two samples, the rule keeps its integral and sample schedule across it
+        mission = Mission([Phase(duration=5.3, num_iters=54, drum_control_rule=rule),
+                           Phase(duration=14.7, num_iters=148, drum_control_rule=rule)])
+        soln = mission.solve(STATE_INITIAL, **PARAMETERS)
+        np.testing.assert_allclose(soln.t, single.t, rtol=1e-12)
+        np.testing.assert_allclose(soln.array, single.array, rtol=1e-5)
+        assert rule.num_samples == 40
+
+        # Separate rule objects start afresh in their own phase
+        separate = Mission([Phase(duration=5.3, num_iters=54, drum_control_rule=pid()),
+                            Phase(duration=14.7, num_iters=148, drum_control_rule=pid())]).solve(STATE_INITIAL, **PARAMETERS)
+        assert not np.allclose(separate.drum_angle, single.drum_angle, rtol=1e-5)
+
+    def test_handoff(self):
+        mission = Mission([Phase(duration=3, num_iters=4, drum_control_rule=WITHDRAWAL, name='startup'),
+                           Phase(duration=10, num_iters=11, rtol=1e-10, name='hold')])
+        soln = mission.solve(STATE_INITIAL, t_start=1.0, **PARAMETERS)
+        np.testing.assert_array_equal(mission.boundaries(t_start=1.0), [1.0, 4.0, 14.0])
+        assert len(soln.t) == 14 and np.all(np.diff(soln.t) > 0)
+
+        # The second phase starts from the exact final state of the first
+        hold = Mission([mission.phases[1]]).solve(soln.array[3], t_start=4.0, **PARAMETERS)
+        np.testing.assert_array_equal(hold.array, soln.array[3:])
+
+    def test_phase_parameters(self):
+        throttle = Mission([Phase(duration=10, num_iters=11, parameters=dict(mass_flow=0.8 * _parameters.MASS_FLOW))])
+        hold = Mission([Phase(duration=10, num_iters=11)])
+        assert throttle.solve(STATE_INITIAL, **PARAMETERS).temp_mod[-1] > hold.solve(STATE_INITIAL, **PARAMETERS).temp_mod[-1]
+        with pytest.raises(ValueError):
+            Phase(duration=10, parameters=dict(mass_flux=1.0))
+        with pytest.raises(ValueError):
+            Mission([])
+
+    def test_concatenate(self):
+        first = Solution(array=np.arange(6.0).reshape(3, 2), t=np.array([0.0, 1.0, 2.0]))
+        second = Solution(array=np.arange(4.0, 10.0).reshape(3, 2), t=np.array([2.0, 3.0, 4.0]))
+        soln = Solution.concatenate([first, second])
+        np.testing.assert_array_equal(soln.t, np.arange(5.0))
+        np.testing.assert_array_equal(soln.array, np.arange(10.0).reshape(5, 2))
+        with pytest.raises(ValueError):
+            Solution.concatenate([second, first])
@@ -0,0 +1,52 @@
+"""Unittests for the parareal module
+"""
+
+import numpy as np
+import pytest
+
+from eark import control
+from eark.control import LinearControlRule
+from eark.parareal import Parareal
+from eark.parareal import sdirk2
+from eark.tests import _parameters
+
+
+class TestParareal:
+    def test_solve(self):
+        rule = LinearControlRule(coeff=0, const=0.5, t_min=0, t_max=2)
+        parareal = Parareal(num_slices=8, max_workers=2)
+        res = _parameters.solve(drum_control_rule=rule, t_max=600, num_iters=601, parareal=parareal)
+        desired = _parameters.solve(drum_control_rule=rule, t_max=600, num_iters=601)
+
+        np.testing.assert_array_equal(res.t, desired.t)
+        np.testing.assert_allclose(res.array, desired.array, rtol=1e-5, atol=1e-12)
+        assert 1 <= parareal.iterations < parareal.num_slices
+        assert parareal.wall_time > 0
+        assert parareal.fine_time >= parareal.serial_time > 0
+        assert 0 < parareal.critical_time <= parareal.wall_time
+        assert np.isfinite(parareal.speedup)
+
+    def test_fine_method(self):
+        rule = LinearControlRule(coeff=0, const=0.5, t_min=0, t_max=2)
+        parareal = Parareal(num_slices=4, max_workers=2, fine_method='Radau', fine_rtol=1e-8)
+        res = _parameters.solve(drum_control_rule=rule, t_max=600, num_iters=601, parareal=parareal)
+        desired = _parameters.solve(drum_control_rule=rule, t_max=600, num_iters=601, method='Radau', rtol=1e-8)
+
+        np.testing.assert_allclose(res.array, desired.array, rtol=1e-5, atol=1e-12)
+
+    def test_sampled_rule(self):
+        rule = control.PIDControlRule(setpoint=500.0, kp=0.1, sample_period=1.0)
+        with pytest.raises(ValueError):
+            _parameters.solve(drum_control_rule=rule, t_max=600, num_iters=601, parareal=Parareal(num_slices=2, max_workers=1))
+
+    def test_sdirk2(self):
+        # Exponential decay with a stiff and a slow mode, the error of the second order method drops 4x per halving of the step
+        rates = np.array([-1e4, -0.1])
+        errors = []
+        for num_steps in (4, 8, 16):
+            res = sdirk2(lambda y, t: rates * y, np.ones(2), 0.0, 10.0, num_steps)
+            assert abs(res[0]) < 1e-6
+            errors.append(abs(res[1] - np.exp(-1.0)))
+        np.testing.assert_allclose(np.array(errors[:-1]) / errors[1:], 4, rtol=0.1)
+        with pytest.raises(ValueError):
+            Parareal(coarse_steps=0)
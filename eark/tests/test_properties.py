@@ -0,0 +1,59 @@
+"""Unittests for the properties module
+"""
+
+import numpy as np
+import pytest
+
+from eark import properties
+from eark.properties import PropertyTable
+from eark.tests import _parameters
+
+
+class TestPropertyTable:
+    def test_interpolation(self):
+        temps = np.array([300.0, 1000.0, 3000.0])
+        values = np.array([1.0, 2.0, 6.0])
+        table = PropertyTable(temps, values, num_points=2701)
+        queries = np.linspace(200, 3100, 1001)
+        np.testing.assert_allclose(table(queries), np.interp(queries, temps, values), atol=1e-3)
+        np.testing.assert_allclose(table(queries.reshape(7, 143)), table(queries).reshape(7, 143))
+        for temp in (250.0, 300.0, 650.0, 1000.0, 2999.9, 3000.0, 3500.0):
+            assert table(temp) == pytest.approx(np.interp(temp, temps, values), abs=1e-3)
+            assert table(temp) == pytest.approx(table(np.array([temp]))[0], rel=1e-12)
+
+    def test_derivative(self):
+        table = PropertyTable.power_law(4e6, 450.0, 0.5, temp_min=300, temp_max=3000)
+        temps = np.array([400.0, 1000.0, 2500.0])
+        np.testing.assert_allclose(table(temps), 4e6 * np.sqrt(temps / 450), rtol=1e-5)
+        np.testing.assert_allclose(table.derivative(temps), 0.5 * 4e6 / np.sqrt(450 * temps), rtol=1e-2)
+        np.testing.assert_array_equal(table.derivative([100.0, 4000.0]), [0.0, 0.0])
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            PropertyTable([300, 200], [1, 2])
+        with pytest.raises(ValueError):
+            PropertyTable([300], [1])
+
+    def test_hydrogen(self):
+        heat_capacity = properties.hydrogen_heat_capacity()
+        assert heat_capacity is properties.hydrogen_heat_capacity()
+        assert heat_capacity(300.0) == pytest.approx(14.31e3, rel=1e-3)
+        assert heat_capacity(3000.0) == pytest.approx(18.13e3, rel=1e-3)
+        density = properties.hydrogen_density(1e5)
+        assert density(300.0) == pytest.approx(0.0808, rel=1e-3)
+
+
+class TestSolveWithProperties:
+    def test_constant_tables(self):
+        constant = lambda value: PropertyTable([300, 3000], [value, value], num_points=2)
+        desired = _parameters.solve()
+        soln = _parameters.solve(heat_coeff=constant(_parameters.HEAT_COEFF), heat_cap_mod=constant(_parameters.HEAT_CAP_MOD),
+                                 heat_cap_fuel=constant(_parameters.HEAT_CAP_FUEL))
+        np.testing.assert_allclose(soln.array, desired.array, rtol=1e-12)
+
+    def test_hydrogen(self):
+        desired = _parameters.solve()
+        soln = _parameters.solve(heat_cap_mod=properties.hydrogen_heat_capacity())
+        # The larger heat capacity of hydrogen slows the moderator response to the power drop
+        assert np.all(np.isfinite(soln.array))
+        assert abs(soln.temp_mod[-1] - soln.temp_mod[0]) < abs(desired.temp_mod[-1] - desired.temp_mod[0])
@@ -0,0 +1,106 @@
+"""Unittests for the recording module
+"""
+
+import numpy as np
+import pytest
+
+from eark import control
+from eark.recording import Recorder
+from eark.solution import Solution
+from eark.state import StateComponent
+from eark.tests import _parameters
+
+NUM_ITERS = 2001
+SWEEP_COMPONENTS = (StateComponent.NeutronPopulation, StateComponent.TFuel)
+
+
+class TestRecorder:
+    def setup_method(self):
+        self.full = _parameters.solve(num_iters=NUM_ITERS)
+
+    def test_record_all(self):
+        soln = _parameters.solve(num_iters=NUM_ITERS, record=Recorder())
+        np.testing.assert_array_equal(soln.array, self.full.array)
+        assert soln.components == tuple(StateComponent)
+
+    def test_components(self):
+        soln = _parameters.solve(num_iters=NUM_ITERS, record=Recorder(components=SWEEP_COMPONENTS, dtype=np.float32))
+        assert soln.array.shape == (len(self.full.t), 2)
+        assert soln.array.dtype == np.float32
+        np.testing.assert_allclose(soln.temp_fuel, self.full.temp_fuel, rtol=1e-6)
+        np.testing.assert_allclose(soln.neutron_population, self.full.neutron_population, rtol=1e-6)
+        with pytest.raises(KeyError):
+            soln.temp_mod
+
+    def test_cadence(self):
+        soln = _parameters.solve(num_iters=NUM_ITERS,
+                                 record=Recorder(components=SWEEP_COMPONENTS, cadence={StateComponent.TFuel: 7}, chunk_size=100))
+        assert soln.components == (StateComponent.NeutronPopulation,)
+        t, values = soln.decimated(StateComponent.TFuel)
+        np.testing.assert_array_equal(t, self.full.t[::7])
+        np.testing.assert_allclose(values, self.full.temp_fuel[::7], rtol=1e-6)
+        with pytest.raises(KeyError, match='decimated'):
+            soln.temp_fuel
+        t, values = soln.decimated(StateComponent.NeutronPopulation)
+        assert t is soln.t
+        np.testing.assert_array_equal(values, soln.neutron_population)
+
+    def test_chunks(self):
+        soln = _parameters.solve(num_iters=NUM_ITERS, record=Recorder(chunk_size=64))
+        np.testing.assert_array_equal(soln.array, self.full.array)
+
+    def test_progress(self):
+        fractions = []
+        _parameters.solve(num_iters=NUM_ITERS, record=Recorder(chunk_size=500, progress=fractions.append))
+        assert fractions == sorted(fractions)
+        assert fractions[-1] == 1.0
+        assert len(fractions) >= (NUM_ITERS - 1) // 500
+
+    @pytest.mark.parametrize('method', ['LSODA', 'BDF'])
+    def test_chunks_solve_ivp(self, method):
+        desired = _parameters.solve(num_iters=NUM_ITERS, method=method, jacobian=True)
+        soln = _parameters.solve(num_iters=NUM_ITERS, method=method, jacobian=True, record=Recorder(chunk_size=64))
+        np.testing.assert_array_equal(soln.array, desired.array)
+
+    def test_reductions(self):
+        soln = _parameters.solve(num_iters=NUM_ITERS, record=Recorder(components=(), peaks=SWEEP_COMPONENTS,
+                                                                      integrals=(StateComponent.NeutronPopulation,), chunk_size=300))
+        for component in SWEEP_COMPONENTS:
+            values = self.full.component(component)
+            np.testing.assert_allclose(soln.peak(component), np.max(values), rtol=1e-6)
+            np.testing.assert_allclose(soln.time_of_peak(component), self.full.t[np.argmax(values)], atol=0.02)
+        power = self.full.neutron_population
+        energy = np.sum(0.5 * (power[1:] + power[:-1]) * np.diff(self.full.t))
+        np.testing.assert_allclose(soln.integral(StateComponent.NeutronPopulation), energy, rtol=1e-6)
+        with pytest.raises(KeyError):
+            soln.integral(StateComponent.TFuel)
+
+    def test_sampled_rule(self):
+        rule = control.FuelTemperatureHoldControlRule(setpoint=_parameters.TEMP_FUEL_INITIAL + 20, kp=5e-6, kd=1e-4, sample_period=0.5,
+                                                      total_beta=_parameters.BETA, max_drum_speed=5.0)
+        full = _parameters.solve(drum_control_rule=rule, num_iters=NUM_ITERS)
+        soln = _parameters.solve(drum_control_rule=rule, num_iters=NUM_ITERS,
+                                 record=Recorder(components=SWEEP_COMPONENTS, cadence={StateComponent.TFuel: 3}))
+        np.testing.assert_array_equal(soln.neutron_population, full.neutron_population)
+        np.testing.assert_array_equal(soln.decimated(StateComponent.TFuel)[1], full.temp_fuel[::3])
+
+    def test_memory(self):
+        recorder = Recorder(components=SWEEP_COMPONENTS, dtype=np.float32)
+        _parameters.solve(num_iters=NUM_ITERS, record=recorder)
+        assert recorder.nbytes * 10 <= self.full.array.nbytes
+
+    def test_save_load(self, tmp_path):
+        soln = _parameters.solve(num_iters=NUM_ITERS,
+                                 record=Recorder(components=SWEEP_COMPONENTS, cadence={StateComponent.TFuel: 4}, peaks=SWEEP_COMPONENTS))
+        soln.save(tmp_path / 'soln.npz')
+        loaded = Solution.load(tmp_path / 'soln.npz')
+        assert loaded.components == soln.components
+        for desired, actual in zip(soln.decimated(StateComponent.TFuel), loaded.decimated(StateComponent.TFuel)):
+            np.testing.assert_array_equal(actual, desired)
+        assert loaded.reductions == soln.reductions
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            Recorder(components=SWEEP_COMPONENTS, cadence={StateComponent.TMod: 2})
+        with pytest.raises(ValueError):
+            Recorder(cadence={StateComponent.TMod: 0})
@@ -0,0 +1,133 @@
+"""Unittests for the scenario module and the batch runner
+"""
+
+import csv
+import json
+import sys
+
+import numpy as np
+import pytest
+
+from eark import control
+from eark import scenario as scenario_module
+from eark.scenario import Scenario
+from eark.scenario import parse_override
+from eark.scripts import batch
+from eark.scripts import run
+from eark.solution import Solution
+from eark.state import StateComponent
+from eark.tests import _parameters
+from eark.tests.test_golden import GOLDEN_ROOT
+from eark.utilities import testing
+
+DRUM_WITHDRAWAL_TOML = """
+name = "drum_withdrawal"
+
+[time]
+t_max = 100
+num_iters = 1001
+
+[[control.rules]]
+type = "linear"
+coeff = 0
+const = -1.0
+t_min = 2
+t_max = 4
+"""
+
+
+class TestScenario:
+    def test_defaults(self):
+        kwargs = Scenario({}).solve_kwargs()
+        np.testing.assert_allclose(kwargs['precursor_density_initial'], _parameters.PRECURSOR_DENSITY_INITIAL)
+        np.testing.assert_allclose(kwargs['temp_mod_initial'], _parameters.TEMP_MOD_INITIAL)
+        np.testing.assert_allclose(kwargs['temp_fuel_initial'], _parameters.TEMP_FUEL_INITIAL)
+
+    def test_load_toml(self, tmp_path):
+        if sys.version_info < (3, 11):
+            pytest.importorskip('toml')
+        path = tmp_path / 'withdrawal.toml'
+        path.write_text(DRUM_WITHDRAWAL_TOML)
+        scenario = Scenario.load(path)
+        assert scenario.name == 'drum_withdrawal'
+        testing.assert_matches_golden(scenario.solve(), GOLDEN_ROOT / 'drum_withdrawal.npz')
+
+    def test_load_toml_unavailable(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scenario_module, '_toml', None)
+        path = tmp_path / 'withdrawal.toml'
+        path.write_text(DRUM_WITHDRAWAL_TOML)
+        with pytest.raises(ImportError, match='toml'):
+            Scenario.load(path)
+
+    def test_load_json(self, tmp_path):
+        path = tmp_path / 'hold.json'
+        path.write_text(json.dumps({'time': {'t_max': 10}, 'record': {'components': ['TFuel'], 'peaks': ['NeutronPopulation']}}))
+        scenario = Scenario.load(path)
+        assert scenario.name == 'hold'
+        soln = scenario.solve()
+        assert soln.components == (StateComponent.TFuel,)
+        np.testing.assert_allclose(soln.peak(StateComponent.NeutronPopulation), _parameters.POWER_INITIAL, rtol=1e-2)
+
+    def test_overrides(self):
+        scenario = Scenario({'time': {'t_max': 10}})
+        overridden = scenario.with_overrides(dict([parse_override('physics.total_beta=0.0072')]))
+        assert overridden.config['physics']['total_beta'] == 0.0072
+        assert overridden.config['time']['t_max'] == 10
+        assert overridden.digest != scenario.digest
+        assert Scenario({'time': {'t_max': 10}}).digest == scenario.digest
+        with pytest.raises(ValueError):
+            parse_override('physics.total_beta')
+
+    def test_rules(self):
+        scenario = Scenario({'control': {'rules': [{'type': 'linear', 'coeff': 0, 'const': 1.0},
+                                                   {'type': 'fuel_temperature_hold', 'setpoint': 470, 'kp': 5e-6,
+                                                    'sample_period': 0.5}]}})
+        rule = scenario.drum_control_rule()
+        assert isinstance(rule, control.CompositeControlRule)
+        assert len(control.sampled_rules(rule)) == 1
+        with pytest.raises(ValueError):
+            Scenario({'control': {'rules': [{'type': 'bang_bang'}]}}).drum_control_rule()
+
+
+class TestBatch:
+    def test_run(self, tmp_path):
+        for name, t_max in (('short', 5), ('long', 10)):
+            (tmp_path / '{}.json'.format(name)).write_text(json.dumps({'time': {'t_max': t_max, 'num_iters': 51}}))
+        argv = [(tmp_path / 'short.json').as_posix(), (tmp_path / 'long.json').as_posix(), '-o', (tmp_path / 'out').as_posix(), '-j', '2']
+        assert batch.main(argv) == 0
+        with open(tmp_path / 'out' / batch.SUMMARY_FILE) as fh:
+            rows = list(csv.DictReader(fh))
+        assert [row['name'] for row in rows] == ['short', 'long']
+        assert all(row['status'] == 'solved' for row in rows)
+
+        # Unchanged scenarios are skipped, changed ones are solved again
+        assert batch.main(argv + ['--set', 'time.t_max=10']) == 0
+        with open(tmp_path / 'out' / batch.SUMMARY_FILE) as fh:
+            assert [row['status'] for row in csv.DictReader(fh)] == ['solved', 'skipped']
+
+    def test_plot(self, tmp_path):
+        (tmp_path / 'hold.json').write_text(json.dumps({'time': {'t_max': 5, 'num_iters': 51}}))
+        argv = [(tmp_path / 'hold.json').as_posix(), '-o', (tmp_path / 'out').as_posix(), '-j', '1']
+
+        def statuses(*args):
+            assert batch.main(argv + list(args)) == 0
+            with open(tmp_path / 'out' / batch.SUMMARY_FILE) as fh:
+                return [row['status'] for row in csv.DictReader(fh)]
+
+        # Results solved without plotting are solved again when their figure is requested, and only then
+        assert statuses() == ['solved']
+        assert statuses('--plot') == ['solved']
+        assert (tmp_path / 'out' / 'hold.png').exists()
+        assert statuses('--plot') == ['skipped']
+        (tmp_path / 'out' / 'hold.png').unlink()
+        assert statuses() == ['skipped']
+
+    def test_run_script(self, tmp_path):
+        assert run.main(['-o', tmp_path.as_posix(), '--set', 'time.t_max=5', '--set', 'time.num_iters=51']) == 0
+        assert (tmp_path / 'reference.png').exists()
+        soln = Solution.load(tmp_path / 'reference.npz')
+        testing.assert_solution_approx_equal(soln, _parameters.solve(drum_control_rule=_parameters.DRUM_SPEED, t_max=5, num_iters=51))
+
+    def test_failure(self, tmp_path):
+        (tmp_path / 'bad.json').write_text(json.dumps({'control': {'rules': [{'type': 'bang_bang'}]}}))
+        assert batch.main([(tmp_path / 'bad.json').as_posix(), '-o', (tmp_path / 'out').as_posix(), '-j', '1']) == 1
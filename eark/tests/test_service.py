@@ -0,0 +1,110 @@
+"""Unittests for the service module
+"""
+
+import asyncio
+import json
+
+import numpy as np
+
+from eark import service
+from eark.scenario import Scenario
+
+SHORT_SCENARIO = {'time': {'t_max': 5, 'num_iters': 51}}
+
+
+async def _session(path: str):
+    simulation_service = service.SimulationService(max_workers=2)
+    await simulation_service.start(path=path)
+    try:
+        # Two identical requests written at once on one connection are both in flight before either is solved
+        reader, writer = await asyncio.open_unix_connection(path=path)
+        writer.write((json.dumps(dict(id=1, scenario=SHORT_SCENARIO, series=True)) + '\n' +
+                      json.dumps(dict(id=2, scenario=SHORT_SCENARIO)) + '\n').encode('utf-8'))
+        events = []
+        results = {}
+        while len(results) < 2:
+            event = json.loads(await reader.readline())
+            events.append(event)
+            if event['event'] == 'result':
+                results[event['id']] = event
+        await service._close(writer)
+        first, second = results[1], results[2]
+        error = await service.request(dict(id=3, scenario={'control': {'rules': [{'type': 'bang_bang'}]}}), path=path)
+
+        for i in range(10):
+            await service.request(dict(id=i, scenario={'time': {'t_max': 5 + i, 'num_iters': 51}}), path=path)
+        status = await service.request(dict(id=4, type='status'), path=path)
+    finally:
+        await simulation_service.close()
+    return first, second, error, events, status
+
+
+async def _cancel_first():
+    simulation_service = service.SimulationService(max_workers=1)
+    await simulation_service.start_pool()
+    try:
+        first = asyncio.ensure_future(simulation_service.solve(Scenario(SHORT_SCENARIO)))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(simulation_service.solve(Scenario(SHORT_SCENARIO)))
+        await asyncio.sleep(0)
+        first.cancel()
+        third = asyncio.ensure_future(simulation_service.solve(Scenario(SHORT_SCENARIO)))
+        soln, _ = await second
+        await third
+    finally:
+        await simulation_service.close()
+    return soln, simulation_service
+
+
+async def _progress(path: str):
+    simulation_service = service.SimulationService(max_workers=2)
+    await simulation_service.start(path=path)
+    try:
+        events = []
+        scenario = {'time': {'t_max': 100, 'num_iters': 4001}}
+        first, second = await asyncio.gather(service.request(dict(id=1, scenario=scenario), path=path, events=events.append),
+                                             service.request(dict(id=2, scenario=scenario), path=path, events=events.append))
+    finally:
+        await simulation_service.close()
+    return simulation_service, first, second, events
+
+
+class TestService:
+    def test_session(self, tmp_path):
+        first, second, error, events, status = service.run(_session((tmp_path / 'eark.sock').as_posix()))
+
+        assert first['event'] == 'result' and second['event'] == 'result'
+        assert first['summary'] == second['summary']
+        assert 'series' not in second
+        soln = Scenario(SHORT_SCENARIO).solve()
+        np.testing.assert_allclose(first['series']['TFuel'], soln.temp_fuel)
+        np.testing.assert_allclose(first['t'], soln.t)
+
+        # The identical in-flight request joins the first instead of solving again
+        assert sorted(event['event'] for event in events if event['event'] in ('joined', 'running')) == ['joined', 'running']
+        assert status['joined'] == 1
+        assert status['solved'] == 11
+        assert status['requests'] == 14
+        assert status['in_flight'] == 0
+
+        assert error['event'] == 'error' and error['id'] == 3
+
+    def test_cancelled_request(self):
+        soln, simulation_service = service.run(_cancel_first())
+        assert soln.t[-1] == SHORT_SCENARIO['time']['t_max']
+        # Requests made before and after the first was cancelled share its solve
+        assert simulation_service.num_joined == 2
+        assert simulation_service.num_solved == 1
+
+    def test_progress(self, tmp_path):
+        simulation_service, first, second, events = service.run(_progress((tmp_path / 'eark.sock').as_posix()))
+        # Every worker ran one warm-up task
+        assert len(set(simulation_service.worker_pids)) == 2
+        assert first['summary'] == second['summary']
+
+        # Each request receives the progress of the solve it runs or joins, before its result
+        for request_id in (1, 2):
+            fractions = [event['fraction'] for event in events if event['id'] == request_id and event['event'] == 'progress']
+            assert fractions
+            assert all(0 < fraction <= 1 for fraction in fractions)
+            assert fractions == sorted(fractions)
@@ -0,0 +1,81 @@
+"""Unittests for the surrogate module
+"""
+
+import numpy as np
+import pytest
+
+from eark.scenario import Scenario
+from eark.solution import Solution
+from eark.state import StateComponent
+from eark.surrogate import Output
+from eark.surrogate import ResponseSurface
+from eark.surrogate import latin_hypercube
+
+WITHDRAWAL = Scenario({'time': {'t_max': 10, 'num_iters': 101},
+                       'control': {'rules': [{'type': 'linear', 'coeff': 0, 'const': 0.0, 't_min': 2, 't_max': 4}]}})
+PARAMETERS = {'control.rules.0.const': (-1.0, 1.0), 'thermal_hydraulics.mass_flow': (18.0, 26.0)}
+OUTPUTS = [Output(StateComponent.TFuel, 'peak'), Output(StateComponent.NeutronPopulation, 'final')]
+
+
+def _synthetic(points: np.ndarray) -> np.ndarray:
+    return np.stack((np.sin(3 * points[:, 0]) + points[:, 1] ** 2, 2 * points[:, 0] - points[:, 1]), axis=1)
+
+
+class TestOutput:
+    def test_statistics(self):
+        t = np.linspace(0, 10, 101)
+        values = np.sin(t)
+        soln = Solution(array=values[:, np.newaxis], t=t, components=[StateComponent.TFuel])
+        assert Output(StateComponent.TFuel, 'peak', t_min=5)(soln) == pytest.approx(np.max(values[t >= 5]))
+        assert Output(StateComponent.TFuel, 'time_of_peak', t_max=5)(soln) == pytest.approx(1.6)
+        assert Output(StateComponent.TFuel, 'final')(soln) == pytest.approx(np.sin(10))
+        assert Output(StateComponent.TFuel, 'mean')(soln) == pytest.approx((1 - np.cos(10)) / 10, rel=1e-3)
+        with np.errstate(all='raise'):
+            assert Output(StateComponent.TFuel, 'mean', t_min=4.95, t_max=5.05)(soln) == values[50]
+        with pytest.raises(ValueError):
+            Output(StateComponent.TFuel, 'median')
+
+
+class TestResponseSurface:
+    def test_latin_hypercube(self):
+        points = latin_hypercube(20, 3, np.random.default_rng(0))
+        for column in points.T:
+            np.testing.assert_array_equal(np.sort(np.floor(column * 20)), np.arange(20))
+
+    def test_fit(self):
+        surface = ResponseSurface(WITHDRAWAL, parameters={'a': (0, 1), 'b': (-1, 1)}, outputs=OUTPUTS)
+        points = surface.sample(40, seed=0)
+        values = _synthetic(points)
+        surface.fit(points, values)
+        np.testing.assert_allclose(surface.predict(points), values, atol=1e-8)
+
+        # The linear output is reproduced exactly everywhere
+        queries = surface.sample(10, seed=1)
+        np.testing.assert_allclose(surface.predict(queries)[:, 1], _synthetic(queries)[:, 1], atol=1e-8)
+
+        # Rippa's formula agrees with refitting without each sample
+        reduced = ResponseSurface(WITHDRAWAL, parameters={'a': (0, 1), 'b': (-1, 1)}, outputs=OUTPUTS)
+        for i in (0, 17):
+            keep = np.arange(len(points)) != i
+            reduced.fit(points[keep], values[keep])
+            np.testing.assert_allclose(surface.loo_errors[i], values[i] - reduced.predict(points[i])[0], atol=1e-8)
+
+    def test_build(self, tmp_path):
+        surface = ResponseSurface(WITHDRAWAL, parameters=PARAMETERS, outputs=OUTPUTS, max_workers=2)
+        surface.build(16, seed=0)
+        queries = surface.sample(4, seed=3)
+        spread = np.ptp(surface.values, axis=0)
+        error = np.max(np.abs(surface.predict(queries) - surface.evaluate(queries)) / spread, axis=0)
+        assert np.all(error < 0.1)
+
+        added = surface.refine(4, seed=1)
+        assert added.shape == (4, 2) and len(surface.points) == 20
+        values, estimate = surface.predict(queries, return_error=True)
+        assert estimate.shape == values.shape
+
+        query = surface.query(control__rules__0__const=0.3, thermal_hydraulics__mass_flow=21.0)
+        assert set(query) == {'peak_TFuel', 'final_NeutronPopulation'}
+
+        surface.save(tmp_path / 'surface.npz')
+        loaded = ResponseSurface.load(tmp_path / 'surface.npz')
+        np.testing.assert_allclose(loaded.predict(queries), values)
@@ -0,0 +1,74 @@
+"""Unittests for the sweep module
+"""
+
+import numpy as np
+import pytest
+
+from eark import solver
+from eark.scenario import Scenario
+from eark.sweep import Sweep
+from eark.sweep import continuation_order
+from eark.utilities import testing
+
+SCENARIO = Scenario({'control': {'rules': [{'type': 'linear', 'coeff': 0, 'const': -1.0, 't_min': 2, 't_max': 4}]},
+                     'time': {'t_max': 20, 'num_iters': 201}})
+PARAMETERS = ['control.rules.0.const', 'thermal_hydraulics.mass_flow']
+POINTS = np.array([[-1.0, 22.0], [0.5, 20.0], [-0.5, 24.0]])
+
+
+class TestSweep:
+    def test_matches_scenario(self):
+        sweep = Sweep(SCENARIO, PARAMETERS, max_workers=1)
+        solutions = sweep.solve(POINTS)
+        for point, soln in zip(POINTS, solutions):
+            desired = SCENARIO.with_overrides(dict(zip(PARAMETERS, point))).solve()
+            np.testing.assert_allclose(soln.array, desired.array, rtol=1e-5)
+
+    def test_jacobian_saves_evaluations(self):
+        cold = Sweep(SCENARIO, PARAMETERS[:1], jacobian=False, max_workers=1)
+        cold.solve(POINTS[:, 0])
+        analytic = Sweep(SCENARIO, PARAMETERS[:1], max_workers=1)
+        analytic.solve(POINTS[:, 0])
+        assert analytic.statistics.num_rhs < 0.8 * cold.statistics.num_rhs
+        assert analytic.statistics.num_jac > 0
+
+    def test_workers(self):
+        serial = Sweep(SCENARIO, PARAMETERS, max_workers=1).solve(POINTS)
+        parallel = Sweep(SCENARIO, PARAMETERS, max_workers=2).solve(POINTS)
+        for a, b in zip(serial, parallel):
+            np.testing.assert_array_equal(a.array, b.array)
+        assert Sweep(SCENARIO, PARAMETERS).solve(np.empty((0, 2))) == []
+
+    def test_solve_ivp_jacobian(self):
+        statistics = solver.IntegratorStatistics()
+        kwargs = SCENARIO.solve_kwargs()
+        soln = solver.solve(drum_control_rule=SCENARIO.drum_control_rule(), method='BDF', rtol=1e-8, atol=1e-10, jacobian=True,
+                            statistics=statistics, **kwargs)
+        desired = SCENARIO.solve()
+        np.testing.assert_allclose(soln.array, desired.array, rtol=1e-4)
+        assert statistics.num_steps > 0 and statistics.num_rhs >= statistics.num_steps and statistics.num_jac > 0
+
+    def test_continuation_order(self):
+        points = np.array([[1.0, 20.0], [-1.0, 18.0], [0.0, 26.0], [-0.5, 18.0], [1.0, 26.0]])
+        np.testing.assert_array_equal(continuation_order(points), [1, 3, 0, 4, 2])
+        np.testing.assert_array_equal(continuation_order(np.array([[2.0], [0.0], [1.0]])), [1, 2, 0])
+
+    def test_warm_start(self):
+        points = np.array([[c, flow] for flow in (20.0, 24.0) for c in np.linspace(-1, 1, 5)])
+        kwargs = dict(max_workers=1, method='BDF', rtol=1e-8, atol=1e-10)
+        cold = Sweep(SCENARIO, PARAMETERS, **kwargs)
+        desired = cold.solve(points)
+        warm = Sweep(SCENARIO, PARAMETERS, warm_start=True, **kwargs)
+        solutions = warm.solve(points)
+        for soln, expected in zip(solutions, desired):
+            testing.assert_solution_approx_equal(soln, expected, rtol=1e-5)
+        # All but the first point start from the Jacobian of their neighbour, the steps taken barely change
+        assert warm.statistics.num_jac < cold.statistics.num_jac
+        assert warm.statistics.num_steps == pytest.approx(cold.statistics.num_steps, rel=0.05)
+
+        kwargs['max_workers'] = 2
+        parallel = Sweep(SCENARIO, PARAMETERS, warm_start=True, **kwargs).solve(points)
+        for soln, expected in zip(parallel, desired):
+            testing.assert_solution_approx_equal(soln, expected, rtol=1e-5)
+        with pytest.raises(ValueError):
+            Sweep(SCENARIO, PARAMETERS, warm_start=True)
@@ -1,30 +1,138 @@
 """Plotting utilities for eark
 
+Matplotlib's pyplot interface is imported only for interactive display. Figures written to file are rendered directly
+through the Agg backend, which is safe in headless batch workers.
 """
 
 import typing
 
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
 from palettable.scientific.sequential import Batlow_6 as cmap
 
 DENSITY_COLORS = cmap.mpl_colors
+DEFAULT_MAX_POINTS = 2000   # series longer than this are downsampled before plotting
+MARKER_MAX_POINTS = 200     # series longer than this are drawn without point markers
+PANEL_SIZE = (6.4, 3.6)     # size of each panel of a multi-panel figure [inches]
+FIGURE_SIZE = (6.4, 4.8)    # size of a single-quantity figure, the matplotlib default [inches]
 
 
-def plot_soln_quantity(t, y, y_label: str = 'Solution', title: str = 'Solution Plot', x_label: str = 'Time (s)', color: str = 'red', label: typing.Union[typing.Callable, str] = None,
-                       marker: str = '.', output_file: str = None):
+def lttb_indices(x: np.ndarray, y: np.ndarray, num_points: int) -> np.ndarray:
+    """Select points of a series with the Largest-Triangle-Three-Buckets algorithm
+
+    The interior of the series is split into buckets of equal count, and from each bucket the point forming the largest
+    triangle with the previously selected point and the mean of the next bucket is kept. This preserves peaks and the
+    visual shape of the series far better than uniform decimation.
+
+    Args:
+        x:
+            ndarray, strictly increasing abscissae, the buckets are formed by count and assume ordered points
+        y:
+            ndarray, ordinates
+        num_points:
+            int, number of points to select, at least 3
+
+    Returns:
+        ndarray, increasing indices of the selected points, including the first and last
+
+    References:
+        [1] Steinarsson S. Downsampling Time Series for Visual Representation [M.Sc.]. University of Iceland; 2013.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    size = len(x)
+    if num_points >= size or num_points < 3:
+        return np.arange(size)
+    if not _increasing(x):
+        raise ValueError('Abscissae must be strictly increasing for LTTB downsampling')
+
+    edges = np.linspace(1, size - 1, num_points - 1).astype(int)
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts, y[-1])
+
+    indices = np.empty(num_points, dtype=int)
+    indices[0] = 0
+    indices[-1] = size - 1
+    selected = 0
+    for i in range(num_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[selected] - mean_x[i + 1]) * (y[lo:hi] - y[selected]) -
+                      (x[selected] - x[lo:hi]) * (mean_y[i + 1] - y[selected]))
+        selected = lo + int(np.argmax(area))
+        indices[i + 1] = selected
+    return indices
+
+
+def _increasing(x: np.ndarray) -> bool:
+    return bool(np.all(np.diff(x) > 0))
+
+
+def _draw_quantity(ax, t, y, y_label: str, title: str, x_label: str, color, label, marker: str, max_points: int):
     if not isinstance(y, list):
         y = [y]
         color = [color]
 
     for i in range(len(y)):
-        label = label if isinstance(label, str) else label(i) if callable(label) else y_label
-        plt.plot(t, y[i], color=color[i], label=label, marker=marker)
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
-    plt.title(title)
-    plt.legend()
+        series_label = label if isinstance(label, str) else label(i) if callable(label) else y_label
+        t_i, y_i = np.asarray(t), np.asarray(y[i])
+        if max_points is not None and len(t_i) > max_points and _increasing(t_i):
+            keep = lttb_indices(t_i, y_i, max_points)
+            t_i, y_i = t_i[keep], y_i[keep]
+        ax.plot(t_i, y_i, color=color[i], label=series_label, marker=marker if len(t_i) <= MARKER_MAX_POINTS else None)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    ax.legend()
 
+
+def _figure(figsize: typing.Tuple[float, float], output_file: str = None):
+    """Create a figure, through pyplot only when it is to be shown interactively"""
+    if output_file is None:
+        import matplotlib.pyplot as plt
+        return plt.figure(figsize=figsize)
+    return Figure(figsize=figsize)
+
+
+def _finish(fig, output_file: str = None):
+    """Write the figure to file or show it interactively"""
     if output_file is not None:
-        plt.savefig(output_file)
+        # A Figure created without pyplot renders through Agg for raster formats, with no GUI backend involved, and is
+        # released with its last reference, so repeated calls in a batch neither overdraw nor leak figures
+        fig.savefig(output_file)
     else:
+        import matplotlib.pyplot as plt
         plt.show()
+
+
+def plot_soln_quantity(t, y, y_label: str = 'Solution', title: str = 'Solution Plot', x_label: str = 'Time (s)', color: str = 'red', label: typing.Union[typing.Callable, str] = None,
+                       marker: str = '.', output_file: str = None, max_points: int = DEFAULT_MAX_POINTS):
+    fig = _figure(FIGURE_SIZE, output_file=output_file)
+    _draw_quantity(fig.add_subplot(1, 1, 1), t=t, y=y, y_label=y_label, title=title, x_label=x_label, color=color, label=label,
+                   marker=marker, max_points=max_points)
+    _finish(fig, output_file=output_file)
+
+
+def plot_panels(panels: typing.List[dict], output_file: str = None, num_cols: int = 2, max_points: int = DEFAULT_MAX_POINTS):
+    """Plot several quantities as the panels of a single figure
+
+    Args:
+        panels:
+            list of dict, keyword arguments of "plot_soln_quantity" for each panel, excluding "output_file"
+        output_file:
+            str, default None, path of the file to write, if None the figure is shown interactively
+        num_cols:
+            int, default 2, number of columns of panels
+        max_points:
+            int, default 2000, maximum number of points drawn per series
+    """
+    num_rows = -(-len(panels) // num_cols)
+    fig = _figure((PANEL_SIZE[0] * num_cols, PANEL_SIZE[1] * num_rows), output_file=output_file)
+
+    for i, panel in enumerate(panels):
+        kwargs = dict(y_label='Solution', title='Solution Plot', x_label='Time (s)', color='red', label=None, marker='.')
+        kwargs.update(panel)
+        kwargs.setdefault('max_points', max_points)
+        _draw_quantity(fig.add_subplot(num_rows, num_cols, i + 1), **kwargs)
+    fig.tight_layout()
+    _finish(fig, output_file=output_file)
@@ -1,19 +1,167 @@
 """Testing utilities
 """
+import os
+import pathlib
+import typing
+
 import numpy as np
 
+from eark.solution import Solution
+from eark.state import StateComponent
+
 DEFAULT_PRECISION = 3
 DEFAULT_MAX_LINE_WIDTH = 500
+DEFAULT_MAX_PRINT_SIZE = 1000   # arrays larger than this are not printed in full in assertion messages
+DEFAULT_RTOL = 1e-5
+UPDATE_GOLDEN_ENV = 'EARK_UPDATE_GOLDEN'
+
+
+def approx_equal(res: np.ndarray, desired: np.ndarray, significant: int = DEFAULT_PRECISION) -> np.ndarray:
+    """Elementwise test of agreement to a number of significant digits
+
+    This is the vectorized equivalent of np.testing.assert_approx_equal: both values are scaled by the power of ten of
+    their mean magnitude and compared to within 10 ** -(significant - 1).
+
+    Args:
+        res:
+            ndarray, actual values
+        desired:
+            ndarray, desired values, broadcastable against "res"
+        significant:
+            int, default 3, number of significant digits
+
+    Returns:
+        ndarray, boolean array, True where the values agree
+    """
+    res = np.asarray(res, dtype=float)
+    desired = np.asarray(desired, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = 10.0 ** np.floor(np.log10(0.5 * (np.abs(res) + np.abs(desired))))
+        close = np.abs(res - desired) / scale < 10.0 ** -(significant - 1)
+    return close | (res == desired) | (np.isnan(res) & np.isnan(desired))
 
 
 def assert_array_approx_equal(res: np.ndarray, desired: np.ndarray, significant: int = DEFAULT_PRECISION):
-    try:
-        for r, d in zip(res.ravel(), desired.ravel()):
-            np.testing.assert_approx_equal(actual=r, desired=d, significant=significant)
-    except AssertionError as e:
+    res = np.asarray(res, dtype=float)
+    desired = np.asarray(desired, dtype=float)
+    close = approx_equal(res, desired, significant=significant)
+    if np.all(close):
+        return
+
+    worst = np.unravel_index(np.argmax(np.where(close, 0.0, np.abs(res - desired))), close.shape)
+    msg = '\nArrays not approximately equal to {:d} significant digits.\nMismatched elements: {:d} / {:d}\n' \
+          'First largest mismatch at {}: expected {}, got {}'.format(significant, np.count_nonzero(~close), close.size,
+                                                                     tuple(int(i) for i in worst), desired[worst], res[worst])
+    if res.size <= DEFAULT_MAX_PRINT_SIZE:
         res_str = np.array2string(a=res, max_line_width=DEFAULT_MAX_LINE_WIDTH, precision=significant, separator=',',
                                   formatter={'float': lambda x: np.format_float_scientific(x, precision=significant)})
         des_str = np.array2string(a=desired, max_line_width=DEFAULT_MAX_LINE_WIDTH, precision=significant, separator=',',
                                   formatter={'float': lambda x: np.format_float_scientific(x, precision=significant)})
-        msg = '\nArrays not approximately equal.\nExpected:\n{}\nGot:\n{}'.format(des_str, res_str)
-        raise AssertionError(msg) from e
+        msg += '\nExpected:\n{}\nGot:\n{}'.format(des_str, res_str)
+    raise AssertionError(msg)
+
+
+def _max_errors(res: np.ndarray, desired: np.ndarray, t: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Largest absolute and relative error of every column and the time of the largest error"""
+    error = np.abs(res - desired)
+    scale = np.max(np.abs(desired), axis=0)
+    scale[scale == 0] = 1.0
+    max_abs_error = np.max(error, axis=0)
+    return max_abs_error, max_abs_error / scale, t[np.argmax(error, axis=0)]
+
+
+class SolutionComparison:
+    __slots__ = ('components', 'max_abs_error', 'max_rel_error', 't_worst', 'rtol', 'drum_max_abs_error',
+                 'drum_max_rel_error', 'drum_t_worst', 'drum_rtol')
+
+    def __init__(self, res: Solution, desired: Solution, rtol: typing.Union[float, typing.Dict[StateComponent, float]] = DEFAULT_RTOL,
+                 drum_rtol: float = DEFAULT_RTOL):
+        """Per-component comparison of two solutions on the same time grid
+
+        Errors are measured relative to the largest magnitude of each desired component over the transient, so that
+        components passing through zero are compared on the scale of their excursion. The angles of individually
+        modelled drums (see eark.drums), stored after the components, are compared separately, drum by drum.
+
+        Args:
+            res:
+                Solution, the actual solution
+            desired:
+                Solution, the reference solution
+            rtol:
+                float or dict of StateComponent to float, default 1e-5, relative tolerance for all or each component
+            drum_rtol:
+                float, default 1e-5, relative tolerance for the angle of every individually modelled drum
+        """
+        if res.array.shape != desired.array.shape or not np.allclose(res.t, desired.t, rtol=1e-12, atol=0.0):
+            raise AssertionError('Solutions are not on the same time grid: {} and {}'.format(res.array.shape, desired.array.shape))
+        self.components = list(desired.components)
+        self.rtol = np.array([rtol.get(c, DEFAULT_RTOL) if isinstance(rtol, dict) else rtol for c in self.components])
+        self.drum_rtol = drum_rtol
+
+        num_components = len(self.components)
+        self.max_abs_error, self.max_rel_error, self.t_worst = _max_errors(res.array[:, :num_components],
+                                                                           desired.array[:, :num_components], desired.t)
+        self.drum_max_abs_error, self.drum_max_rel_error, self.drum_t_worst = _max_errors(res.array[:, num_components:],
+                                                                                          desired.array[:, num_components:],
+                                                                                          desired.t)
+
+    @property
+    def passed(self) -> np.ndarray:
+        """Boolean array, True for each component within tolerance"""
+        return self.max_rel_error <= self.rtol
+
+    @property
+    def drums_passed(self) -> np.ndarray:
+        """Boolean array, True for each individually modelled drum with its angle within tolerance, empty without drums"""
+        return self.drum_max_rel_error <= self.drum_rtol
+
+    def __str__(self):
+        names = [c.name for c in self.components] + ['Drum {:d}'.format(i) for i in range(len(self.drum_max_rel_error))]
+        max_abs_error = np.concatenate([self.max_abs_error, self.drum_max_abs_error])
+        max_rel_error = np.concatenate([self.max_rel_error, self.drum_max_rel_error])
+        rtol = np.concatenate([self.rtol, np.full(len(self.drum_max_rel_error), self.drum_rtol)])
+        t_worst = np.concatenate([self.t_worst, self.drum_t_worst])
+        passed = np.concatenate([self.passed, self.drums_passed])
+        lines = ['{:<20s} {:>12s} {:>12s} {:>10s} {:>10s}  {}'.format('Component', 'Max Abs Err', 'Max Rel Err', 'Tolerance',
+                                                                    't Worst', 'Status')]
+        for i in np.argsort(-max_rel_error / rtol):
+            lines.append('{:<20s} {:>12.4e} {:>12.4e} {:>10.1e} {:>10.4g}  {}'.format(
+                names[i], max_abs_error[i], max_rel_error[i], rtol[i], t_worst[i], 'ok' if passed[i] else 'FAIL'))
+        return '\n'.join(lines)
+
+
+def assert_solution_approx_equal(res: Solution, desired: Solution,
+                                 rtol: typing.Union[float, typing.Dict[StateComponent, float]] = DEFAULT_RTOL,
+                                 drum_rtol: float = DEFAULT_RTOL):
+    """Assert that each component and drum angle of two solutions agrees to within a tolerance, summarizing the worst
+    deviations"""
+    comparison = SolutionComparison(res, desired, rtol=rtol, drum_rtol=drum_rtol)
+    if not (np.all(comparison.passed) and np.all(comparison.drums_passed)):
+        raise AssertionError('\nSolutions not approximately equal.\n{}'.format(comparison))
+
+
+def assert_matches_golden(res: Solution, golden_file: typing.Union[str, pathlib.Path],
+                          rtol: typing.Union[float, typing.Dict[StateComponent, float]] = DEFAULT_RTOL,
+                          drum_rtol: float = DEFAULT_RTOL):
+    """Compare a solution against a stored reference solution
+
+    Setting the environment variable EARK_UPDATE_GOLDEN=1 (re)writes the reference from "res" instead of comparing.
+
+    Args:
+        res:
+            Solution, the actual solution
+        golden_file:
+            str or Path, reference solution written by Solution.save
+        rtol:
+            float or dict of StateComponent to float, default 1e-5, relative tolerance for all or each component
+        drum_rtol:
+            float, default 1e-5, relative tolerance for the angle of every individually modelled drum
+    """
+    golden_file = pathlib.Path(golden_file)
+    if os.environ.get(UPDATE_GOLDEN_ENV, '0') not in ('', '0'):
+        golden_file.parent.mkdir(parents=True, exist_ok=True)
+        res.save(golden_file)
+        return
+    if not golden_file.exists():
+        raise AssertionError('Golden file {} does not exist, run with {}=1 to create it'.format(golden_file, UPDATE_GOLDEN_ENV))
+    assert_solution_approx_equal(res, Solution.load(golden_file), rtol=rtol, drum_rtol=drum_rtol)
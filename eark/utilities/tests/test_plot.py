@@ -1,10 +1,17 @@
 """Unittests for the inhour module
 """
 import pathlib
+import subprocess
+import sys
 import tempfile
 
+import numpy as np
+import pytest
+
 from eark import solver
+from eark.tests import TEST_ROOT
 from eark.tests import _parameters
+from eark.utilities import plot
 
 
 class TestPlot:
@@ -39,3 +46,42 @@ class TestPlot:
 
             # Check image was written
             assert plot_file.exists()
+
+    def test_plot_dashboard(self):
+        soln = _parameters.solve(drum_control_rule=_parameters.DRUM_SPEED, t_max=100, num_iters=20001)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plot_file = pathlib.Path(tmpdir) / 'dashboard.png'
+            soln.plot_dashboard(output_file=plot_file.as_posix())
+            assert plot_file.exists()
+
+    def test_repeated_plots(self):
+        import matplotlib.pyplot as plt
+        t = np.linspace(0, 10, 5001)
+        num_figures = len(plt.get_fignums())
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(3):
+                plot.plot_soln_quantity(t, np.sin(t + i), output_file=(pathlib.Path(tmpdir) / '{}.png'.format(i)).as_posix())
+            # Series which are not ordered in time are drawn without downsampling
+            plot.plot_soln_quantity(t[::-1], np.sin(t), output_file=(pathlib.Path(tmpdir) / 'reversed.png').as_posix())
+        assert len(plt.get_fignums()) == num_figures
+
+    def test_solution_import(self):
+        # Solving must not import matplotlib
+        code = 'import sys; import eark.solver; sys.exit(int("matplotlib" in sys.modules))'
+        assert subprocess.run([sys.executable, '-c', code], cwd=TEST_ROOT.parent.as_posix()).returncode == 0
+
+
+class TestLTTB:
+    def test_lttb_indices(self):
+        x = np.linspace(0, 10, 100001)
+        y = np.sin(x)
+        y[54321] = 5.0
+        res = plot.lttb_indices(x, y, 500)
+        assert len(res) == 500
+        assert res[0] == 0 and res[-1] == len(x) - 1
+        assert np.all(np.diff(res) > 0)
+        assert 54321 in res
+
+        np.testing.assert_array_equal(plot.lttb_indices(x[:100], y[:100], 500), np.arange(100))
+        with pytest.raises(ValueError):
+            plot.lttb_indices(x[::-1], y, 500)
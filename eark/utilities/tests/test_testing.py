@@ -0,0 +1,88 @@
+"""Unittests for the testing module
+"""
+import pathlib
+import tempfile
+
+import numpy as np
+import pytest
+
+from eark.solution import Solution
+from eark.state import StateComponent
+from eark.utilities import testing
+
+
+class TestApproxEqual:
+    def test_matches_numpy(self):
+        rng = np.random.RandomState(42)
+        desired = rng.standard_normal(2000) * 10.0 ** rng.randint(-8, 8, size=2000)
+        res = desired * (1 + 10.0 ** rng.uniform(-7, -2, size=2000) * rng.choice([-1, 1], size=2000))
+        res[:5] = desired[:5]
+        res[5], desired[5] = 0.0, 0.0
+
+        close = testing.approx_equal(res, desired, significant=4)
+        for r, d, c in zip(res, desired, close):
+            try:
+                np.testing.assert_approx_equal(actual=r, desired=d, significant=4)
+                assert c
+            except AssertionError:
+                assert not c
+
+    def test_assert_array_approx_equal(self):
+        desired = np.linspace(1.0, 2.0, 100000)
+        testing.assert_array_approx_equal(desired * (1 + 1e-7), desired, significant=5)
+
+        res = desired.copy()
+        res[777] *= 1.01
+        with pytest.raises(AssertionError, match='Mismatched elements: 1 / 100000'):
+            testing.assert_array_approx_equal(res, desired, significant=5)
+
+
+class TestGolden:
+    def setup_method(self):
+        t = np.linspace(0, 10, 101)
+        self.desired = Solution(array=np.outer(np.exp(-t), np.arange(1.0, 14.0)), t=t)
+
+    def test_solution_comparison(self):
+        array = self.desired.array.copy()
+        array[5, StateComponent.TFuel] *= 1.001
+        comparison = testing.SolutionComparison(Solution(array=array, t=self.desired.t), self.desired, rtol=1e-5)
+        assert list(comparison.passed).count(False) == 1
+        assert not comparison.passed[StateComponent.TFuel]
+        assert comparison.t_worst[StateComponent.TFuel] == 0.5
+        assert str(comparison).splitlines()[1].startswith('TFuel')
+
+        testing.assert_solution_approx_equal(Solution(array=array, t=self.desired.t), self.desired,
+                                             rtol={StateComponent.TFuel: 1e-3})
+
+    def test_drum_angles(self):
+        t = self.desired.t
+        drum_angles = np.outer(1 + t, [70.0, 80.0, 90.0])
+        desired = Solution(array=np.hstack([self.desired.array, drum_angles]), t=t)
+        comparison = testing.SolutionComparison(desired, desired)
+        assert len(comparison.passed) == len(StateComponent) and len(comparison.drums_passed) == 3
+
+        drum_angles = drum_angles.copy()
+        drum_angles[5, 1] *= 1.001
+        res = Solution(array=np.hstack([self.desired.array, drum_angles]), t=t)
+        comparison = testing.SolutionComparison(res, desired, drum_rtol=1e-6)
+        assert np.all(comparison.passed)
+        assert list(comparison.drums_passed) == [True, False, True]
+        assert comparison.drum_t_worst[1] == 0.5
+        assert str(comparison).splitlines()[1].startswith('Drum 1')
+        with pytest.raises(AssertionError, match='not approximately equal'):
+            testing.assert_solution_approx_equal(res, desired, drum_rtol=1e-6)
+        testing.assert_solution_approx_equal(res, desired, drum_rtol=1e-3)
+
+    def test_assert_matches_golden(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            golden_file = pathlib.Path(tmpdir) / 'golden' / 'decay.npz'
+            with pytest.raises(AssertionError, match='does not exist'):
+                testing.assert_matches_golden(self.desired, golden_file)
+
+            monkeypatch.setenv(testing.UPDATE_GOLDEN_ENV, '1')
+            testing.assert_matches_golden(self.desired, golden_file)
+            monkeypatch.delenv(testing.UPDATE_GOLDEN_ENV)
+            testing.assert_matches_golden(self.desired, golden_file)
+
+            with pytest.raises(AssertionError, match='not approximately equal'):
+                testing.assert_matches_golden(Solution(array=self.desired.array * 1.1, t=self.desired.t), golden_file)
@@ -18,11 +18,19 @@ setuptools.setup(name='eark',
                  author_email='vigneshwar.manickam@gatech.edu',
                  license='MIT',
                  packages=setuptools.find_packages(),
+                 package_data={'eark': ['scenarios/*.json'], 'eark.tests': ['golden/*.npz']},
                  install_requires=[
                      'matplotlib',
                      'numpy',
                      'palettable',
                      'pytest',
                      'scipy',
+                     'toml; python_version<"3.11"',
                  ],
+                 entry_points={
+                     'console_scripts': [
+                         'eark-batch = eark.scripts.batch:main',
+                         'eark-serve = eark.scripts.serve:main',
+                     ],
+                 },
                  zip_safe=False)